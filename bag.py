@@ -1,18 +1,20 @@
 import os
 from PyQt6.QtWidgets import QFrame, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QFileDialog, QSizePolicy, QListWidgetItem
 from PyQt6.QtGui import QIcon
-from PyQt6.QtCore import QThread, pyqtSignal, Qt
+from PyQt6.QtCore import pyqtSignal, Qt
 from qfluentwidgets import ListWidget, PrimaryPushButton, LineEdit, IndeterminateProgressRing, SubtitleLabel
 from functions import show_confirm_dialog, show_message_bar
 from found import scan_packs, find_manifest_json, parse_manifest
 from config import cfg
+from services import timing
+from services.background_task import BackgroundTask
 from save import PackManager
 from import_file import ImportManager
 
-# 添加导入线程类
-class ImportThread(QThread):
-    """用于后台导入包的线程"""
-    finished = pyqtSignal(bool, str)  # 成功/失败, 消息
+# 添加导入任务类
+class ImportThread(BackgroundTask):
+    """用于后台导入包的任务"""
+    import_finished = pyqtSignal(bool, str)  # 成功/失败, 消息
     
     def __init__(self, file_path, import_manager, find_manifest_json_func, parse_manifest_func):
         super().__init__()
@@ -40,15 +42,15 @@ class ImportThread(QThread):
                 )
             
             # 发送结果信号
-            self.finished.emit(success, message)
+            self.import_finished.emit(success, message)
         except Exception as e:
             # 发送异常信号
-            self.finished.emit(False, f"导入过程中发生错误：{str(e)}")
+            self.import_finished.emit(False, f"导入过程中发生错误：{str(e)}")
 
-# 添加自定义合成线程类
-class ComposeThread(QThread):
-    """用于后台合成Addon的线程"""
-    finished = pyqtSignal(bool, str, str)  # 成功/失败, 错误信息, 文件路径
+# 添加自定义合成任务类
+class ComposeThread(BackgroundTask):
+    """用于后台合成Addon的任务"""
+    compose_finished = pyqtSignal(bool, str, str)  # 成功/失败, 错误信息, 文件路径
     
     def __init__(self, behavior_pack, resource_pack, save_path, pack_manager):
         super().__init__()
@@ -63,18 +65,20 @@ class ComposeThread(QThread):
             import shutil
             
             # 创建zip文件
-            with zipfile.ZipFile(self.save_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
+            with timing.operation('compose', behavior=self.behavior_pack.name, resource=self.resource_pack.name), \
+                    zipfile.ZipFile(self.save_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
                 # 添加行为包文件
                 self._add_folder_to_zip(zipf, self.behavior_pack.path, os.path.basename(self.behavior_pack.path))
                 
                 # 添加资源包文件
                 self._add_folder_to_zip(zipf, self.resource_pack.path, os.path.basename(self.resource_pack.path))
+                timing.count('bytes', sum(info.file_size for info in zipf.infolist()))
             
             # 发送成功信号
-            self.finished.emit(True, "", self.save_path)
+            self.compose_finished.emit(True, "", self.save_path)
         except Exception as e:
             # 发送失败信号
-            self.finished.emit(False, str(e), self.save_path)
+            self.compose_finished.emit(False, str(e), self.save_path)
             # 如果文件创建失败，尝试删除可能部分创建的文件
             if os.path.exists(self.save_path):
                 try:
@@ -84,9 +88,11 @@ class ComposeThread(QThread):
     
     def _add_folder_to_zip(self, zipf, folder_path, folder_name):
         """添加文件夹到zip文件"""
-        for root, dirs, files in os.walk(folder_path):
-            for file in files:
-                file_path = os.path.join(root, file)
+        with timing.span('walk'):
+            file_paths = [os.path.join(root, file) for root, dirs, files in os.walk(folder_path) for file in files]
+        timing.count('files', len(file_paths))
+        with timing.span('write'):
+            for file_path in file_paths:
                 # 计算相对路径，用于在zip中保持正确的文件结构
                 rel_path = os.path.join(folder_name, os.path.relpath(file_path, folder_path))
                 zipf.write(file_path, rel_path)
@@ -411,7 +417,7 @@ class BagInterface(QFrame):
             find_manifest_json,
             parse_manifest
         )
-        self.import_thread.finished.connect(self._on_import_finished_multi)
+        self.import_thread.import_finished.connect(self._on_import_finished_multi)
         self.import_thread.start()
 
     def _on_import_finished_multi(self, success, message):
@@ -545,7 +551,7 @@ class BagInterface(QFrame):
             )
             
             # 连接信号
-            self.compose_thread.finished.connect(self.on_compose_finished)
+            self.compose_thread.compose_finished.connect(self.on_compose_finished)
             
             # 启动线程
             self.compose_thread.start()
@@ -0,0 +1,222 @@
+"""提取器和保存函数的性能测试
+
+在合成测试包上按几种规模分别计时各提取器（search_*）和各保存函数（save_function/*），
+结果写入 JSON 文件；指定基准文件时逐项比较并标出变慢的项目。
+
+用法（在项目根目录下运行）:
+    python -m benchmarks.run_benchmarks -o results.json [--sizes small,medium] [--repeat 5]
+    python -m benchmarks.run_benchmarks -o results.json --baseline benchmarks/baseline.json
+
+benchmarks/baseline.json 是随仓库提交的 small 规模基准结果。耗时与机器有关，比较前最好在同一台机器上
+重新生成；提取或保存逻辑有意变化后也应重新生成并一起提交：
+    python -m benchmarks.run_benchmarks -o benchmarks/baseline.json --sizes small --repeat 5
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import argparse
+import statistics
+import tempfile
+from datetime import datetime
+from .synthetic_pack import generate_packs
+from search_function.executor import ExtractBackend, BACKENDS
+from search_function.lang import search as search_lang
+from search_function.entities import search as search_entities
+from search_function.items import search as search_items
+from search_function.scripts import search as search_scripts
+from search_function.functions import search as search_functions
+from save_function.save_lang import save_lang_entries
+from save_function.save_items import save_item_entries
+from save_function.save_entities import save_entity_entries
+from save_function.save_scripts import save_script_entries
+from save_function.save_functions import save_mcfunction_entries
+
+RESULT_FORMAT_VERSION = 1
+
+# 各规模的合成包参数，与 generate_packs 的参数对应
+SIZES = {
+    'small': dict(entities=100, items=100, scripts=20, minified_scripts=1, functions=50, lang_lines=1000),
+    'medium': dict(entities=1000, items=1000, scripts=200, minified_scripts=2, functions=500, lang_lines=10000),
+    'large': dict(entities=5000, items=5000, scripts=1000, minified_scripts=4, functions=2500, lang_lines=50000),
+}
+
+# 行为包提取器：名称 -> 搜索函数
+BEHAVIOR_SEARCHES = (
+    ('search_entities', search_entities),
+    ('search_items', search_items),
+    ('search_scripts', search_scripts),
+    ('search_functions', search_functions),
+)
+
+# 保存函数：名称 -> (保存函数, 包类型, 需要修改的条目类型)
+SAVERS = (
+    ('save_lang', save_lang_entries, 'resources', ('language_entry',)),
+    ('save_items', save_item_entries, 'behavior', ('item_name',)),
+    ('save_entities', save_entity_entries, 'behavior', ('entity_name', 'say')),
+    ('save_scripts', save_script_entries, 'behavior',
+     ('script_title', 'script_button', 'script_body', 'script_sendMessage', 'script_rawtext')),
+    ('save_functions', save_mcfunction_entries, 'behavior', ('mcfunction_text',)),
+)
+
+# 比较基准时，耗时超过基准的该倍数视为变慢
+DEFAULT_REGRESSION_THRESHOLD = 1.2
+
+
+def _summarize(timings, count):
+    return {
+        'min': min(timings),
+        'median': statistics.median(timings),
+        'runs': len(timings),
+        'entries': count,
+    }
+
+
+def _scan_entries(pack_info, backend_kind):
+    """扫描整个包，返回全部条目（用于准备保存测试的数据，不计时）"""
+    if pack_info.type == 'resources':
+        return search_lang(pack_info)
+    entries = []
+    with ExtractBackend(backend_kind) as backend:
+        for _, search_func in BEHAVIOR_SEARCHES:
+            entries.extend(search_func(pack_info, backend=backend)[0])
+    return entries
+
+
+def bench_searches(behavior_pack, resource_pack, repeat, backend_kind):
+    """分别计时各提取器"""
+    results = {}
+    timings = []
+    count = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        count = len(search_lang(resource_pack))
+        timings.append(time.perf_counter() - start)
+    results['search_lang'] = _summarize(timings, count)
+
+    for name, search_func in BEHAVIOR_SEARCHES:
+        timings = []
+        for _ in range(repeat):
+            # 每次使用新的执行后端，进程池的启动时间计入结果
+            start = time.perf_counter()
+            with ExtractBackend(backend_kind) as backend:
+                entries, _ = search_func(behavior_pack, backend=backend)
+            timings.append(time.perf_counter() - start)
+            count = len(entries)
+        results[name] = _summarize(timings, count)
+    return results
+
+
+def bench_savers(behavior_pack, resource_pack, repeat, backend_kind, work_dir):
+    """分别计时各保存函数：每次在包的新副本上修改对应类型的全部条目并保存"""
+    results = {}
+    for name, save_func, pack_type, entry_types in SAVERS:
+        source_pack = resource_pack if pack_type == 'resources' else behavior_pack
+        timings = []
+        count = 0
+        for run in range(repeat):
+            # 复制包和准备数据不计入耗时
+            copy_path = os.path.join(work_dir, f'{name}_{run}')
+            shutil.copytree(source_pack.path, copy_path)
+            pack_info = type(source_pack)(source_pack.name, copy_path, source_pack.type)
+            entries = [entry for entry in _scan_entries(pack_info, backend_kind) if entry['type'] in entry_types]
+            for entry in entries:
+                entry['value'] = f"{entry['value']} (bench)"
+            count = len(entries)
+
+            start = time.perf_counter()
+            success, _, message = save_func(pack_info, entries)
+            timings.append(time.perf_counter() - start)
+            if not success:
+                print(f"{name} 保存失败: {message}", file=sys.stderr)
+            shutil.rmtree(copy_path, ignore_errors=True)
+        results[name] = _summarize(timings, count)
+    return results
+
+
+def run(sizes, repeat, backend_kind):
+    """在各规模的合成包上运行全部测试，返回结果字典"""
+    report = {
+        'format_version': RESULT_FORMAT_VERSION,
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+        },
+        'settings': {'repeat': repeat, 'backend': backend_kind},
+        'sizes': {},
+    }
+    for size in sizes:
+        with tempfile.TemporaryDirectory(prefix=f'bench_{size}_') as work_dir:
+            print(f"生成 {size} 规模的合成包...", file=sys.stderr)
+            behavior_pack, resource_pack = generate_packs(os.path.join(work_dir, 'packs'), **SIZES[size])
+            benchmarks = bench_searches(behavior_pack, resource_pack, repeat, backend_kind)
+            benchmarks.update(bench_savers(behavior_pack, resource_pack, repeat, backend_kind, work_dir))
+        report['sizes'][size] = {'params': SIZES[size], 'benchmarks': benchmarks}
+        for name, result in benchmarks.items():
+            print(f"  {size:<7} {name:<17} {result['median'] * 1000:10.2f} ms  ({result['entries']} 条)",
+                  file=sys.stderr)
+    return report
+
+
+def compare(report, baseline, threshold=DEFAULT_REGRESSION_THRESHOLD):
+    """逐项比较中位数耗时
+
+    Returns:
+        list: (规模, 名称, 基准耗时, 当前耗时, 比值, 是否变慢)，只包含双方都有的项目
+    """
+    rows = []
+    for size, size_report in report['sizes'].items():
+        baseline_benchmarks = baseline.get('sizes', {}).get(size, {}).get('benchmarks', {})
+        for name, result in size_report['benchmarks'].items():
+            baseline_result = baseline_benchmarks.get(name)
+            if baseline_result is None or not baseline_result['median']:
+                continue
+            ratio = result['median'] / baseline_result['median']
+            rows.append((size, name, baseline_result['median'], result['median'], ratio, ratio > threshold))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='提取器和保存函数的性能测试')
+    parser.add_argument('-o', '--output', default='benchmark_results.json', help='结果文件')
+    parser.add_argument('--sizes', default='small,medium', help=f"逗号分隔的规模：{', '.join(SIZES)}")
+    parser.add_argument('--repeat', type=int, default=3, help='每项测试的重复次数')
+    parser.add_argument('--backend', choices=BACKENDS, default='serial', help='提取执行后端')
+    parser.add_argument('--baseline', help='用于比较的基准结果文件，例如随仓库提交的 benchmarks/baseline.json')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_REGRESSION_THRESHOLD,
+                        help='耗时超过基准的该倍数时视为变慢')
+    parser.add_argument('--fail-on-regression', action='store_true', help='有项目变慢时返回非零退出码')
+    args = parser.parse_args(argv)
+
+    sizes = [size.strip() for size in args.sizes.split(',') if size.strip()]
+    unknown_sizes = [size for size in sizes if size not in SIZES]
+    if unknown_sizes:
+        parser.error(f"未知的规模: {', '.join(unknown_sizes)}")
+
+    report = run(sizes, args.repeat, args.backend)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False, sort_keys=True)
+    print(f"结果已写入 {args.output}", file=sys.stderr)
+
+    if not args.baseline:
+        return 0
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    rows = compare(report, baseline, args.threshold)
+    regressions = 0
+    print(f"{'规模':<8}{'项目':<18}{'基准(ms)':>12}{'当前(ms)':>12}{'比值':>8}")
+    for size, name, baseline_median, median, ratio, regressed in rows:
+        marker = '  变慢' if regressed else ''
+        print(f"{size:<8}{name:<18}{baseline_median * 1000:12.2f}{median * 1000:12.2f}{ratio:8.2f}{marker}")
+        regressions += regressed
+    if regressions:
+        print(f"{regressions} 个项目比基准慢 {args.threshold} 倍以上", file=sys.stderr)
+    return 1 if regressions and args.fail_on_regression else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,229 @@
+"""合成测试包生成器：按指定数量生成行为包和资源包，内容由随机种子决定，可重复生成
+
+用法:
+    python -m benchmarks.synthetic_pack <输出目录> [--entities 200] [--items 200] [--scripts 50]
+        [--minified-scripts 2] [--functions 100] [--lang-lines 2000] [--seed 0]
+"""
+import os
+import json
+import random
+import argparse
+from found import PackInfo
+
+WORDS = (
+    'ancient', 'blade', 'crystal', 'dragon', 'ember', 'frost', 'golden', 'hollow', 'iron', 'jade',
+    'knight', 'lunar', 'mystic', 'night', 'obsidian', 'phantom', 'quartz', 'raven', 'shadow', 'thunder',
+    'umbra', 'void', 'warden', 'xeno', 'yonder', 'zephyr',
+)
+CHINESE_WORDS = ('远古', '利刃', '水晶', '巨龙', '余烬', '寒霜', '黄金', '幽影')
+
+# 每个脚本文件中各类文本调用的数量
+SCRIPT_CALLS_PER_FILE = 40
+# 压缩脚本（单行）中重复的代码段数量
+MINIFIED_SEGMENTS = 2000
+# 每个 mcfunction 文件的行数
+FUNCTION_LINES = 30
+
+
+def _phrase(rng, words=3):
+    """生成一段随机文本，约十分之一为中文"""
+    if rng.random() < 0.1:
+        return ''.join(rng.choice(CHINESE_WORDS) for _ in range(words))
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+
+def _write_manifest(pack_dir, name, module_type):
+    os.makedirs(pack_dir, exist_ok=True)
+    manifest = {
+        'format_version': 2,
+        'header': {'name': name, 'uuid': '00000000-0000-0000-0000-000000000000', 'version': [1, 0, 0]},
+        'modules': [{'type': module_type, 'uuid': '00000000-0000-0000-0000-000000000001', 'version': [1, 0, 0]}],
+    }
+    with open(os.path.join(pack_dir, 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=4)
+
+
+def _entity_document(rng, index):
+    """实体定义：约一半带名称组件，约三分之一带 say 指令，其余组件用于模拟真实文件的体积"""
+    components = {
+        'minecraft:health': {'value': rng.randint(10, 100), 'max': 100},
+        'minecraft:movement': {'value': round(rng.random(), 3)},
+        'minecraft:collision_box': {'width': 0.6, 'height': 1.8},
+        'minecraft:behavior.random_stroll': {'priority': 6, 'speed_multiplier': 1.0},
+        'minecraft:behavior.look_at_player': {'priority': 7, 'look_distance': 6.0},
+        'minecraft:loot': {'table': f'loot_tables/entities/entity_{index}.json'},
+    }
+    if rng.random() < 0.5:
+        name = f'entity.bench:entity_{index}.name' if rng.random() < 0.2 else _phrase(rng)
+        components['minecraft:nameable'] = {'always_show': True, 'name': name}
+    events = {
+        f'bench:event_{event}': {'add': {'component_groups': [f'group_{event}']}}
+        for event in range(5)
+    }
+    if rng.random() < 0.33:
+        events['bench:announce'] = {
+            'sequence': [{'queue_command': {'command': [f'say {_phrase(rng)}', 'playsound random.orb @a']}}]
+        }
+    return {
+        'format_version': '1.16.0',
+        'minecraft:entity': {
+            'description': {'identifier': f'bench:entity_{index}', 'is_spawnable': True, 'is_summonable': True},
+            'component_groups': {f'group_{group}': {'minecraft:variant': {'value': group}} for group in range(5)},
+            'components': components,
+            'events': events,
+        },
+    }
+
+
+def _item_document(rng, index):
+    """物品定义：约七成带显示名称组件"""
+    components = {
+        'minecraft:max_stack_size': 64,
+        'minecraft:icon': {'texture': f'item_{index}'},
+        'minecraft:durability': {'max_durability': rng.randint(100, 2000)},
+    }
+    if rng.random() < 0.7:
+        value = f'item.bench:item_{index}.name' if rng.random() < 0.2 else _phrase(rng)
+        components['minecraft:display_name'] = {'value': value}
+    return {
+        'format_version': '1.20.0',
+        'minecraft:item': {
+            'description': {'identifier': f'bench:item_{index}', 'menu_category': {'category': 'equipment'}},
+            'components': components,
+        },
+    }
+
+
+def _script_calls(rng):
+    """生成各类文本调用，与 scripts.SCRIPT_PATTERN 匹配的五种写法各占一部分"""
+    calls = []
+    for _ in range(SCRIPT_CALLS_PER_FILE):
+        kind = rng.randrange(5)
+        if kind == 0:
+            calls.append(f'form.title("{_phrase(rng)}")')
+        elif kind == 1:
+            calls.append(f'form.button("{_phrase(rng)}", "textures/ui/icon")')
+        elif kind == 2:
+            calls.append(f'form.body("{_phrase(rng, 8)}")')
+        elif kind == 3:
+            calls.append(f'player.sendMessage(`{_phrase(rng, 5)}`)')
+        else:
+            calls.append(f'player.runCommand(\'titleraw @s actionbar {{"rawtext":[{{"text":"{_phrase(rng)}"}}]}}\')')
+    return calls
+
+
+def _script_source(rng, index):
+    lines = ['import { world, system } from "@minecraft/server";', '']
+    for call_index, call in enumerate(_script_calls(rng)):
+        lines.append(f'function handler_{index}_{call_index}(player, form) {{')
+        lines.append(f'    const value = Math.floor(Math.random() * {call_index + 10});')
+        lines.append(f'    if (value > 3) {{ {call}; }}')
+        lines.append('}')
+    return '\n'.join(lines) + '\n'
+
+
+def _minified_source(rng, index):
+    """单行的压缩脚本：大量代码段拼接在同一行中，文本调用散布其间"""
+    segments = []
+    calls = _script_calls(rng)
+    interval = MINIFIED_SEGMENTS // len(calls)
+    for segment in range(MINIFIED_SEGMENTS):
+        segments.append(f'var a{segment}=function(b,c){{return b*{segment}+c}}')
+        if segment % interval == 0 and calls:
+            segments.append(calls.pop())
+    return f'/* bundle {index} */' + ';'.join(segments) + ';\n'
+
+
+def _function_source(rng):
+    lines = []
+    for line_index in range(FUNCTION_LINES):
+        if line_index % 3 == 0:
+            lines.append(f'tellraw @a {{"rawtext":[{{"text":"{_phrase(rng, 4)}"}}]}}')
+        else:
+            lines.append(f'scoreboard players add @a bench_{line_index} {rng.randint(1, 9)}')
+    return '\n'.join(lines) + '\n'
+
+
+def generate_packs(root, entities=200, items=200, scripts=50, minified_scripts=2, functions=100, lang_lines=2000,
+                   seed=0):
+    """在 root 下生成一个行为包和一个资源包
+
+    Args:
+        root: 输出目录
+        entities: 实体定义文件数量
+        items: 物品定义文件数量
+        scripts: 普通脚本文件数量
+        minified_scripts: 单行压缩脚本数量
+        functions: mcfunction 文件数量
+        lang_lines: 语言文件中的条目行数
+        seed: 随机种子，相同参数和种子生成的内容完全相同
+
+    Returns:
+        tuple: (行为包 PackInfo, 资源包 PackInfo)
+    """
+    rng = random.Random(seed)
+    behavior_dir = os.path.join(root, 'Behavior_Packs', 'bench_bp')
+    resource_dir = os.path.join(root, 'Resource_Packs', 'bench_rp')
+    _write_manifest(behavior_dir, 'Benchmark BP', 'data')
+    _write_manifest(resource_dir, 'Benchmark RP', 'resources')
+
+    # 文件按每 50 个一组放入子目录，模拟真实包的目录结构
+    for index in range(entities):
+        _write_json(os.path.join(behavior_dir, 'entities', f'group_{index // 50}', f'entity_{index}.json'),
+                    _entity_document(rng, index))
+    for index in range(items):
+        _write_json(os.path.join(behavior_dir, 'items', f'group_{index // 50}', f'item_{index}.json'),
+                    _item_document(rng, index))
+    for index in range(scripts):
+        _write_text(os.path.join(behavior_dir, 'scripts', f'module_{index // 50}', f'script_{index}.js'),
+                    _script_source(rng, index))
+    for index in range(minified_scripts):
+        _write_text(os.path.join(behavior_dir, 'scripts', f'bundle_{index}.js'), _minified_source(rng, index))
+    for index in range(functions):
+        _write_text(os.path.join(behavior_dir, 'functions', f'group_{index // 50}', f'function_{index}.mcfunction'),
+                    _function_source(rng))
+
+    lang_lines_text = ['## Benchmark language file']
+    for index in range(lang_lines):
+        if index % 50 == 0:
+            lang_lines_text.append(f'## section {index // 50}')
+        lang_lines_text.append(f'bench.key_{index}.name={_phrase(rng)}')
+    _write_text(os.path.join(resource_dir, 'texts', 'en_US.lang'), '\n'.join(lang_lines_text) + '\n')
+
+    return (PackInfo('Benchmark BP', behavior_dir, 'behavior'),
+            PackInfo('Benchmark RP', resource_dir, 'resources'))
+
+
+def _write_json(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=4, ensure_ascii=False)
+
+
+def _write_text(path, text):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='生成用于性能测试的合成行为包和资源包')
+    parser.add_argument('root', help='输出目录')
+    parser.add_argument('--entities', type=int, default=200)
+    parser.add_argument('--items', type=int, default=200)
+    parser.add_argument('--scripts', type=int, default=50)
+    parser.add_argument('--minified-scripts', type=int, default=2)
+    parser.add_argument('--functions', type=int, default=100)
+    parser.add_argument('--lang-lines', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+    behavior_pack, resource_pack = generate_packs(
+        args.root, args.entities, args.items, args.scripts, args.minified_scripts, args.functions, args.lang_lines,
+        args.seed
+    )
+    print(behavior_pack.path)
+    print(resource_pack.path)
+
+
+if __name__ == '__main__':
+    main()
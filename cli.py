@@ -0,0 +1,218 @@
+"""命令行入口：不启动界面，扫描包并导出可翻译条目，或把翻译好的条目写回文件
+
+不导入 PyQt6 和 qfluentwidgets，启动迅速，可以在 CI 中并行运行多个任务。
+
+用法:
+    python cli.py scan <包或文件夹> [-o 输出文件] [--backend process] [--workers 0] [--index 索引目录]
+    python cli.py apply <导入文件> [--dry-run]
+    任一命令前加 --timing 时，把各阶段耗时输出到标准错误
+
+scan 每行输出一个 JSON 对象（JSON Lines），包含条目的全部字段、所属包的 pack、pack_type，
+以及区分位置相同的条目（压缩成一行的脚本、同一行中的多个文本）的 occurrence；
+apply 读取同样格式的文件（通常是修改过 value 的 scan 输出），按包重新扫描后只保存值发生变化的条目。
+"""
+import os
+import sys
+import argparse
+import orjson
+from found import PackInfo, scan_pack_folder, scan_packs
+from search_function.pipeline import scan_pack
+from search_function.executor import BACKENDS
+from search_function.scan_index import ScanIndex
+from services import timing
+
+
+def find_packs(path):
+    """找出路径下的包
+
+    依次尝试：路径本身是一个包；路径是应用文件夹（包含 Behavior_Packs / Resource_Packs）；
+    路径的各个子文件夹是包。
+
+    Args:
+        path: 包或文件夹路径
+
+    Returns:
+        list: PackInfo 列表
+    """
+    # 输出中记录绝对路径，导出的文件可以在任意工作目录下导入
+    path = os.path.abspath(path)
+    packs = scan_pack_folder(path, check_single_file=True)
+    if packs:
+        return packs
+    if any(os.path.isdir(os.path.join(path, name)) for name in ('Behavior_Packs', 'Resource_Packs')):
+        behavior_packs, resource_packs = scan_packs(app_folder=path, user_folder='')
+        return behavior_packs + resource_packs
+    return scan_pack_folder(path)
+
+
+def _entry_position(record):
+    """条目在文件中的位置；压缩成一行的脚本或同一行中的多个文本位置相同"""
+    json_path = record.get('json_path')
+    return (
+        record.get('type'),
+        record.get('filepath') or record.get('file'),
+        record.get('key'),
+        tuple(json_path) if json_path is not None else None,
+        record.get('line'),
+    )
+
+
+def _entry_identity(record):
+    """条目的唯一标识：位置加上在位置相同的条目中的序号，用于把导入的条目与重新扫描得到的条目对应起来"""
+    return _entry_position(record) + (record.get('occurrence', 0),)
+
+
+def _next_occurrence(entry, seen):
+    """按扫描顺序为位置相同的条目编号；同一文件的条目顺序固定，与执行后端无关"""
+    position = _entry_position(entry)
+    occurrence = seen.get(position, 0)
+    seen[position] = occurrence + 1
+    return occurrence
+
+
+def _open_output(output):
+    if output is None or output == '-':
+        return sys.stdout.buffer, False
+    return open(output, 'wb'), True
+
+
+def command_scan(args):
+    """扫描包并以 JSON Lines 格式逐批输出条目"""
+    packs = find_packs(args.path)
+    if not packs:
+        print(f"未找到任何包: {args.path}", file=sys.stderr)
+        return 1
+
+    out, should_close = _open_output(args.output)
+    total_count = 0
+    total_failed_count = 0
+    try:
+        for pack_info in packs:
+            header = {'pack': pack_info.path, 'pack_type': pack_info.type}
+            seen = {}
+
+            def write_batch(batch, header=header, seen=seen):
+                with timing.span('output'):
+                    out.write(b''.join(
+                        orjson.dumps({**header, **entry.to_dict(), 'occurrence': _next_occurrence(entry, seen)}) + b'\n'
+                        for entry in batch))
+                    out.flush()
+
+            with timing.operation('search', pack=pack_info.name, backend=args.backend):
+                index = None
+                if args.index:
+                    with timing.span('index'):
+                        index = ScanIndex.load_for_pack(args.index, pack_info)
+                results, failed_count = scan_pack(pack_info, index, backend_kind=args.backend,
+                                                  workers=args.workers, on_batch=write_batch)
+                if index is not None:
+                    with timing.span('write'):
+                        index.save()
+            total_count += len(results)
+            total_failed_count += failed_count
+            print(f"{pack_info.name}: {len(results)} 条，{failed_count} 个文件解析失败", file=sys.stderr)
+    finally:
+        if should_close:
+            out.close()
+
+    print(f"共 {len(packs)} 个包，{total_count} 条", file=sys.stderr)
+    return 1 if args.strict and total_failed_count else 0
+
+
+def command_apply(args):
+    """把导入文件中的条目写回对应的包，只保存值发生变化的条目"""
+    # 延迟导入：保存逻辑只在 apply 时需要
+    from save import main_save_logic
+    from save_function.transaction import recover_transactions
+
+    # 回滚上次运行中因崩溃而未完成的保存
+    recover_transactions()
+
+    records_by_pack = {}
+    record_lines = {}  # 条目标识 -> 所在行号，同一条目出现多次时拒绝导入
+    with open(args.file, 'rb') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = orjson.loads(line)
+            except orjson.JSONDecodeError as e:
+                print(f"第 {line_number} 行不是有效的JSON: {e}", file=sys.stderr)
+                return 1
+            if not record.get('pack') or record.get('pack_type') not in ('behavior', 'resources') or 'value' not in record:
+                print(f"第 {line_number} 行缺少 pack、pack_type 或 value 字段", file=sys.stderr)
+                return 1
+            identity = (record['pack'], record['pack_type']) + _entry_identity(record)
+            if identity in record_lines:
+                print(f"第 {line_number} 行与第 {record_lines[identity]} 行对应同一个条目", file=sys.stderr)
+                return 1
+            record_lines[identity] = line_number
+            records_by_pack.setdefault((record['pack'], record['pack_type']), []).append(record)
+
+    exit_code = 0
+    for (pack_path, pack_type), records in records_by_pack.items():
+        pack_info = PackInfo(os.path.basename(pack_path), pack_path, pack_type)
+        # 重新扫描，保存时使用文件的当前状态（包括文件指纹）
+        scan_result = scan_pack(pack_info)
+        seen = {}
+        current = {_entry_position(entry) + (_next_occurrence(entry, seen),): entry for entry in scan_result[0]}
+
+        items_to_save = []
+        not_found_count = 0
+        for record in records:
+            entry = current.get(_entry_identity(record))
+            if entry is None:
+                not_found_count += 1
+            elif entry['value'] != record['value']:
+                entry['value'] = record['value']
+                items_to_save.append(entry)
+
+        if not_found_count:
+            print(f"{pack_path}: {not_found_count} 个条目在包中已不存在", file=sys.stderr)
+            exit_code = 1
+        if not items_to_save:
+            print(f"{pack_path}: 没有需要保存的更改", file=sys.stderr)
+            continue
+        if args.dry_run:
+            print(f"{pack_path}: 将保存 {len(items_to_save)} 个条目", file=sys.stderr)
+            continue
+
+        success, message = main_save_logic(pack_info, items_to_save)
+        print(f"{pack_path}: {message}", file=sys.stderr)
+        if not success:
+            exit_code = 1
+    return exit_code
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description='扫描 Minecraft 基岩版 Addon 中的可翻译文本，或写回翻译')
+    parser.add_argument('--timing', action='store_true', help='把各阶段耗时输出到标准错误并写入日志')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    scan_parser = subparsers.add_parser('scan', help='扫描包并以 JSON Lines 格式输出条目')
+    scan_parser.add_argument('path', help='包文件夹、包含多个包的文件夹或应用文件夹')
+    scan_parser.add_argument('-o', '--output', help='输出文件，默认输出到标准输出')
+    scan_parser.add_argument('--backend', choices=BACKENDS, default='thread', help='提取执行后端')
+    scan_parser.add_argument('--workers', type=int, default=0, help='线程或进程数量，0 表示使用CPU核心数')
+    scan_parser.add_argument('--index', help='扫描索引目录，未修改的文件直接从索引读取')
+    scan_parser.add_argument('--strict', action='store_true', help='有文件解析失败时返回非零退出码')
+    scan_parser.set_defaults(func=command_scan)
+
+    apply_parser = subparsers.add_parser('apply', help='把导入文件中修改过的条目写回包')
+    apply_parser.add_argument('file', help='JSON Lines 格式的导入文件（scan 的输出格式）')
+    apply_parser.add_argument('--dry-run', action='store_true', help='只统计需要保存的条目，不写入文件')
+    apply_parser.set_defaults(func=command_apply)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.timing:
+        timing.set_enabled(True)
+        timing.add_listener(lambda report: print(timing.format_report(report), file=sys.stderr))
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
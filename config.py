@@ -1,5 +1,5 @@
 import os
-from qfluentwidgets import qconfig, QConfig, OptionsConfigItem, OptionsValidator, Theme, RangeConfigItem, RangeValidator, setThemeColor, ColorValidator
+from qfluentwidgets import qconfig, QConfig, ConfigItem, BoolValidator, OptionsConfigItem, OptionsValidator, Theme, RangeConfigItem, RangeValidator, setThemeColor, ColorValidator
 
 class ThemeSerializer:
     """ Theme 序列化器 """
@@ -56,6 +56,38 @@ class Config(QConfig):
         RangeValidator(1, 100)
     )
     
+    # 提取执行后端配置项：serial 单线程、thread 线程池、process 进程池（需手动开启）
+    extractBackend = OptionsConfigItem(
+        "Performance",
+        "ExtractBackend",
+        "thread",
+        OptionsValidator(["serial", "thread", "process"])
+    )
+    
+    # 提取线程/进程数量配置项，0 表示使用CPU核心数
+    extractWorkers = RangeConfigItem(
+        "Performance",
+        "ExtractWorkers",
+        0,
+        RangeValidator(0, 64)
+    )
+    
+    # 监视模式：查找完成后监视当前包的文件变化，只重新提取被外部修改的文件
+    watchFiles = ConfigItem(
+        "Performance",
+        "WatchFiles",
+        False,
+        BoolValidator()
+    )
+    
+    # 分阶段计时：记录查找、保存、导入等操作各阶段的耗时，写入日志
+    enableTiming = ConfigItem(
+        "Performance",
+        "EnableTiming",
+        False,
+        BoolValidator()
+    )
+    
     # App文件夹路径配置项
     appFolder = OptionsConfigItem(
         "Config",
@@ -102,7 +134,7 @@ def check_app_folder(cfg):
             return ""  # 如果默认路径也创建失败，直接返回空字符串
     
     # 检查并创建必要的子文件夹
-    sub_folders = ['Behavior_Packs', 'Resource_Packs', 'Addon', 'Temp']
+    sub_folders = ['Behavior_Packs', 'Resource_Packs', 'Addon', 'Temp', 'Index']
     for folder in sub_folders:
         sub_folder_path = os.path.join(app_folder, folder)
         try:
@@ -1,8 +1,8 @@
 import os
 import json5
 from dataclasses import dataclass
-from config import cfg  # 导入配置系统
 import shared  # 导入共享变量模块
+from services.log_service import log_warning
 
 
 def find_manifest_json(folder_path, max_depth=5):
@@ -81,9 +81,13 @@ def scan_pack_folder(folder_path, pack_type=None, check_single_file=False):
     return packs
 
 
-def scan_packs():
+def scan_packs(app_folder=None, user_folder=None):
     """扫描app文件夹和用户选择的文件夹中的行为包和资源包
     
+    Args:
+        app_folder: 应用文件夹路径，为 None 时使用配置中的路径
+        user_folder: 用户选择的文件夹路径，为 None 时使用 shared.user_folder
+    
     Returns:
         tuple: (behavior_packs, resource_packs) 两个列表，分别包含行为包和资源包的PackInfo对象
     """
@@ -94,8 +98,12 @@ def scan_packs():
     behavior_paths = set()
     resource_paths = set()
     
-    # 从配置中获取应用文件夹路径
-    app_folder = cfg.appFolder.value
+    # 未指定时从配置中获取应用文件夹路径；配置模块依赖 Qt，命令行模式下由调用方直接传入路径
+    if app_folder is None:
+        from config import cfg
+        app_folder = cfg.appFolder.value
+    if user_folder is None:
+        user_folder = shared.user_folder
     
     # 如果配置的路径无效，使用默认路径
     if not app_folder or not os.path.exists(app_folder):
@@ -120,15 +128,15 @@ def scan_packs():
     
     # 扫描用户选择的文件夹
     # 与translate.py中保持一致，分别扫描行为包和资源包，并使用check_single_file=True
-    if shared.user_folder:
+    if user_folder:
         # 添加用户文件夹中的行为包，避免重复
-        for pack in scan_pack_folder(shared.user_folder, 'behavior', check_single_file=True):
+        for pack in scan_pack_folder(user_folder, 'behavior', check_single_file=True):
             if pack.path not in behavior_paths:
                 behavior_packs.append(pack)
                 behavior_paths.add(pack.path)
         
         # 添加用户文件夹中的资源包，避免重复
-        for pack in scan_pack_folder(shared.user_folder, 'resources', check_single_file=True):
+        for pack in scan_pack_folder(user_folder, 'resources', check_single_file=True):
             if pack.path not in resource_paths:
                 resource_packs.append(pack)
                 resource_paths.add(pack.path)
@@ -172,5 +180,5 @@ def parse_manifest(manifest_path):
             
         return None
     except (OSError, json5.JSONDecodeError) as e:
-        print(f"Manifest解析错误: {manifest_path} - {e}")
+        log_warning("Manifest解析错误", file=manifest_path, error=e)
         return None
\ No newline at end of file
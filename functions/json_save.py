@@ -1,6 +1,7 @@
 import json
 import json5
 import os
+from services import timing
 
 def format_json_file(file_path, indent=4, ensure_ascii=False):
     """
@@ -26,18 +27,24 @@ def format_json_file(file_path, indent=4, ensure_ascii=False):
             return False, f"不是JSON文件: {file_path}"
         
         # 读取文件内容
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+        with timing.span('read'):
+            with open(file_path, 'r', encoding='utf-8') as f:
+                content = f.read()
+        # 文本模式读取，以字符数近似字节数
+        timing.count('bytes', len(content))
         
         # 使用json5解析内容
         try:
-            data = json5.loads(content)
+            with timing.span('parse'):
+                data = json5.loads(content)
         except Exception as e:
             return False, f"JSON5解析失败: {str(e)}"
         
         # 使用标准json库保存回原文件
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=indent, ensure_ascii=ensure_ascii)
+        with timing.span('write'):
+            with open(file_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=indent, ensure_ascii=ensure_ascii)
+        timing.count('files')
             
         return True, "文件已成功格式化"
         
@@ -1,6 +1,7 @@
 import os
 import zipfile
 import shutil
+from services import timing
 
 class ImportManager:
     """包导入管理类，负责包的导入操作"""
@@ -22,12 +23,18 @@ class ImportManager:
     
     def import_pack(self, file_name, find_manifest_json_func, parse_manifest_func):
         """导入包文件"""
+        with timing.operation('import', file=os.path.basename(file_name)):
+            timing.count('bytes', os.path.getsize(file_name))
+            return self._import_pack(file_name, find_manifest_json_func, parse_manifest_func)
+    
+    def _import_pack(self, file_name, find_manifest_json_func, parse_manifest_func):
         # 创建临时目录用于解压文件
         temp_dir = self.get_temp_dir()
         
         # 解压文件到临时目录
-        with zipfile.ZipFile(file_name, 'r') as zip_ref:
-            zip_ref.extractall(temp_dir)
+        with timing.span('unzip'):
+            with zipfile.ZipFile(file_name, 'r') as zip_ref:
+                zip_ref.extractall(temp_dir)
         
         # 查找manifest.json文件
         manifest_path = find_manifest_json_func(temp_dir)
@@ -59,7 +66,8 @@ class ImportManager:
             return False, "无效的包文件：未找到manifest.json文件"
         
         # 解析manifest.json文件
-        pack_info = parse_manifest_func(manifest_path)
+        with timing.span('parse'):
+            pack_info = parse_manifest_func(manifest_path)
         if not pack_info:
             return False, "无效的包文件：manifest.json文件格式错误"
         
@@ -77,8 +85,9 @@ class ImportManager:
         target_pack_dir = os.path.join(target_dir, os.path.basename(pack_dir))
         
         # 移动文件（先删除目标路径如果存在）
-        shutil.rmtree(target_pack_dir, ignore_errors=True)
-        shutil.move(pack_dir, target_pack_dir)
+        with timing.span('write'):
+            shutil.rmtree(target_pack_dir, ignore_errors=True)
+            shutil.move(pack_dir, target_pack_dir)
         
         # 清理临时目录
         self.clean_temp_dir()
@@ -87,6 +96,11 @@ class ImportManager:
     
     def import_mcaddon(self, file_name, find_manifest_json_func, parse_manifest_func):
         """导入mcaddon文件，解压并处理其中的多个包"""
+        with timing.operation('import', file=os.path.basename(file_name)):
+            timing.count('bytes', os.path.getsize(file_name))
+            return self._import_mcaddon(file_name, find_manifest_json_func, parse_manifest_func)
+    
+    def _import_mcaddon(self, file_name, find_manifest_json_func, parse_manifest_func):
         # 从基础目录获取应用文件夹路径
         app_folder = self.base_dir
         
@@ -109,8 +123,9 @@ class ImportManager:
                 os.remove(item_path)
         
         # 解压mcaddon到临时目录
-        with zipfile.ZipFile(file_name, 'r') as zip_ref:
-            zip_ref.extractall(temp_dir)
+        with timing.span('unzip'):
+            with zipfile.ZipFile(file_name, 'r') as zip_ref:
+                zip_ref.extractall(temp_dir)
         
         # 处理临时目录中的所有文件夹，查找行为包和资源包
         imported_behavior = 0
@@ -131,8 +146,9 @@ class ImportManager:
             os.makedirs(mcpack_temp_dir, exist_ok=True)
             
             # 解压mcpack文件到子临时目录
-            with zipfile.ZipFile(mcpack_file, 'r') as zip_ref:
-                zip_ref.extractall(mcpack_temp_dir)
+            with timing.span('unzip'):
+                with zipfile.ZipFile(mcpack_file, 'r') as zip_ref:
+                    zip_ref.extractall(mcpack_temp_dir)
             
             # 查找manifest.json
             manifest_path = find_manifest_json_func(mcpack_temp_dir, max_depth=3)
@@ -151,12 +167,11 @@ class ImportManager:
                         target_dir = os.path.join(resource_folder, os.path.basename(source_dir))
                         imported_resource += 1
                     
-                    # 如果目标目录已存在，先删除它
-                    if os.path.exists(target_dir):
-                        shutil.rmtree(target_dir)
-                    
-                    # 复制到目标目录
-                    shutil.copytree(source_dir, target_dir)
+                    # 如果目标目录已存在，先删除它，再复制到目标目录
+                    with timing.span('write'):
+                        if os.path.exists(target_dir):
+                            shutil.rmtree(target_dir)
+                        shutil.copytree(source_dir, target_dir)
         
         # 处理文件夹
         # 如果只有一个文件夹，可能需要进一步检查里面的内容
@@ -194,12 +209,11 @@ class ImportManager:
                         target_dir = os.path.join(resource_folder, os.path.basename(source_dir))
                         imported_resource += 1
                     
-                    # 如果目标目录已存在，先删除它
-                    if os.path.exists(target_dir):
-                        shutil.rmtree(target_dir)
-                    
-                    # 复制到目标目录
-                    shutil.copytree(source_dir, target_dir)
+                    # 如果目标目录已存在，先删除它，再复制到目标目录
+                    with timing.span('write'):
+                        if os.path.exists(target_dir):
+                            shutil.rmtree(target_dir)
+                        shutil.copytree(source_dir, target_dir)
         
         # 清理临时目录
         self.clean_temp_dir()
@@ -225,8 +239,9 @@ class ImportManager:
         os.makedirs(mcpack_temp_dir, exist_ok=True)
         
         # 解压mcpack文件到子临时目录
-        with zipfile.ZipFile(mcpack_file, 'r') as zip_ref:
-            zip_ref.extractall(mcpack_temp_dir)
+        with timing.span('unzip'):
+            with zipfile.ZipFile(mcpack_file, 'r') as zip_ref:
+                zip_ref.extractall(mcpack_temp_dir)
         
         # 查找manifest.json
         manifest_path = find_manifest_json_func(mcpack_temp_dir, max_depth=3)
@@ -245,9 +260,8 @@ class ImportManager:
                     target_dir = os.path.join(resource_folder, os.path.basename(source_dir))
                     imported_resource += 1
                 
-                # 如果目标目录已存在，先删除它
-                if os.path.exists(target_dir):
-                    shutil.rmtree(target_dir)
-                
-                # 复制到目标目录
-                shutil.copytree(source_dir, target_dir)
+                # 如果目标目录已存在，先删除它，再复制到目标目录
+                with timing.span('write'):
+                    if os.path.exists(target_dir):
+                        shutil.rmtree(target_dir)
+                    shutil.copytree(source_dir, target_dir)
@@ -1,11 +1,14 @@
 from PyQt6.QtCore import Qt
 from PyQt6.QtWidgets import QFrame, QWidget, QVBoxLayout, QHBoxLayout, QLabel
 from qfluentwidgets import SubtitleLabel, setFont, ComboBox, PushButton, ProgressBar, PrimaryPushButton, IndeterminateProgressBar
-from PyQt6.QtCore import QThread, pyqtSignal
+from PyQt6.QtCore import pyqtSignal
 import os
 import orjson
 from functions import format_json_file, show_message_bar
 from config import cfg
+from services import timing
+from services.background_task import BackgroundTask
+from services.task_scheduler import PRIORITY_BACKGROUND
 from found import scan_packs
 import shared  # 正确导入shared模块
 
@@ -316,7 +319,8 @@ class JsonFormatInterface(QFrame):
         self.progressBar.setValue(0)
 
 
-class JsonScanningThread(QThread):
+class JsonScanningThread(BackgroundTask):
+    priority = PRIORITY_BACKGROUND
     scanning_completed = pyqtSignal(list)  # 扫描完成信号，传递解析失败的文件列表
     
     def __init__(self, pack_path):
@@ -324,6 +328,10 @@ class JsonScanningThread(QThread):
         self.pack_path = pack_path
         
     def run(self):
+        with timing.operation('format_scan', pack=os.path.basename(self.pack_path)):
+            self._scan()
+    
+    def _scan(self):
         try:
             failed_json_files = []
             
@@ -335,9 +343,12 @@ class JsonScanningThread(QThread):
                         if file.endswith('.json'):
                             file_path = os.path.join(root, file)
                             try:
-                                with open(file_path, 'r', encoding='utf-8') as f:
-                                    content = f.read()
-                                orjson.loads(content)
+                                with timing.span('read'):
+                                    with open(file_path, 'r', encoding='utf-8') as f:
+                                        content = f.read()
+                                timing.count('files')
+                                with timing.span('parse'):
+                                    orjson.loads(content)
                             except Exception:
                                 failed_json_files.append(file_path)
             
@@ -349,9 +360,12 @@ class JsonScanningThread(QThread):
                         if file.endswith('.json'):
                             file_path = os.path.join(root, file)
                             try:
-                                with open(file_path, 'r', encoding='utf-8') as f:
-                                    content = f.read()
-                                orjson.loads(content)
+                                with timing.span('read'):
+                                    with open(file_path, 'r', encoding='utf-8') as f:
+                                        content = f.read()
+                                timing.count('files')
+                                with timing.span('parse'):
+                                    orjson.loads(content)
                             except Exception:
                                 failed_json_files.append(file_path)
             
@@ -362,7 +376,8 @@ class JsonScanningThread(QThread):
             print(f"Error in JsonScanningThread: {e}\n{traceback.format_exc()}")
             self.scanning_completed.emit([])
             
-class AllJsonScanningThread(QThread):
+class AllJsonScanningThread(BackgroundTask):
+    priority = PRIORITY_BACKGROUND
     json_files_found = pyqtSignal(list)  # 找到所有JSON文件的信号
     
     def __init__(self, pack_path):
@@ -370,15 +385,21 @@ class AllJsonScanningThread(QThread):
         self.pack_path = pack_path
         
     def run(self):
+        with timing.operation('format_scan', pack=os.path.basename(self.pack_path)):
+            self._scan()
+    
+    def _scan(self):
         try:
             all_json_files = []
             
             # 遍历整个包文件夹查找所有JSON文件
-            for root, _, files in os.walk(self.pack_path):
-                for file in files:
-                    if file.endswith('.json'):
-                        file_path = os.path.join(root, file)
-                        all_json_files.append(file_path)
+            with timing.span('walk'):
+                for root, _, files in os.walk(self.pack_path):
+                    for file in files:
+                        if file.endswith('.json'):
+                            file_path = os.path.join(root, file)
+                            all_json_files.append(file_path)
+            timing.count('files', len(all_json_files))
             
             # 发送找到的所有JSON文件
             self.json_files_found.emit(all_json_files)
@@ -388,7 +409,8 @@ class AllJsonScanningThread(QThread):
             self.json_files_found.emit([])
 
 
-class JsonFormattingThread(QThread):
+class JsonFormattingThread(BackgroundTask):
+    priority = PRIORITY_BACKGROUND
     progress_updated = pyqtSignal(int)  # 进度更新信号
     file_processing = pyqtSignal(str)   # 正在处理的文件信号
     formatting_completed = pyqtSignal(list)  # 格式化完成信号，传递失败文件列表
@@ -397,9 +419,12 @@ class JsonFormattingThread(QThread):
         super().__init__()
         self.pack_path = pack_path
         self.failed_json_files = failed_json_files
-        self.is_running = True
         
     def run(self):
+        with timing.operation('format', pack=os.path.basename(self.pack_path)):
+            self._format_files()
+    
+    def _format_files(self):
         try:
             if not self.failed_json_files:
                 self.formatting_completed.emit([])
@@ -410,7 +435,7 @@ class JsonFormattingThread(QThread):
             failed_files = []
             
             for file_path in self.failed_json_files:
-                if not self.is_running:
+                if self.cancel_token.cancelled:
                     break
                     
                 # 发送正在处理的文件名
@@ -433,11 +458,9 @@ class JsonFormattingThread(QThread):
             import traceback
             print(f"Error in JsonFormattingThread: {e}\n{traceback.format_exc()}")
             self.formatting_completed.emit([("Unknown error", str(e))])
-    
-    def stop(self):
-        self.is_running = False
         
-class FormatAllJsonThread(QThread):
+class FormatAllJsonThread(BackgroundTask):
+    priority = PRIORITY_BACKGROUND
     progress_updated = pyqtSignal(int)  # 进度更新信号
     file_processing = pyqtSignal(str)   # 正在处理的文件信号
     formatting_completed = pyqtSignal(list)  # 格式化完成信号，传递失败文件列表
@@ -445,9 +468,12 @@ class FormatAllJsonThread(QThread):
     def __init__(self, json_files):
         super().__init__()
         self.json_files = json_files
-        self.is_running = True
         
     def run(self):
+        with timing.operation('format'):
+            self._format_files()
+    
+    def _format_files(self):
         try:
             if not self.json_files:
                 self.formatting_completed.emit([])
@@ -458,7 +484,7 @@ class FormatAllJsonThread(QThread):
             failed_files = []
             
             for file_path in self.json_files:
-                if not self.is_running:
+                if self.cancel_token.cancelled:
                     break
                     
                 # 发送正在处理的文件名
@@ -467,9 +493,11 @@ class FormatAllJsonThread(QThread):
                 
                 # 先尝试使用orjson解析（效率高）
                 try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        content = f.read()
-                    orjson.loads(content)
+                    with timing.span('read'):
+                        with open(file_path, 'r', encoding='utf-8') as f:
+                            content = f.read()
+                    with timing.span('parse'):
+                        orjson.loads(content)
                     # orjson解析成功，使用format_json_file规范化
                     success, message = format_json_file(file_path)
                     if not success:
@@ -491,6 +519,3 @@ class FormatAllJsonThread(QThread):
             import traceback
             print(f"Error in FormatAllJsonThread: {e}\n{traceback.format_exc()}")
             self.formatting_completed.emit([("Unknown error", str(e))])
-    
-    def stop(self):
-        self.is_running = False
\ No newline at end of file
@@ -1,10 +1,20 @@
 import sys
+import multiprocessing
 from PyQt6.QtWidgets import QApplication
 from ui import MainWindow
+from services.task_scheduler import scheduler
+from save_function.transaction import recover_transactions
 def main():
+    # 回滚上次运行中因崩溃而未完成的保存
+    recover_transactions()
     app = QApplication(sys.argv)
     window = MainWindow()
     window.show()
-    sys.exit(app.exec())
+    exit_code = app.exec()
+    # 关闭共享的提取进程池
+    scheduler.shutdown()
+    sys.exit(exit_code)
 if __name__ == '__main__':
+    # 打包后的程序使用多进程提取时需要
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
@@ -2,9 +2,15 @@ import os
 import json5
 import json
 import shutil
+import itertools
+import traceback
 import threading
-from functions import format_json_file
-from services.log_service import log_error
+from contextlib import contextmanager
+from services import timing
+from services.log_service import log_error, log_warning
+from search_function.filter_index import TextFilterIndex
+from search_function.scan_index import STALE_FILE_MESSAGE
+from search_function.entry import Entry
 
 class PackManager:
     """包管理类，负责包的重命名和删除等操作"""
@@ -34,7 +40,8 @@ class PackManager:
                 with open(manifest_path, 'w', encoding='utf-8') as f:
                     json.dump(manifest_data, f, ensure_ascii=False, indent=4)
                 
-                # 格式化JSON文件（可选）
+                # 格式化JSON文件（可选）；functions 包会导入界面组件，只在需要时导入
+                from functions import format_json_file
                 format_json_file(manifest_path)
                 
                 return True, f"已重命名包为: {new_name}"
@@ -43,7 +50,7 @@ class PackManager:
         
         except Exception as e:
             error_msg = f"重命名包时出错: {str(e)}"
-            log_error(error_msg)
+            log_error("重命名包时出错", pack=pack_path, error=e)
             return False, error_msg
     
     def delete_pack(self, pack_path, pack_name):
@@ -57,79 +64,362 @@ class PackManager:
                 return False, f"找不到: {pack_name}"
         except Exception as e:
             error_msg = f"删除时出错：{str(e)}"
-            log_error(error_msg)
+            log_error("删除包时出错", pack=pack_path, error=e)
             return False, error_msg
 
+class _PackShard:
+    """单个包的数据分片：条目、过滤索引、脏集合和扫描代数，由分片自己的锁保护
+
+    entries 只会在末尾追加；替换文件条目等结构性修改会生成新的列表再发布，
+    因此读取方拿到的列表（及其已有的前缀）始终是一个一致的快照，无需加锁。
+    """
+    __slots__ = ('id', 'identifier_field', 'lock', 'entries', 'filter_index', 'dirty', 'generation')
+
+    def __init__(self, shard_id, identifier_field):
+        self.id = shard_id
+        self.identifier_field = identifier_field
+        self.lock = threading.Lock()
+        self.entries = None  # 尚未开始扫描时为 None
+        self.filter_index = None
+        self.dirty = {}  # 被修改的条目：编号 -> [数据中的索引, 原始值]
+        self.generation = 0
+
 class TranslationDataStore:
-    """集中存储所有类型的翻译数据"""
+    """集中存储所有类型的翻译数据
+    
+    每个包对应一个分片，分配一个整数编号，写入只锁定该包自己的分片：
+    多个包的并行扫描、界面中的编辑互不阻塞。读取数据直接返回已发布的条目列表（快照），不加锁。
+    条目以 Entry 对象存储，并分配全局唯一的整数编号，可按编号直接取得；表格和保存逻辑直接使用同一批对象。
+    被修改过的条目按包记录在脏集合中（编号 -> 索引和原始值），保存、关闭前的提示和
+    “仅显示已修改”都只需要访问这些条目，与包中的条目总数无关。
+    """
     
     def __init__(self):
-        self._data = {}  # 按包ID存储数据
-        self._modified = {}  # 跟踪修改状态
-        self._lock = threading.Lock()
+        self._shards = {}  # (包类型, 包路径) -> _PackShard
+        self._shards_lock = threading.Lock()  # 只在创建分片时使用
+        self._shard_ids = itertools.count(1)
+        # 条目编号 -> Entry；字典的单次读写和计数器取值本身是原子的，不需要锁
+        self._entries = {}
+        self._entry_ids = itertools.count()
+    
+    def _shard(self, pack_info, create=False):
+        """返回包的分片，不存在且 create 为 False 时返回 None"""
+        key = (pack_info.type, pack_info.path)
+        shard = self._shards.get(key)
+        if shard is None and create:
+            with self._shards_lock:
+                shard = self._shards.get(key)
+                if shard is None:
+                    identifier_field = 'key' if pack_info.type == 'resources' else 'filename'
+                    shard = self._shards[key] = _PackShard(next(self._shard_ids), identifier_field)
+        return shard
+    
+    @contextmanager
+    def transaction(self, pack_info):
+        """写事务：锁定包的分片（不存在时创建）并交给调用方，在其中完成的一批修改对其他写入方是原子的
+        
+        只锁定这一个包，其余包的读写不受影响。事务中不要再调用本存储的其他写方法，否则会死锁。
+        """
+        shard = self._shard(pack_info, create=True)
+        with shard.lock:
+            yield shard
+    
+    def pack_id(self, pack_info):
+        """包的整数编号，尚未存储过数据时返回 None"""
+        shard = self._shard(pack_info)
+        return shard.id if shard is not None else None
+    
+    def _release_entries(self, shard):
+        """移除分片中旧条目的编号，调用方需持有分片的锁"""
+        entries = self._entries
+        for entry in shard.entries or ():
+            entries.pop(entry.id, None)
+    
+    def _register_entries(self, entries):
+        """为条目分配编号"""
+        registry = self._entries
+        entry_ids = self._entry_ids
+        for entry in entries:
+            entry.id = next(entry_ids)
+            registry[entry.id] = entry
     
     def store_search_results(self, pack_info, results):
-        """存储搜索结果"""
-        pack_id = f"{pack_info.type}:{pack_info.path}"
-        with self._lock:
-            self._data[pack_id] = results
-            self._modified[pack_id] = False
+        """存储搜索结果，并为其建立过滤索引"""
+        identifier_field = 'key' if pack_info.type == 'resources' else 'filename'
+        results = [result if isinstance(result, Entry) else Entry.from_dict(result) for result in results]
+        # 在锁外建立索引，避免阻塞界面线程的读取
+        with timing.span('filter'):
+            filter_index = TextFilterIndex(results, identifier_field)
+        self._register_entries(results)
+        with self.transaction(pack_info) as shard:
+            self._release_entries(shard)
+            shard.entries = results
+            shard.dirty = {}
+            shard.filter_index = filter_index
+            shard.generation += 1
+    
+    def begin_results(self, pack_info):
+        """开始接收新的扫描结果：清空该包的旧数据，之后通过 append_results 逐批追加
+        
+        Returns:
+            int: 本次扫描的代数，追加结果时传入
+        """
+        with self.transaction(pack_info) as shard:
+            self._release_entries(shard)
+            # 发布新的空列表，之前取得旧列表的读取方不受影响
+            shard.entries = []
+            shard.dirty = {}
+            shard.filter_index = TextFilterIndex([], shard.identifier_field)
+            shard.generation += 1
+            return shard.generation
+    
+    def append_results(self, pack_info, results, generation=None):
+        """追加一批扫描结果并更新过滤索引
+        
+        Args:
+            pack_info: 包信息对象
+            results: Entry 列表，追加后会被分配编号
+            generation: begin_results 返回的扫描代数，与当前代数不符时丢弃这批结果
+        
+        Returns:
+            int: 这批结果中第一条的索引；结果被丢弃时返回 None
+        """
+        with self.transaction(pack_info) as shard:
+            if generation is not None and generation != shard.generation:
+                return None
+            if shard.entries is None:
+                shard.entries = []
+            data = shard.entries
+            start = len(data)
+            self._register_entries(results)
+            data.extend(results)
+            if shard.filter_index is not None:
+                with timing.span('filter'):
+                    shard.filter_index.extend(results)
+            return start
+    
+    def replace_file_entries(self, pack_info, source, entries, generation=None):
+        """用重新提取的条目替换某个文件的全部条目，其余条目（包括未保存的修改）保持不变
+
+        同一文件的条目在数据中是连续的：数量不变时原位替换并沿用原来的编号，
+        数量变化时在原位置拼接；行为包中原来没有条目的文件追加到末尾。
+        替换后的数据作为新的列表发布，之前取得的列表保持不变。
+
+        Args:
+            pack_info: 包信息对象
+            source: 文件标识，行为包为完整路径（条目的 filepath），资源包为相对路径（条目的 file）
+            entries: 重新提取的 Entry 列表，文件被删除时为空列表
+            generation: 监视开始时的扫描代数，与当前代数不符时不做修改
+
+        Returns:
+            tuple: (起始索引, 被替换的条目数)；没有需要修改的条目时返回 None
+        """
+        source_field = 'file' if pack_info.type == 'resources' else 'filepath'
+        shard = self._shard(pack_info)
+        if shard is None:
+            return None
+        with shard.lock:
+            if generation is not None and generation != shard.generation:
+                return None
+            data = shard.entries
+            if data is None:
+                return None
+
+            start = next((i for i, entry in enumerate(data) if entry.get(source_field) == source), None)
+            if start is None:
+                if not entries or pack_info.type == 'resources':
+                    return None
+                start = stop = len(data)
+            else:
+                stop = start + 1
+                while stop < len(data) and data[stop].get(source_field) == source:
+                    stop += 1
+
+            # 被替换的条目以磁盘上的新内容为准，其未保存的修改随之丢弃
+            self._splice_dirty(shard, start, stop, len(entries) - (stop - start))
+            filter_index = shard.filter_index
+            if len(entries) == stop - start:
+                for row, entry in enumerate(entries, start):
+                    entry.id = data[row].id
+                    self._entries[entry.id] = entry
+                    if filter_index is not None:
+                        filter_index.update_value(row, entry.get(filter_index.identifier_field), entry['value'])
+            else:
+                for entry in data[start:stop]:
+                    self._entries.pop(entry.id, None)
+                self._register_entries(entries)
+                if filter_index is not None:
+                    filter_index.splice(start, stop, entries)
+            shard.entries = data[:start] + entries + data[stop:]
+            return start, stop - start
+
+    def has_data(self, pack_info):
+        """检查指定包是否已有扫描结果"""
+        shard = self._shard(pack_info)
+        return shard is not None and shard.entries is not None
     
     def get_data(self, pack_info):
-        """获取指定包的数据"""
-        pack_id = f"{pack_info.type}:{pack_info.path}"
-        with self._lock:
-            return self._data.get(pack_id, [])
+        """获取指定包的数据（不加锁）
+        
+        返回的列表之后只可能在末尾追加新的条目，已有的部分不会改变；
+        重新扫描或文件条目被替换时存储会发布新的列表，需要最新数据时重新获取。
+        """
+        shard = self._shard(pack_info)
+        if shard is None or shard.entries is None:
+            return []
+        return shard.entries
+    
+    def get_entry(self, entry_id):
+        """按编号获取条目，不存在时返回 None"""
+        return self._entries.get(entry_id)
+    
+    def filter_data(self, pack_info, search_text, start=0, stop=None):
+        """返回标识符或值中包含搜索文本的条目索引列表，只匹配 [start, stop) 范围内的条目"""
+        shard = self._shard(pack_info)
+        if shard is None:
+            return []
+        # 扫描过程中索引仍在追加，查询需要持有该包的锁
+        with shard.lock:
+            if shard.filter_index is None:
+                return []
+            return shard.filter_index.query(search_text, start, stop)
     
     def update_item(self, pack_info, item_index, new_value):
-        """更新特定项的值"""
-        pack_id = f"{pack_info.type}:{pack_info.path}"
-        with self._lock:
-            if pack_id in self._data and 0 <= item_index < len(self._data[pack_id]):
-                self._data[pack_id][item_index]['value'] = new_value
-                self._modified[pack_id] = True
-                return True
-            return False
+        """更新特定项的值，并记录到脏集合中；改回原始值时从脏集合中移除"""
+        return bool(self.update_items(pack_info, ((item_index, new_value),)))
+    
+    def update_items(self, pack_info, updates):
+        """在一个写事务中批量更新多个条目的值（例如粘贴大量翻译）
+        
+        Args:
+            pack_info: 包信息对象
+            updates: (条目索引, 新值) 的可迭代对象，索引超出范围的项被忽略
+        
+        Returns:
+            list: 实际更新了的条目索引；新值与当前值相同的条目不算更新，也不记入脏集合
+        """
+        updated = []
+        shard = self._shard(pack_info)
+        if shard is None:
+            return updated
+        with shard.lock:
+            data = shard.entries
+            if data is None:
+                return updated
+            dirty = shard.dirty
+            filter_index = shard.filter_index
+            for item_index, new_value in updates:
+                if not 0 <= item_index < len(data):
+                    continue
+                item = data[item_index]
+                if item['value'] == new_value:
+                    continue
+                record = dirty.get(item.id)
+                if record is None:
+                    dirty[item.id] = [item_index, item['value']]
+                elif record[1] == new_value:
+                    del dirty[item.id]
+                item['value'] = new_value
+                if filter_index is not None:
+                    filter_index.update_value(item_index, item.get(filter_index.identifier_field), new_value)
+                updated.append(item_index)
+        return updated
+    
+    @staticmethod
+    def _splice_dirty(shard, start, stop, delta):
+        """[start, stop) 的条目被替换时移除其脏记录，并平移之后条目的索引，调用方需持有分片的锁"""
+        dirty = shard.dirty
+        if not dirty:
+            return
+        for entry_id, record in list(dirty.items()):
+            if start <= record[0] < stop:
+                del dirty[entry_id]
+            elif record[0] >= stop:
+                record[0] += delta
     
     def is_modified(self, pack_info):
-        """检查指定包的数据是否已修改"""
-        pack_id = f"{pack_info.type}:{pack_info.path}"
-        with self._lock:
-            return self._modified.get(pack_id, False)
+        """检查指定包的数据是否有未保存的修改"""
+        shard = self._shard(pack_info)
+        return shard is not None and bool(shard.dirty)
     
-    def reset_modified_status(self, pack_info):
-        """重置修改状态"""
-        pack_id = f"{pack_info.type}:{pack_info.path}"
-        with self._lock:
-            self._modified[pack_id] = False
+    def has_unsaved_changes(self):
+        """是否有任何包存在未保存的修改"""
+        return any(shard.dirty for shard in list(self._shards.values()))
+    
+    def modified_count(self, pack_info):
+        """指定包中未保存的修改条目数"""
+        shard = self._shard(pack_info)
+        return len(shard.dirty) if shard is not None else 0
+    
+    def modified_indices(self, pack_info):
+        """已修改的条目在数据中的索引，按升序排列"""
+        shard = self._shard(pack_info)
+        if shard is None:
+            return []
+        with shard.lock:
+            return sorted(record[0] for record in shard.dirty.values())
+    
+    def update_fingerprints(self, pack_info, fingerprints):
+        """保存写入文件后更新该包中这些文件的条目所记录的指纹，下次保存时不会被误判为文件已被外部修改
+
+        Args:
+            pack_info: 包信息对象
+            fingerprints: 文件绝对路径到新指纹的字典
+        """
+        shard = self._shard(pack_info)
+        if shard is None or not fingerprints:
+            return
+        with shard.lock:
+            for entry in shard.entries or ():
+                if 'fingerprint' not in entry:
+                    continue
+                fingerprint = fingerprints.get(os.path.abspath(entry['filepath']))
+                if fingerprint is not None:
+                    entry['fingerprint'] = fingerprint
+    
+    def reset_modified_status(self, pack_info, items=None):
+        """重置修改状态（保存成功后调用），items 为已保存的条目，为 None 时清空整个包的脏集合"""
+        shard = self._shard(pack_info)
+        if shard is None:
+            return
+        with shard.lock:
+            if items is None:
+                shard.dirty = {}
+                return
+            for item in items:
+                shard.dirty.pop(item.id, None)
     
     def get_modified_items(self, pack_info):
-        """获取已修改的项目"""
-        pack_id = f"{pack_info.type}:{pack_info.path}"
-        
-        with self._lock:
-            if pack_id not in self._data:
+        """获取已修改的条目，按在数据中的顺序排列"""
+        shard = self._shard(pack_info)
+        if shard is None:
+            return []
+        with shard.lock:
+            data = shard.entries
+            if not data or not shard.dirty:
                 return []
-            
-            # 返回所有项目，保存函数将决定哪些需要保存
-            return self._data[pack_id]
+            return [data[index] for index in sorted(record[0] for record in shard.dirty.values())]
 
 # 创建全局实例
 translation_store = TranslationDataStore()
 
 def main_save_logic(pack_info, items_to_save):
     """主保存逻辑，根据不同类型的项目选择不同的保存方法"""
+    with timing.operation('save', pack=pack_info.name):
+        return _save_by_type(pack_info, items_to_save)
+
+def _save_by_type(pack_info, items_to_save):
     try:
         # **修复点**: 优先使用传入的 items_to_save 列表
-        # 如果 items_to_save 为 None (旧的调用方式)，则从 store 获取数据以保持兼容
+        # 如果 items_to_save 为 None，则保存翻译存储中该包的全部已修改条目
         if items_to_save is not None:
             all_items = items_to_save
         else:
-            # 旧逻辑：获取所有标记为已修改的包的项目（可能包含未修改项）
             all_items = translation_store.get_modified_items(pack_info)
         
         if not all_items:
             return True, "没有需要保存的更改"
+        timing.count('entries', len(all_items))
             
         # 导入各种保存函数
         from save_function.save_lang import save_lang_entries
@@ -137,6 +427,10 @@ def main_save_logic(pack_info, items_to_save):
         from save_function.save_scripts import save_script_entries
         from save_function.save_entities import save_entity_entries
         from save_function.save_functions import save_mcfunction_entries  # 导入新的保存函数
+        from save_function.transaction import SaveTransaction
+        
+        # 所有文件的新内容先登记到同一个事务中，全部处理完且没有错误时才一并写入
+        transaction = SaveTransaction()
         
         # 根据类型分组
         items_by_type = {}
@@ -146,26 +440,29 @@ def main_save_logic(pack_info, items_to_save):
                 items_by_type[item_type] = []
             items_by_type[item_type].append(item)
         
-        # 调用不同的保存函数
+        # 调用不同的保存函数；saved_items 记录交给保存函数处理的条目，保存成功后只清除这些条目的修改状态
         success_count = 0
         error_messages = []
+        saved_items = []
         
         # 处理资源包语言文件
         if pack_info.type == 'resources' and 'language_entry' in items_by_type:
-            success, count, message = save_lang_entries(pack_info, items_by_type['language_entry'])
+            success, count, message = save_lang_entries(pack_info, items_by_type['language_entry'], transaction)
+            saved_items.extend(items_by_type['language_entry'])
             if success:
                 success_count += count
             else:
-                log_error(f"保存语言文件失败: {message}")
+                log_error("保存语言文件失败", detail=message, pack=pack_info.path, phase='save')
                 error_messages.append(message)
         
         # 处理行为包物品名称
         if pack_info.type == 'behavior' and 'item_name' in items_by_type:
-            success, count, message = save_item_entries(pack_info, items_by_type['item_name'])
+            success, count, message = save_item_entries(pack_info, items_by_type['item_name'], transaction)
+            saved_items.extend(items_by_type['item_name'])
             if success:
                 success_count += count
             else:
-                log_error(f"保存物品名称失败: {message}")
+                log_error("保存物品名称失败", detail=message, pack=pack_info.path, phase='save')
                 error_messages.append(message)
         
         # 处理所有类型的脚本条目 - 改进版本
@@ -177,49 +474,72 @@ def main_save_logic(pack_info, items_to_save):
                 script_entries.extend(items_by_type[script_type])
         
         if script_entries:
-            success, count, message = save_script_entries(pack_info, script_entries)
+            success, count, message = save_script_entries(pack_info, script_entries, transaction)
+            saved_items.extend(script_entries)
             if success:
                 success_count += count
             else:
-                log_error(f"保存脚本失败: {message}")
+                log_error("保存脚本失败", detail=message, pack=pack_info.path, phase='save')
                 error_messages.append(message)
                 
-        # 处理实体say命令
-        if pack_info.type == 'behavior' and 'say' in items_by_type:
-            success, count, message = save_entity_entries(pack_info, items_by_type['say'])
+        # 处理实体名称和say命令，同一文件中的两类条目一起写回
+        entity_entries = items_by_type.get('entity_name', []) + items_by_type.get('say', [])
+        if pack_info.type == 'behavior' and entity_entries:
+            success, count, message = save_entity_entries(pack_info, entity_entries, transaction)
+            saved_items.extend(entity_entries)
             if success:
                 success_count += count
             else:
-                log_error(f"保存实体say命令失败: {message}")
+                log_error("保存实体条目失败", detail=message, pack=pack_info.path, phase='save')
                 error_messages.append(message)
         
         # 处理mcfunction文件中的rawtext文本
         if pack_info.type == 'behavior' and 'mcfunction_text' in items_by_type:
-            success, count, message = save_mcfunction_entries(pack_info, items_by_type['mcfunction_text'])
+            success, count, message = save_mcfunction_entries(pack_info, items_by_type['mcfunction_text'], transaction)
+            saved_items.extend(items_by_type['mcfunction_text'])
             if success:
                 success_count += count
             else:
-                log_error(f"保存mcfunction失败: {message}")
+                log_error("保存mcfunction失败", detail=message, pack=pack_info.path, phase='save')
                 error_messages.append(message)
         
-        # 组合结果消息
+        # 组合结果消息；有任何错误时放弃整个事务，所有文件保持原样
         if error_messages:
+            transaction.discard()
+            # 文件已过期的错误排在最前，界面据此提示重新查找
+            error_messages.sort(key=lambda message: not message.startswith(STALE_FILE_MESSAGE))
             error_msg = "、".join(error_messages[:3])
             if len(error_messages) > 3:
                 error_msg += f"...等{len(error_messages)}个错误"
-            return success_count > 0, f"保存了{success_count}个项目，但有错误: {error_msg}"
+            return False, f"保存失败，所有文件均未修改: {error_msg}"
+
+        try:
+            transaction.commit()
+        except OSError as e:
+            log_error("写入文件失败，已回滚", detail=traceback.format_exc(), pack=pack_info.path, phase='save', error=e)
+            return False, f"写入文件失败，所有文件均未修改: {e}"
+
+        # 记录写入后的文件指纹：存储中同一文件的全部条目，以及不在存储中的传入条目（如命令行导入）
+        translation_store.update_fingerprints(pack_info, transaction.fingerprints)
+        for item in saved_items:
+            if 'fingerprint' in item:
+                fingerprint = transaction.fingerprints.get(os.path.abspath(item['filepath']))
+                if fingerprint is not None:
+                    item['fingerprint'] = fingerprint
+
+        # 保存成功后只把实际写入的条目移出脏集合；该包类型不支持保存的条目保持已修改状态
+        if len(saved_items) < len(all_items):
+            log_warning("部分条目的类型不支持保存，保持未保存状态", pack=pack_info.path, phase='save',
+                        count=len(all_items) - len(saved_items))
+        translation_store.reset_modified_status(pack_info, saved_items)
+        if pack_info.type == 'resources':
+            return True, "成功保存语言文件"
+        elif pack_info.type == 'behavior':
+            return True, f"成功保存了{success_count}个项目"
         else:
-            # 保存成功后重置修改状态
-            translation_store.reset_modified_status(pack_info)
-            if pack_info.type == 'resources':
-                return True, "成功保存语言文件"
-            elif pack_info.type == 'behavior':
-                return True, f"成功保存了{success_count}个项目"
-            else:
-                return True, "保存成功"
+            return True, "保存成功"
     
     except Exception as e:
-        import traceback
         error_msg = f"保存过程中出错: {str(e)}\n{traceback.format_exc()}"
-        log_error(error_msg)
+        log_error("保存过程中出错", detail=traceback.format_exc(), pack=pack_info.path, phase='save', error=e)
         return False, error_msg
\ No newline at end of file
@@ -1,17 +1,24 @@
 import os
-import json
+import orjson
 import traceback
+from services import timing
+from search_function.scan_index import file_fingerprint, STALE_FILE_MESSAGE
+from search_function.json_rules import RULES_BY_TYPE
+from save_function.transaction import run_in_transaction
 
-def save_entity_entries(pack_info, entity_entries):
-    """保存实体条目，如say命令等
+def save_entity_entries(pack_info, entity_entries, transaction=None):
+    """保存实体条目（实体名称和say命令），写回的值由对应的提取规则还原
     
     Args:
         pack_info: 包信息对象
         entity_entries: 实体条目列表
+        transaction: 保存事务，修改后的文件交给它统一写入；为 None 时单独创建并提交
     
     Returns:
         tuple: (成功状态, 保存数量, 消息)
     """
+    if transaction is None:
+        return run_in_transaction(save_entity_entries, pack_info, entity_entries)
     success_count = 0
     errors = []
     
@@ -19,7 +26,8 @@ def save_entity_entries(pack_info, entity_entries):
         # 按文件路径分组，使用filepath而不是filename
         entries_by_filepath = {}
         for entry in entity_entries:
-            if entry['type'] != 'say':
+            rule = RULES_BY_TYPE.get(entry['type'])
+            if rule is None or rule.kind != 'entities':
                 continue
                 
             filepath = entry.get('filepath')
@@ -33,14 +41,27 @@ def save_entity_entries(pack_info, entity_entries):
         
         # 处理每个文件
         for filepath, file_entries in entries_by_filepath.items():
-            # 使用第一个条目的完整数据
             if not file_entries:
                 continue
+            if not os.path.exists(filepath):
+                errors.append(f"找不到实体文件: {file_entries[0].get('filename', '未知')}")
+                continue
                 
-            # 获取完整数据
-            full_data = file_entries[0].get('full_data')
-            if not full_data:
-                errors.append(f"缺少完整数据: {file_entries[0].get('filename', '未知')}")
+            # 条目只记录文件指纹，保存时重新读取文件，并确认文件在查找之后没有被修改
+            try:
+                with timing.span('read'):
+                    with open(filepath, 'rb') as f:
+                        content = f.read()
+                        current_fingerprint = file_fingerprint(os.fstat(f.fileno()))
+                timing.count('bytes', len(content))
+                fingerprint = file_entries[0].get('fingerprint')
+                if fingerprint is not None and list(fingerprint) != current_fingerprint:
+                    # 条目已过期，其余文件的结果也不可信，直接失败并提示重新查找
+                    return False, 0, f"{STALE_FILE_MESSAGE}: {file_entries[0].get('filename', '未知')}"
+                with timing.span('parse'):
+                    full_data = orjson.loads(content)
+            except Exception as e:
+                errors.append(f"读取文件时出错: {str(e)}")
                 continue
                 
             # 标记文件是否被修改
@@ -59,9 +80,8 @@ def save_entity_entries(pack_info, entity_entries):
                     current_data = full_data
                     for i, key in enumerate(json_path):
                         if i == len(json_path) - 1:
-                            # 最后一个路径元素是命令在数组中的索引
-                            # 修改为 "say " + 新值
-                            current_data[key] = f"say {entry['value']}"
+                            # 按规则加回提取时去掉的前缀，如 say 命令的 "say "
+                            current_data[key] = RULES_BY_TYPE[entry['type']].to_raw(entry['value'])
                             file_modified = True
                             success_count += 1
                         else:
@@ -71,19 +91,14 @@ def save_entity_entries(pack_info, entity_entries):
                     errors.append(f"修改条目时出错: {str(e)}")
                     continue
                     
-            # 如果文件被修改，保存回文件
+            # 如果文件被修改，交给事务，提交时写回文件
             if file_modified:
-                try:
-                    with open(filepath, 'w', encoding='utf-8') as f:
-                        json.dump(full_data, f, ensure_ascii=False, indent=4)
-                except Exception as e:
-                    errors.append(f"保存文件时出错: {str(e)}")
-                    success_count = 0  # 如果保存失败，重置成功计数
+                transaction.write_json(filepath, full_data)
         
         if errors:
-            return len(errors) < len(entity_entries), success_count, "、".join(errors[:3])
+            return False, success_count, "、".join(errors[:3])
         else:
-            return True, success_count, f"成功保存了 {success_count} 个实体命令"
+            return True, success_count, f"成功保存了 {success_count} 个实体条目"
             
     except Exception as e:
         return False, 0, f"保存实体条目时出错: {str(e)}\n{traceback.format_exc()}"
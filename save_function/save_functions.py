@@ -1,17 +1,24 @@
 import os
 import re
 import traceback
+from services import timing
+from services.log_service import log_error
+from search_function.scan_index import STALE_FILE_MESSAGE
+from save_function.transaction import run_in_transaction
 
-def save_mcfunction_entries(pack_info, mcfunction_entries):
+def save_mcfunction_entries(pack_info, mcfunction_entries, transaction=None):
     """保存mcfunction文件中的rawtext文本条目
     
     Args:
         pack_info: 包信息对象
         mcfunction_entries: mcfunction条目列表
+        transaction: 保存事务，修改后的文件交给它统一写入；为 None 时单独创建并提交
     
     Returns:
         tuple: (成功状态, 保存数量, 消息)
     """
+    if transaction is None:
+        return run_in_transaction(save_mcfunction_entries, pack_info, mcfunction_entries)
     success_count = 0
     errors = []
     
@@ -39,11 +46,13 @@ def save_mcfunction_entries(pack_info, mcfunction_entries):
                 
             try:
                 # 读取文件内容
-                with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-                    content = f.readlines()
+                with timing.span('read'):
+                    with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
+                        content = f.readlines()
                 
-                # 标记文件是否被修改
+                # 标记文件是否被修改；与原始行比较时使用修改前的内容，同一行中可能有多个条目
                 file_modified = False
+                original_content = list(content)
                 
                 # 按行号排序，从后往前处理，避免行号偏移
                 sorted_entries = sorted(file_entries, key=lambda x: x.get('line', 0), reverse=True)
@@ -57,37 +66,42 @@ def save_mcfunction_entries(pack_info, mcfunction_entries):
                         errors.append(f"行号无效: {line_number}")
                         continue
                     
-                    current_line = content[line_number - 1].strip()
+                    current_line = original_content[line_number - 1].strip()
                     
-                    # 检查当前行是否与记录的原始行匹配
-                    if original_line and original_line in current_line:
-                        # 构建替换模式，精确替换text字段的值
-                        pattern = r'("text"\s*:\s*")([^"]*)(")'
-                        
-                        # 使用正则表达式替换text值
-                        new_line = re.sub(
-                            pattern,
-                            lambda m: f'{m.group(1)}{new_value}{m.group(3)}',
-                            content[line_number - 1]
-                        )
-                        
-                        # 如果替换后的行与原行不同，则更新内容
-                        if new_line != content[line_number - 1]:
-                            content[line_number - 1] = new_line
-                            file_modified = True
-                            success_count += 1
+                    # 检查当前行是否与记录的原始行匹配，不匹配说明文件在查找后已被修改，直接失败
+                    if not original_line or original_line not in current_line:
+                        return False, 0, f"{STALE_FILE_MESSAGE}: {entry.get('filename', '未知')} 第 {line_number} 行"
+                    
+                    # 构建替换模式，精确替换text字段的值
+                    pattern = r'("text"\s*:\s*")([^"]*)(")'
+                    
+                    # 使用正则表达式替换text值
+                    new_line, replaced = re.subn(
+                        pattern,
+                        lambda m: f'{m.group(1)}{new_value}{m.group(3)}',
+                        content[line_number - 1]
+                    )
+                    if not replaced:
+                        errors.append(f"第 {line_number} 行中找不到text字段: {entry.get('filename', '未知')}")
+                        continue
+                    
+                    # 如果替换后的行与原行不同，则更新内容；相同说明文件中已是该值
+                    if new_line != content[line_number - 1]:
+                        content[line_number - 1] = new_line
+                        file_modified = True
+                    success_count += 1
                 
-                # 如果文件被修改，保存回文件
+                # 如果文件被修改，交给事务，提交时写回文件
                 if file_modified:
-                    with open(filepath, 'w', encoding='utf-8') as f:
-                        f.writelines(content)
+                    transaction.write_text(filepath, ''.join(content))
             
             except Exception as e:
                 errors.append(f"处理文件 {filepath} 时出错: {str(e)}")
-                print(traceback.format_exc())
+                log_error("保存mcfunction文件时出错", detail=traceback.format_exc(), file=filepath, phase='save',
+                          error=e)
         
         if errors:
-            return len(errors) < len(mcfunction_entries), success_count, "、".join(errors[:3])
+            return False, success_count, "、".join(errors[:3])
         else:
             return True, success_count, f"成功保存了 {success_count} 个mcfunction文本"
             
@@ -1,63 +1,87 @@
 import os
-import json
+import orjson
 import traceback
+from services import timing
+from services.log_service import log_error
+from search_function.scan_index import file_fingerprint, STALE_FILE_MESSAGE
+from save_function.transaction import run_in_transaction
 
-def save_item_entries(pack_info, items):
+def save_item_entries(pack_info, items, transaction=None):
     """
     保存物品名称的修改
     
     Args:
         pack_info: 包信息对象
         items: 要保存的物品列表
+        transaction: 保存事务，修改后的文件交给它统一写入；为 None 时单独创建并提交
     
     Returns:
         tuple: (是否成功, 保存成功的数量, 错误消息)
     """
+    if transaction is None:
+        return run_in_transaction(save_item_entries, pack_info, items)
     success_count = 0
     errors = []
     
+    # 按文件路径分组，同一文件中的所有修改应用后只序列化和写入一次
+    items_by_filepath = {}
     for item in items:
+        # 只处理物品名称类型的条目
+        if item['type'] != 'item_name':
+            continue
+        filepath = item.get('filepath')
+        if not filepath:
+            errors.append(f"找不到物品文件: {item.get('filename', '未知')}")
+            continue
+        items_by_filepath.setdefault(filepath, []).append(item)
+    
+    for filepath, file_items in items_by_filepath.items():
+        if not os.path.exists(filepath):
+            errors.append(f"找不到物品文件: {file_items[0].get('filename', '未知')}")
+            continue
+        
+        # 条目只记录文件指纹，保存时重新读取文件，并确认文件在查找之后没有被修改
         try:
-            # 只处理物品名称类型的条目
-            if item['type'] != 'item_name':
-                continue
-                
-            # 获取文件路径和完整数据
-            filepath = item.get('filepath')
-            if not filepath or not os.path.exists(filepath):
-                errors.append(f"找不到物品文件: {item.get('filename', '未知')}")
-                continue
-                
-            # 获取完整的JSON数据和修改路径
-            full_data = item.get('full_data')
+            with timing.span('read'):
+                with open(filepath, 'rb') as f:
+                    content = f.read()
+                    current_fingerprint = file_fingerprint(os.fstat(f.fileno()))
+            timing.count('bytes', len(content))
+            fingerprint = file_items[0].get('fingerprint')
+            if fingerprint is not None and list(fingerprint) != current_fingerprint:
+                # 条目已过期，其余文件的结果也不可信，直接失败并提示重新查找
+                return False, 0, f"{STALE_FILE_MESSAGE}: {file_items[0].get('filename', '未知')}"
+            with timing.span('parse'):
+                full_data = orjson.loads(content)
+        except Exception as e:
+            errors.append(f"读取物品文件 {file_items[0].get('filename', '未知')} 时出错: {str(e)}")
+            log_error("保存物品时出错", detail=traceback.format_exc(), file=filepath, phase='save', error=e)
+            continue
+        
+        # 在内存中应用该文件的全部修改
+        file_modified = False
+        for item in file_items:
             json_path = item.get('json_path')
-            
-            if not full_data or not json_path:
-                errors.append(f"缺少完整数据或JSON路径: {item.get('filename', '未知')}")
+            if not json_path:
+                errors.append(f"缺少JSON路径: {item.get('filename', '未知')}")
                 continue
-            
-            # 应用修改
-            current_data = full_data
-            for i, key in enumerate(json_path):
-                if i == len(json_path) - 1:
-                    current_data[key] = item['value']
-                else:
+            try:
+                current_data = full_data
+                for key in json_path[:-1]:
                     current_data = current_data[key]
-            
-            # 保存回文件
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(full_data, f, ensure_ascii=False, indent=4)
-            
-            success_count += 1
-            
-        except Exception as e:
-            error_message = f"保存物品 {item.get('key', '未知')} 时出错: {str(e)}"
-            errors.append(error_message)
-            print(error_message)
-            print(traceback.format_exc())
+                current_data[json_path[-1]] = item['value']
+                file_modified = True
+                success_count += 1
+            except Exception as e:
+                error_message = f"保存物品 {item.get('key', '未知')} 时出错: {str(e)}"
+                errors.append(error_message)
+                log_error("保存物品时出错", detail=traceback.format_exc(), file=filepath, phase='save', error=e)
+        
+        # 交给事务，提交时与其他文件并行序列化并写回
+        if file_modified:
+            transaction.write_json(filepath, full_data)
     
     if errors:
-        return len(errors) < len(items), success_count, "、".join(errors[:3])
+        return False, success_count, "、".join(errors[:3])
     
     return True, success_count, "成功保存物品名称"
-
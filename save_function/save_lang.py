@@ -1,16 +1,21 @@
 import os
 import threading
+from services import timing
+from save_function.transaction import run_in_transaction
 
-def save_lang_entries(pack_info, lang_entries):
+def save_lang_entries(pack_info, lang_entries, transaction=None):
     """保存语言文件条目
     
     Args:
         pack_info: 包信息对象
         lang_entries: 语言条目列表
+        transaction: 保存事务，修改后的文件交给它统一写入；为 None 时单独创建并提交
     
     Returns:
         tuple: (成功状态, 保存数量, 消息)
     """
+    if transaction is None:
+        return run_in_transaction(save_lang_entries, pack_info, lang_entries)
     success_count = 0
     errors = []
     
@@ -29,7 +34,7 @@ def save_lang_entries(pack_info, lang_entries):
         
         # 处理每个语言文件
         for lang_file_name, file_entries in entries_by_lang_file.items():
-            file_count, file_errors = _process_lang_file(pack_info.path, lang_file_name, file_entries)
+            file_count, file_errors = _process_lang_file(pack_info.path, lang_file_name, file_entries, transaction)
             success_count += file_count
             errors.extend(file_errors)
             
@@ -42,7 +47,7 @@ def save_lang_entries(pack_info, lang_entries):
         import traceback
         return False, 0, f"保存语言条目时出错: {str(e)}\n{traceback.format_exc()}"
 
-def _process_lang_file(base_path, lang_file_name, entries):
+def _process_lang_file(base_path, lang_file_name, entries, transaction):
     """处理单个语言文件，优化为严格按key替换value，保留注释和空行，支持value中有等号"""
     success_count = 0
     errors = []
@@ -61,8 +66,9 @@ def _process_lang_file(base_path, lang_file_name, entries):
     lines = []
     if os.path.exists(lang_file_path):
         try:
-            with open(lang_file_path, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
+            with timing.span('read'):
+                with open(lang_file_path, 'r', encoding='utf-8') as f:
+                    lines = f.readlines()
         except Exception as e:
             return 0, [f"读取文件失败: {lang_file_path}, 错误: {e}"]
 
@@ -96,11 +102,7 @@ def _process_lang_file(base_path, lang_file_name, entries):
             new_lines.append(f"{key}={new_value}\n")
             success_count += 1
 
-    # 保存文件
-    try:
-        with open(lang_file_path, 'w', encoding='utf-8') as f:
-            f.writelines(new_lines)
-    except Exception as e:
-        return 0, [f"保存文件失败: {lang_file_path}, 错误: {e}"]
+    # 交给事务，提交时写回文件
+    transaction.write_text(lang_file_path, ''.join(new_lines))
 
     return success_count, errors
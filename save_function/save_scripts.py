@@ -1,17 +1,22 @@
 import os
 import re
 import traceback
+from services import timing
+from save_function.transaction import run_in_transaction
 
-def save_script_entries(pack_info, script_entries):
+def save_script_entries(pack_info, script_entries, transaction=None):
     """保存脚本条目 - 改进版本
     
     Args:
         pack_info: 包信息对象
         script_entries: 脚本条目列表
+        transaction: 保存事务，修改后的文件交给它统一写入；为 None 时单独创建并提交
     
     Returns:
         tuple: (成功状态, 保存数量, 消息)
     """
+    if transaction is None:
+        return run_in_transaction(save_script_entries, pack_info, script_entries)
     success_count = 0
     errors = []
     
@@ -26,7 +31,7 @@ def save_script_entries(pack_info, script_entries):
         
         # 逐个文件处理
         for filepath, entries in files_to_process.items():
-            file_success, file_errors = _process_file_entries(filepath, entries)
+            file_success, file_errors = _process_file_entries(filepath, entries, transaction)
             success_count += file_success
             errors.extend(file_errors)
                 
@@ -40,7 +45,7 @@ def save_script_entries(pack_info, script_entries):
     except Exception as e:
         return False, 0, f"保存脚本条目时出错: {str(e)}\n{traceback.format_exc()}"
 
-def _process_file_entries(filepath, entries):
+def _process_file_entries(filepath, entries, transaction):
     """处理单个文件的所有条目"""
     success_count = 0
     errors = []
@@ -52,8 +57,9 @@ def _process_file_entries(filepath, entries):
             
         # 读取整个文件内容作为字符串
         try:
-            with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read()
+            with timing.span('read'):
+                with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
+                    content = f.read()
         except Exception as e:
             errors.append(f"读取文件 {filepath} 时出错: {str(e)}")
             return 0, errors
@@ -84,15 +90,9 @@ def _process_file_entries(filepath, entries):
             except Exception as e:
                 errors.append(f"处理条目时出错 (行 {entry.get('line')}): {str(e)}")
         
-        # 只有在内容发生变化时才写入文件
+        # 只有在内容发生变化时才交给事务，提交时写回文件
         if content != original_content:
-            try:
-                with open(filepath, 'w', encoding='utf-8') as f:
-                    f.write(content)
-            except Exception as e:
-                errors.append(f"保存文件 {filepath} 时出错: {str(e)}")
-                # 如果写入失败，重置成功计数，因为实际上没有成功保存
-                return 0, errors
+            transaction.write_text(filepath, content)
                 
     except Exception as e:
         errors.append(f"处理文件 {filepath} 时出错: {str(e)}")
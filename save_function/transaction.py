@@ -0,0 +1,376 @@
+"""保存事务：一次保存涉及的所有文件要么全部写入新内容，要么全部保持原样
+
+各保存函数不再直接打开目标文件写入，而是把新内容交给事务，全部处理完后统一提交：
+1. 在日志中记录将要创建的临时文件和备份（状态 preparing）
+2. 在 io 池中并行把每个文件的新内容（JSON 数据在这一步才序列化）写入同一目录下的临时文件并 fsync，
+   同时为已存在的目标文件建立备份（硬链接，不支持时复制）
+3. 日志标记为 prepared，记录每个目标文件实际的备份
+4. 依次用 os.replace 把临时文件替换为目标文件；中途出错时用备份恢复已替换的文件
+5. 日志标记为已提交，删除备份和日志
+
+日志保存在用户数据目录中（程序目录可能是只读的）。程序在第 2 步崩溃时，下次启动调用 recover_transactions
+删除留下的临时文件和备份；在第 4 步崩溃时按日志回滚，包中不会留下只写了一半的文件。
+"""
+import os
+import json
+import uuid
+import shutil
+from services import timing
+from services.log_service import log_warning, log_error
+from services.task_scheduler import scheduler, PRIORITY_INTERACTIVE
+from search_function.scan_index import file_fingerprint
+
+APP_DATA_NAME = 'MinecraftAddonToolkit'
+
+
+def _user_data_dir():
+    """当前用户可写的数据目录：Windows 为 %LOCALAPPDATA%，其他系统为 $XDG_STATE_HOME 或 ~/.local/state"""
+    if os.name == 'nt':
+        base = os.environ.get('LOCALAPPDATA') or os.path.join(os.path.expanduser('~'), 'AppData', 'Local')
+    else:
+        base = os.environ.get('XDG_STATE_HOME') or os.path.join(os.path.expanduser('~'), '.local', 'state')
+    return os.path.join(base, APP_DATA_NAME)
+
+
+JOURNAL_DIR = os.path.join(_user_data_dir(), 'journal')
+
+# 日志中的状态
+STATE_PREPARING = 'preparing'
+STATE_PREPARED = 'prepared'
+STATE_COMMITTED = 'committed'
+
+
+class _JsonContent:
+    """登记时尚未序列化的 JSON 数据，提交时在 io 池中序列化"""
+    __slots__ = ('data',)
+
+    def __init__(self, data):
+        self.data = data
+
+    def encode(self):
+        return _encode_text(json.dumps(self.data, ensure_ascii=False, indent=4))
+
+
+def _encode_text(text, encoding='utf-8'):
+    """换行符与以文本模式写入时相同，转换为系统的换行符"""
+    if os.linesep != '\n':
+        text = text.replace('\n', os.linesep)
+    return text.encode(encoding)
+
+
+class _FileWrite:
+    """事务中的一个目标文件"""
+    __slots__ = ('path', 'temp', 'backup_path', 'backup')
+
+    def __init__(self, path, transaction_id):
+        directory, name = os.path.split(path)
+        self.path = path
+        self.temp = os.path.join(directory, f'.{name}.{transaction_id}.tmp')
+        self.backup_path = os.path.join(directory, f'.{name}.{transaction_id}.bak')
+        # 实际建立的备份，目标文件原本不存在时为 None
+        self.backup = None
+
+    def to_dict(self, state):
+        # preparing 状态下备份可能正在建立，记录将要使用的路径以便清理
+        backup = self.backup_path if state == STATE_PREPARING else self.backup
+        return {'path': self.path, 'temp': self.temp, 'backup': backup}
+
+
+def _fsync_directory(directory):
+    """把目录项的变化（新建、改名）刷入磁盘；Windows 不支持打开目录，跳过"""
+    if os.name == 'nt':
+        return
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _remove(path):
+    if path:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def _prepare(write, data):
+    """写入临时文件并 fsync，为已存在的目标文件建立备份"""
+    if isinstance(data, _JsonContent):
+        data = data.encode()
+    with open(write.temp, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    if os.path.exists(write.path):
+        # 保留原文件的权限
+        shutil.copymode(write.path, write.temp)
+        try:
+            os.link(write.path, write.backup_path)
+        except OSError:
+            shutil.copy2(write.path, write.backup_path)
+        write.backup = write.backup_path
+
+
+class SaveTransaction:
+    """一次保存的写事务
+
+    用法：
+        transaction = SaveTransaction()
+        transaction.write_text(path, content)
+        ...
+        transaction.commit()
+
+    提交之前所有内容只保存在内存中，放弃事务（discard 或不调用 commit）不会修改任何文件。
+    同一文件多次写入时以最后一次为准；应把一个文件的修改全部应用后再登记，每个文件只序列化一次。
+    """
+
+    def __init__(self, journal_dir=None):
+        self.id = uuid.uuid4().hex[:12]
+        self.journal_dir = journal_dir or JOURNAL_DIR
+        self._contents = {}  # 目标路径 -> 新内容（bytes 或 _JsonContent）
+        self._finished = False
+        # 提交成功后各目标文件（绝对路径）的新指纹，用于更新条目中记录的指纹
+        self.fingerprints = {}
+
+    def __len__(self):
+        return len(self._contents)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.discard()
+
+    def write_bytes(self, path, data):
+        """登记文件的新内容"""
+        if self._finished:
+            raise RuntimeError("事务已结束")
+        self._contents[os.path.abspath(path)] = data
+
+    def write_text(self, path, text, encoding='utf-8'):
+        """登记文件的新内容（文本）；换行符与以文本模式写入时相同，转换为系统的换行符"""
+        self.write_bytes(path, _encode_text(text, encoding))
+
+    def write_json(self, path, data):
+        """登记文件的新内容（JSON 数据，缩进 4 格）；提交时才在 io 池中与其他文件并行序列化"""
+        self.write_bytes(path, _JsonContent(data))
+
+    def discard(self):
+        """放弃事务，不修改任何文件"""
+        self._contents.clear()
+        self._finished = True
+
+    def commit(self):
+        """把登记的全部文件写入磁盘，全部成功或全部保持原样
+
+        Returns:
+            int: 写入的文件数
+
+        Raises:
+            OSError: 写入失败，所有文件已恢复为提交前的内容；个别文件未能恢复时保留日志，下次启动时恢复
+        """
+        if self._finished:
+            raise RuntimeError("事务已结束")
+        self._finished = True
+        contents, self._contents = self._contents, {}
+        if not contents:
+            return 0
+
+        writes = [_FileWrite(path, self.id) for path in contents]
+        with timing.span('write'):
+            self._write_journal(STATE_PREPARING, writes)
+            self._prepare_all(writes, contents)
+            self._write_journal(STATE_PREPARED, writes)
+            replaced = []
+            try:
+                for write in writes:
+                    os.replace(write.temp, write.path)
+                    replaced.append(write)
+            except BaseException:
+                # 有文件未能恢复时保留日志，下次启动时再次回滚
+                if _rollback(writes, replaced):
+                    _remove(self._journal_path())
+                raise
+            for directory in {os.path.dirname(write.path) for write in writes}:
+                _fsync_directory(directory)
+            # 全部替换完成，此后即使崩溃也不再回滚
+            self._write_journal(STATE_COMMITTED, writes)
+            for write in writes:
+                _remove(write.backup)
+            _remove(self._journal_path())
+            self.fingerprints = _fingerprints(writes)
+        timing.count('files', len(writes))
+        return len(writes)
+
+    def _prepare_all(self, writes, contents):
+        """在 io 池中并行写入所有临时文件；任一文件失败时删除已写入的临时文件、备份和日志"""
+        pool = scheduler.io_pool()
+        futures = [pool.submit(_prepare, write, contents[write.path], priority=PRIORITY_INTERACTIVE)
+                   for write in writes]
+        error = None
+        for future in futures:
+            try:
+                future.result()
+            except Exception as e:
+                if error is None:
+                    error = e
+        if error is not None:
+            if _remove_files(writes):
+                _remove(self._journal_path())
+            raise error
+
+    def _journal_path(self):
+        return os.path.join(self.journal_dir, f'{self.id}.json')
+
+    def _write_journal(self, state, writes):
+        """写入日志：先写临时文件并 fsync，再替换，日志本身也不会只写一半"""
+        os.makedirs(self.journal_dir, exist_ok=True)
+        path = self._journal_path()
+        temp = path + '.tmp'
+        data = json.dumps({'state': state, 'files': [write.to_dict(state) for write in writes]}, ensure_ascii=False)
+        with open(temp, 'w', encoding='utf-8') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp, path)
+        _fsync_directory(self.journal_dir)
+
+
+def _fingerprints(writes):
+    """读取已写入文件的新指纹；个别文件读取失败时不记录，其条目下次保存时会提示重新查找"""
+    fingerprints = {}
+    for write in writes:
+        try:
+            fingerprints[write.path] = file_fingerprint(os.stat(write.path))
+        except OSError as e:
+            log_warning("读取保存后的文件指纹失败", file=write.path, phase='save', error=e)
+    return fingerprints
+
+
+def _remove_files(writes):
+    """删除临时文件和备份，返回是否全部删除成功"""
+    ok = True
+    for write in writes:
+        for path in (write.temp, write.backup_path):
+            try:
+                _remove(path)
+            except OSError as e:
+                ok = False
+                log_error("删除保存临时文件失败", file=path, phase='save', error=e)
+    return ok
+
+
+def _rollback(writes, replaced):
+    """恢复已被替换的文件，删除其余的临时文件和备份
+
+    某个文件恢复失败时记录错误并继续恢复其余文件。
+
+    Returns:
+        bool: 是否全部恢复成功
+    """
+    failed = set()
+    for write in replaced:
+        try:
+            if write.backup:
+                os.replace(write.backup, write.path)
+            else:
+                # 原本不存在的文件
+                _remove(write.path)
+        except OSError as e:
+            failed.add(write.path)
+            log_error("回滚保存失败，文件未能恢复", file=write.path, backup=write.backup, phase='save', error=e)
+    # 未能恢复的文件保留备份，供下次启动时恢复
+    removed = _remove_files([write for write in writes if write.path not in failed])
+    return removed and not failed
+
+
+def _recover_record(state, record):
+    """按日志中的一条记录恢复目标文件并清理临时文件和备份"""
+    temp, backup, path = record['temp'], record.get('backup'), record['path']
+    if state == STATE_COMMITTED:
+        _remove(backup)
+    elif state == STATE_PREPARING or os.path.exists(temp):
+        # 尚未替换，目标文件仍是原内容
+        _remove(temp)
+        _remove(backup)
+    elif backup:
+        # 备份已不存在时说明该文件已经恢复过
+        if os.path.exists(backup):
+            os.replace(backup, path)
+    else:
+        _remove(path)
+
+
+def recover_transactions(journal_dir=None):
+    """回滚上次运行中未完成的保存事务，程序启动时调用
+
+    某个文件恢复失败时记录错误并继续处理其余文件，该事务的日志保留到下次启动时再次处理。
+
+    Args:
+        journal_dir: 日志目录，为 None 时使用 JOURNAL_DIR
+
+    Returns:
+        int: 被回滚的事务数
+    """
+    journal_dir = journal_dir or JOURNAL_DIR
+    if not os.path.isdir(journal_dir):
+        return 0
+    rolled_back = 0
+    for name in os.listdir(journal_dir):
+        path = os.path.join(journal_dir, name)
+        if not name.endswith('.json'):
+            # 未写完的日志：上一个状态的日志仍然存在
+            _remove(path)
+            continue
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                journal = json.load(f)
+            state = journal.get('state')
+            files = journal['files']
+        except Exception as e:
+            log_error("读取保存日志失败", file=path, error=e)
+            continue
+        ok = True
+        for record in files:
+            try:
+                _recover_record(state, record)
+            except Exception as e:
+                ok = False
+                log_error("回滚保存事务失败", file=record.get('path'), journal=path, error=e)
+        if not ok:
+            continue
+        if state != STATE_COMMITTED:
+            rolled_back += 1
+            log_warning("已回滚未完成的保存", file=path, files=len(files))
+        _remove(path)
+    return rolled_back
+
+
+def run_in_transaction(saver, pack_info, entries):
+    """单独调用保存函数（例如性能测试）时为其创建事务，处理完且没有错误时提交
+
+    Returns:
+        tuple: 与保存函数相同的 (成功状态, 保存数量, 消息)
+    """
+    transaction = SaveTransaction()
+    success, count, message = saver(pack_info, entries, transaction)
+    if not success:
+        # 有任何条目出错时放弃事务，所有文件保持原样
+        transaction.discard()
+        return False, 0, message
+    try:
+        transaction.commit()
+    except OSError as e:
+        log_error("写入文件失败，已回滚", phase='save', error=e)
+        return False, 0, f"写入文件失败，所有文件均未修改: {e}"
+    return success, count, message
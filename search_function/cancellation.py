@@ -0,0 +1,30 @@
+import threading
+
+
+class ScanCancelled(Exception):
+    """扫描被取消时抛出，用于从遍历和提取过程中尽快退出"""
+
+
+class CancelToken:
+    """协作式取消标记
+
+    由发起扫描的一方持有并调用 cancel()，遍历、提取和执行后端在处理每个目录、
+    文件或批次前检查该标记，被取消时抛出 ScanCancelled。
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        """请求取消扫描"""
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        """是否已请求取消"""
+        return self._event.is_set()
+
+    def raise_if_cancelled(self):
+        """已请求取消时抛出 ScanCancelled"""
+        if self._event.is_set():
+            raise ScanCancelled()
@@ -0,0 +1,92 @@
+import sys
+
+# 条目可能包含的全部字段，各提取器只会设置其中一部分
+ENTRY_FIELDS = (
+    'type',            # 条目类型，如 language_entry、item_name、script_title
+    'value',           # 可翻译的文本
+    'key',             # 语言键或物品、实体的标识
+    'filename',        # 文件名
+    'filepath',        # 文件完整路径
+    'file',            # 相对包根目录的路径（语言文件）
+    'line',            # 行号
+    'has_chinese',     # 值是否包含中文
+    'lang_file_name',  # 语言文件名
+    'json_path',       # JSON 文件中值所在的路径
+    'fingerprint',     # 提取时的文件指纹 [mtime_ns, 大小]
+    'cmd_index',       # say 指令在命令数组中的索引
+    'original_line',   # mcfunction 中值所在的原始行
+)
+
+# 在大量条目间重复出现的字符串字段，驻留后同一文件的条目共享同一个字符串对象
+_INTERNED_FIELDS = ('type', 'filename', 'filepath', 'file', 'lang_file_name')
+_FIELD_SET = frozenset(ENTRY_FIELDS)
+
+
+class Entry:
+    """单个翻译条目
+
+    使用 __slots__ 存储字段，内存占用远小于同样内容的字典。
+    同时支持字典式访问（entry['value']、entry.get('line')、'json_path' in entry），
+    提取器、翻译存储、表格和保存函数可以共享同一个对象而无需转换或复制。
+    未设置的字段视为不存在。
+
+    Attributes:
+        id: 翻译存储分配的整数编号，未放入存储时为 -1
+    """
+
+    __slots__ = ('id',) + ENTRY_FIELDS
+
+    def __init__(self, entry_id=-1, **fields):
+        self.id = entry_id
+        for name, value in fields.items():
+            self[name] = value
+
+    @classmethod
+    def from_dict(cls, data, entry_id=-1):
+        """由提取器产出的字典创建条目，重复的字符串会被驻留"""
+        entry = cls(entry_id)
+        for name, value in data.items():
+            entry[name] = value
+        return entry
+
+    def __getitem__(self, name):
+        if name not in _FIELD_SET:
+            raise KeyError(name)
+        try:
+            return getattr(self, name)
+        except AttributeError:
+            raise KeyError(name) from None
+
+    def __setitem__(self, name, value):
+        if name not in _FIELD_SET:
+            raise KeyError(name)
+        if name in _INTERNED_FIELDS and type(value) is str:
+            value = sys.intern(value)
+        elif name == 'json_path' or name == 'fingerprint':
+            # 元组比列表更紧凑，且保存时只需要读取
+            value = tuple(value)
+        setattr(self, name, value)
+
+    def __contains__(self, name):
+        return name in _FIELD_SET and hasattr(self, name)
+
+    def get(self, name, default=None):
+        """与 dict.get 相同"""
+        if name not in _FIELD_SET:
+            return default
+        return getattr(self, name, default)
+
+    def keys(self):
+        """已设置的字段名"""
+        return [name for name in ENTRY_FIELDS if hasattr(self, name)]
+
+    def items(self):
+        """已设置的 (字段名, 值)"""
+        return [(name, getattr(self, name)) for name in ENTRY_FIELDS if hasattr(self, name)]
+
+    def to_dict(self):
+        """转换为字典，用于序列化"""
+        return dict(self.items())
+
+    def __repr__(self):
+        return f"Entry(id={self.id}, {self.to_dict()!r})"
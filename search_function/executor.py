@@ -0,0 +1,138 @@
+import os
+import traceback
+from services import timing
+from services.log_service import log_warning
+from services.task_scheduler import scheduler, PRIORITY_NORMAL
+
+BACKENDS = ('serial', 'thread', 'process')
+
+# 待提取文件少于该数量时不启动进程池，避免进程启动开销超过提取本身
+PROCESS_MIN_FILES = 32
+# 每个批次的最大文件数
+MAX_CHUNK_SIZE = 64
+
+
+def _run_batch(func, paths, cancel_token=None):
+    """在工作线程或子进程中处理一批文件，异常转为文本以便跨进程传回
+
+    传入 cancel_token 时每个文件前检查一次，被取消后剩余文件不再处理。
+    """
+    out = []
+    for path in paths:
+        if cancel_token is not None and cancel_token.cancelled:
+            break
+        try:
+            # extract 阶段包含提取函数内部的 read、parse 等阶段
+            with timing.span('extract'):
+                out.append((True, func(path)))
+        except Exception:
+            out.append((False, traceback.format_exc()))
+    return out
+
+
+def _run_timed_batch(func, paths, cancel_token=None):
+    """与 _run_batch 相同，同时记录提取函数中各阶段的耗时，返回 (结果, 计时记录)
+
+    工作线程和子进程中没有激活的计时记录，这里单独记录后交回调用方合并。
+    """
+    recorder = timing.Recorder()
+    previous = timing.activate(recorder)
+    try:
+        return _run_batch(func, paths, cancel_token), recorder.snapshot()
+    finally:
+        timing.activate(previous)
+
+
+class ExtractBackend:
+    """提取器的执行后端：serial（单线程）、thread（线程池）或 process（进程池）
+
+    文件按批次提交，结果始终按提交顺序返回，保证表格中的条目顺序稳定。
+    线程池和进程池都是全局调度器中共享的池，不随后端创建或关闭；
+    thread 后端的批次按 priority 排队，交互式查找的批次先于后台任务执行。
+    传入 cancel_token 后，取消时尚未开始的批次会被撤销，线程池中正在处理的批次
+    在下一个文件前停止，进程池中正在处理的批次完成后不再等待其余结果。
+    同一个后端可以被多个线程同时使用（例如全局搜索中并行扫描的多个包）。
+    """
+
+    def __init__(self, kind='serial', workers=0, cancel_token=None, priority=PRIORITY_NORMAL):
+        self.kind = kind if kind in BACKENDS else 'serial'
+        self.workers = workers if workers and workers > 0 else (os.cpu_count() or 1)
+        self.cancel_token = cancel_token
+        self.priority = priority
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.close()
+
+    def _submit(self, fn, *args):
+        if self.kind == 'process':
+            return scheduler.process_pool(self.workers).submit(fn, *args)
+        return scheduler.cpu_pool(self.workers).submit(fn, *args, priority=self.priority)
+
+    def _chunk_size(self, count):
+        return max(1, min(MAX_CHUNK_SIZE, -(-count // (self.workers * 4))))
+
+    def map(self, func, paths):
+        """对每个文件执行 func
+
+        Args:
+            func: 单文件提取函数；使用进程池时必须是模块级函数
+            paths: 文件路径列表
+
+        Returns:
+            list: 与 paths 一一对应的 (是否成功, 结果或异常信息)
+        """
+        return list(self.imap(func, paths))
+
+    def imap(self, func, paths):
+        """与 map 相同，但以生成器形式按顺序逐个产出结果
+
+        所有批次在开始时一并提交，前面的批次完成后即可产出，
+        调用方无需等待全部文件处理完毕就能开始使用结果。
+
+        Raises:
+            ScanCancelled: 扫描被取消
+        """
+        paths = list(paths)
+        cancel_token = self.cancel_token
+        if (self.kind == 'serial' or len(paths) < 2
+                or (self.kind == 'process' and len(paths) < PROCESS_MIN_FILES)):
+            for path in paths:
+                if cancel_token is not None:
+                    cancel_token.raise_if_cancelled()
+                yield from _run_batch(func, (path,))
+            return
+
+        size = self._chunk_size(len(paths))
+        # 取消标记无法传入子进程，进程池只能在批次之间检查
+        batch_token = cancel_token if self.kind == 'thread' else None
+        batches = [paths[i:i + size] for i in range(0, len(paths), size)]
+        # 调用方正在计时时，各批次的阶段耗时随结果一起返回
+        timed = timing.current() is not None
+        run_batch = _run_timed_batch if timed else _run_batch
+        futures = [self._submit(run_batch, func, batch, batch_token) for batch in batches]
+        try:
+            for future, batch in zip(futures, batches):
+                try:
+                    outcomes = future.result()
+                    if timed:
+                        outcomes, snapshot = outcomes
+                        timing.merge(snapshot)
+                except Exception as e:
+                    if cancel_token is not None:
+                        cancel_token.raise_if_cancelled()
+                    # 进程池异常（如子进程崩溃、进程池被替换）时在当前线程重新处理该批次
+                    log_warning("批量提取失败，改为在当前线程处理", phase='extract', error=e)
+                    outcomes = _run_batch(func, batch, cancel_token)
+                if cancel_token is not None:
+                    cancel_token.raise_if_cancelled()
+                yield from outcomes
+        finally:
+            # 被取消或调用方提前结束时，撤销尚未开始的批次
+            for future in futures:
+                future.cancel()
+
+    def close(self):
+        """保留与之前相同的用法；共享的池由调度器管理，imap 结束时已撤销自己未开始的批次"""
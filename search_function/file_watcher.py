@@ -0,0 +1,314 @@
+import os
+import traceback
+from PyQt6.QtCore import QObject, QTimer, QFileSystemWatcher, pyqtSignal
+from services.log_service import log_warning, log_error
+from services.background_task import BackgroundTask
+from .walker import PackFile, PACK_LAYOUT
+from .scan_index import file_fingerprint
+from .pipeline import extract_pack_file, file_source
+
+# 收到变化通知后等待的时间（毫秒），期间的其他通知合并为一次刷新
+WATCH_DEBOUNCE_MS = 300
+# 轮询模式下检查目录的间隔（毫秒）
+POLL_INTERVAL_MS = 2000
+# 需要监视的路径超过该数量时改用轮询，避免耗尽系统的监视句柄
+WATCH_MAX_PATHS = 4096
+
+
+class PackSnapshot:
+    """包目录的文件快照，用于找出发生变化的文件
+
+    按目录记录需要扫描的文件及其 stat 信息。收到某个目录的变化通知后只重新读取该目录，
+    与快照比较得到新增、修改和删除的文件；新出现的子目录会被完整读取。
+    """
+
+    def __init__(self, pack_info):
+        self.pack_info = pack_info
+        self.layout = PACK_LAYOUT.get(pack_info.type, {})
+        self.dirs = {}  # 目录路径 -> (类别, 相对包根目录的路径)；包根目录的类别为 None
+        self.files = {}  # 目录路径 -> {文件路径: PackFile}
+
+    def build(self):
+        """读取整个包，建立初始快照"""
+        self.dirs = {self.pack_info.path: (None, '')}
+        self.files = {}
+        for kind in self.layout:
+            dir_path = os.path.join(self.pack_info.path, kind)
+            if os.path.isdir(dir_path):
+                self._add_tree(kind, dir_path, kind, None)
+
+    def watch_paths(self):
+        """需要监视的全部目录和文件"""
+        paths = list(self.dirs)
+        for files in self.files.values():
+            paths.extend(files)
+        return paths
+
+    def _list_dir(self, kind, dir_path, rel_dir):
+        """读取单个目录，返回 ({文件路径: PackFile}, [(子目录名, 子目录路径)])"""
+        extension, recursive = self.layout[kind]
+        files = {}
+        subdirs = []
+        try:
+            with os.scandir(dir_path) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if recursive:
+                                subdirs.append((entry.name, entry.path))
+                        elif entry.name.endswith(extension):
+                            files[entry.path] = PackFile(kind, entry.path, rel_dir + os.sep + entry.name, entry.stat())
+                    except OSError:
+                        # 文件在读取期间被删除，按不存在处理
+                        continue
+        except OSError:
+            pass
+        return files, subdirs
+
+    def _add_tree(self, kind, dir_path, rel_dir, added):
+        """记录目录及其子目录中的文件，added 不为 None 时把这些文件加入其中"""
+        files, subdirs = self._list_dir(kind, dir_path, rel_dir)
+        self.dirs[dir_path] = (kind, rel_dir)
+        self.files[dir_path] = files
+        if added is not None:
+            added.extend(files.values())
+        for name, path in subdirs:
+            self._add_tree(kind, path, rel_dir + os.sep + name, added)
+
+    def _remove_tree(self, dir_path, removed):
+        """移除目录及其子目录的记录，其中的文件加入 removed"""
+        prefix = dir_path + os.sep
+        for path in [path for path in self.dirs if path == dir_path or path.startswith(prefix)]:
+            del self.dirs[path]
+            removed.extend(self.files.pop(path, {}).values())
+
+    def rescan(self, dir_paths=None):
+        """重新读取指定目录并与快照比较，快照随之更新
+
+        Args:
+            dir_paths: 需要重新读取的目录，为 None 时读取全部已知目录（轮询模式）
+
+        Returns:
+            tuple: (新增或修改的 PackFile 列表, 被删除的 PackFile 列表)
+        """
+        changed = []
+        removed = []
+        if dir_paths is None:
+            dir_paths = list(self.dirs)
+        # 先处理上层目录，已随上层目录移除的子目录会被跳过
+        for dir_path in sorted(dir_paths, key=len):
+            if dir_path not in self.dirs:
+                continue
+            kind, rel_dir = self.dirs[dir_path]
+            if kind is None:
+                self._rescan_root(changed, removed)
+            elif not os.path.isdir(dir_path):
+                self._remove_tree(dir_path, removed)
+            else:
+                self._rescan_dir(kind, dir_path, rel_dir, changed, removed)
+        return changed, removed
+
+    def _rescan_root(self, changed, removed):
+        """检查包根目录下各类别的顶层目录是否被创建或删除"""
+        for kind in self.layout:
+            dir_path = os.path.join(self.pack_info.path, kind)
+            exists = os.path.isdir(dir_path)
+            if exists and dir_path not in self.dirs:
+                self._add_tree(kind, dir_path, kind, changed)
+            elif not exists and dir_path in self.dirs:
+                self._remove_tree(dir_path, removed)
+
+    def _rescan_dir(self, kind, dir_path, rel_dir, changed, removed):
+        files, subdirs = self._list_dir(kind, dir_path, rel_dir)
+        old_files = self.files.get(dir_path, {})
+        for path, pack_file in files.items():
+            old_file = old_files.get(path)
+            if old_file is None or file_fingerprint(old_file.stat) != file_fingerprint(pack_file.stat):
+                changed.append(pack_file)
+        removed.extend(pack_file for path, pack_file in old_files.items() if path not in files)
+        self.files[dir_path] = files
+
+        live_subdirs = set()
+        for name, path in subdirs:
+            live_subdirs.add(path)
+            if path not in self.dirs:
+                self._add_tree(kind, path, rel_dir + os.sep + name, changed)
+        for path in [path for path in self.dirs if os.path.dirname(path) == dir_path and path not in live_subdirs]:
+            self._remove_tree(path, removed)
+
+
+class WatchRefreshWorker(BackgroundTask):
+    """在后台读取发生变化的目录，并重新提取其中新增或修改的文件"""
+    refreshed = pyqtSignal(list)  # [(文件标识, Entry 列表)]，文件被删除时条目列表为空
+
+    def __init__(self, snapshot, dir_paths=None, build=False, parent=None):
+        super().__init__(parent)
+        self.snapshot = snapshot
+        self.dir_paths = dir_paths
+        self.build = build
+
+    def run(self):
+        try:
+            if self.build:
+                self.snapshot.build()
+                self.refreshed.emit([])
+                return
+
+            changed, removed = self.snapshot.rescan(self.dir_paths)
+            updates = [(file_source(pack_file), []) for pack_file in removed]
+            for pack_file in changed:
+                entries = extract_pack_file(self.snapshot.pack_info, pack_file)
+                # 文件可能正处于编辑器写入的中途，提取失败时保留原有条目，等待下一次变化
+                if entries is not None:
+                    updates.append((file_source(pack_file), entries))
+            self.refreshed.emit(updates)
+        except Exception as e:
+            log_error("监视刷新线程出错", detail=traceback.format_exc(), pack=self.snapshot.pack_info.path,
+                      phase='watch', error=e)
+
+
+class PackWatcher(QObject):
+    """监视当前包的文件变化，只重新提取发生变化的文件
+
+    优先使用 QFileSystemWatcher（系统的文件变化通知），需要监视的路径过多或注册失败时
+    改为定时轮询。变化通知经过防抖后合并为一批，由后台线程读取对应目录并提取。
+    """
+    files_changed = pyqtSignal(object, list, int)  # (pack_info, [(文件标识, Entry 列表)], generation)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.pack_info = None
+        self.generation = None
+        self.polling = False
+        self._snapshot = None
+        self._watcher = None
+        self._dirty_dirs = set()
+        self._worker = None
+        # 已停止监视、仍在运行的刷新线程，结束前保留引用
+        self._retired_workers = set()
+
+        self._debounce_timer = QTimer(self)
+        self._debounce_timer.setSingleShot(True)
+        self._debounce_timer.setInterval(WATCH_DEBOUNCE_MS)
+        self._debounce_timer.timeout.connect(self._start_refresh)
+
+        self._poll_timer = QTimer(self)
+        self._poll_timer.setInterval(POLL_INTERVAL_MS)
+        self._poll_timer.timeout.connect(self._on_poll)
+
+    def start(self, pack_info, generation):
+        """开始监视指定的包，generation 为其结果在翻译存储中的扫描代数"""
+        self.stop()
+        self.pack_info = pack_info
+        self.generation = generation
+        self._snapshot = PackSnapshot(pack_info)
+        self._run_worker(WatchRefreshWorker(self._snapshot, build=True))
+
+    def stop(self):
+        """停止监视，正在进行的刷新结果会被丢弃"""
+        self._debounce_timer.stop()
+        self._poll_timer.stop()
+        self.polling = False
+        if self._watcher is not None:
+            self._watcher.deleteLater()
+            self._watcher = None
+        self.pack_info = None
+        self.generation = None
+        self._snapshot = None
+        self._dirty_dirs.clear()
+        worker = self._worker
+        self._worker = None
+        if worker is not None and worker.isRunning():
+            self._retired_workers.add(worker)
+
+    def is_watching(self):
+        """是否正在监视某个包"""
+        return self.pack_info is not None
+
+    def _run_worker(self, worker):
+        self._worker = worker
+        worker.refreshed.connect(self._on_refreshed)
+        worker.finished.connect(self._on_worker_finished)
+        worker.start()
+
+    def _setup_watcher(self):
+        """注册系统文件变化通知，无法注册时改用轮询"""
+        paths = self._snapshot.watch_paths()
+        if len(paths) <= WATCH_MAX_PATHS:
+            self._watcher = QFileSystemWatcher(self)
+            failed = self._watcher.addPaths(paths)
+            if not failed:
+                self._watcher.directoryChanged.connect(self._on_directory_changed)
+                self._watcher.fileChanged.connect(self._on_file_changed)
+                return
+            log_warning("无法监视部分路径，改为定时检查文件变化", pack=self.pack_info.path, phase='watch',
+                        failed=len(failed))
+            self._watcher.deleteLater()
+            self._watcher = None
+        self._start_polling()
+
+    def _start_polling(self):
+        self.polling = True
+        self._poll_timer.start()
+
+    def _sync_watch_paths(self):
+        """刷新后同步监视的路径：新增的文件和目录加入监视，已删除的移除"""
+        if self._watcher is None:
+            return
+        wanted = set(self._snapshot.watch_paths())
+        current = set(self._watcher.files()) | set(self._watcher.directories())
+        stale = current - wanted
+        if stale:
+            self._watcher.removePaths(list(stale))
+        # 被编辑器以替换方式保存的文件会自动退出监视，需要重新加入
+        added = wanted - current
+        if len(wanted) > WATCH_MAX_PATHS or (added and self._watcher.addPaths(list(added))):
+            self._watcher.deleteLater()
+            self._watcher = None
+            self._start_polling()
+
+    def _on_directory_changed(self, path):
+        self._dirty_dirs.add(path)
+        self._debounce_timer.start()
+
+    def _on_file_changed(self, path):
+        self._dirty_dirs.add(os.path.dirname(path))
+        self._debounce_timer.start()
+
+    def _on_poll(self):
+        # 上一次检查尚未结束时跳过本次
+        if self._worker is None and self._snapshot is not None:
+            self._run_worker(WatchRefreshWorker(self._snapshot))
+
+    def _start_refresh(self):
+        if self._snapshot is None or not self._dirty_dirs:
+            return
+        if self._worker is not None:
+            # 正在刷新，结束后再处理期间积累的变化
+            return
+        dir_paths = set(self._dirty_dirs)
+        self._dirty_dirs.clear()
+        self._run_worker(WatchRefreshWorker(self._snapshot, dir_paths))
+
+    def _on_refreshed(self, updates):
+        if self.sender() is not self._worker:
+            return
+        if self._watcher is None and not self.polling:
+            # 初始快照建立完成
+            self._setup_watcher()
+        else:
+            self._sync_watch_paths()
+        if updates:
+            self.files_changed.emit(self.pack_info, updates, self.generation)
+
+    def _on_worker_finished(self):
+        worker = self.sender()
+        if worker in self._retired_workers:
+            self._retired_workers.discard(worker)
+            worker.deleteLater()
+            return
+        if worker is self._worker:
+            self._worker = None
+            worker.deleteLater()
+            if self._dirty_dirs:
+                self._debounce_timer.start()
@@ -0,0 +1,187 @@
+from array import array
+from bisect import bisect_left
+
+# 标识符与值之间的分隔符，查询文本中不会出现，保证子串匹配不会跨越两个字段
+FIELD_SEPARATOR = '\x00'
+GRAM_SIZE = 3
+
+
+def _grams(text):
+    """返回文本中所有互不相同的三元组"""
+    return {text[i:i + GRAM_SIZE] for i in range(len(text) - GRAM_SIZE + 1)}
+
+
+class TextFilterIndex:
+    """搜索结果的子串过滤索引
+
+    每个条目的标识符（键或文件名）与值在建立索引时统一转为小写，
+    并按三元组建立倒排表。查询时先取最稀有三元组的倒排表作为候选，
+    再用子串比较确认，因此结果与逐行 `in` 判断完全一致。
+    编辑过的条目暂不计算三元组，查询时与候选一并逐个比较，大量粘贴时编辑本身不必付出建立索引的开销。
+    """
+
+    def __init__(self, results, identifier_field):
+        self.identifier_field = identifier_field
+        self._haystacks = []
+        self._postings = {}
+        self._unsorted = False  # 编辑后倒排表可能乱序或重复
+        self._pending = set()  # 值被编辑、新三元组尚未加入倒排表的行
+        self._last_query = None
+        self._last_rows = None
+        self.extend(results)
+
+    @staticmethod
+    def _haystack(identifier, value):
+        identifier = identifier.lower() if isinstance(identifier, str) else ''
+        value = value.lower() if isinstance(value, str) else ''
+        return f"{identifier}{FIELD_SEPARATOR}{value}"
+
+    def _add_grams(self, row, haystack):
+        postings = self._postings
+        for gram in _grams(haystack):
+            if FIELD_SEPARATOR in gram:
+                continue
+            posting = postings.get(gram)
+            if posting is None:
+                posting = postings[gram] = array('I')
+            posting.append(row)
+
+    def __len__(self):
+        return len(self._haystacks)
+
+    def extend(self, results):
+        """追加一批条目，行号紧接在已有条目之后"""
+        identifier_field = self.identifier_field
+        for result in results:
+            row = len(self._haystacks)
+            haystack = self._haystack(result.get(identifier_field), result.get('value'))
+            self._haystacks.append(haystack)
+            self._add_grams(row, haystack)
+        # 上一次查询的结果不包含新条目
+        self._last_query = None
+        self._last_rows = None
+
+    def update_value(self, row, identifier, value):
+        """条目的值被编辑后更新索引
+
+        旧三元组保留在倒排表中，多出的候选会在子串比较时被过滤掉；
+        新三元组推迟到 splice 前才加入，在此之前该行在每次查询中都作为候选。
+        """
+        if not 0 <= row < len(self._haystacks):
+            return
+        haystack = self._haystack(identifier, value)
+        if haystack == self._haystacks[row]:
+            return
+        self._haystacks[row] = haystack
+        self._pending.add(row)
+        self._last_query = None
+        self._last_rows = None
+
+    def _flush_pending(self):
+        """把编辑过的行的新三元组加入倒排表"""
+        if not self._pending:
+            return
+        haystacks = self._haystacks
+        for row in sorted(self._pending):
+            self._add_grams(row, haystacks[row])
+        self._pending.clear()
+        self._unsorted = True
+
+    def splice(self, start, stop, results):
+        """把 [start, stop) 范围内的条目替换为 results，其后条目的行号随之平移
+
+        文件被外部修改、条目数量发生变化时使用。只平移倒排表中受影响的部分，
+        其余条目的三元组无需重新计算。
+        """
+        # 行号即将平移，先把编辑过的行并入倒排表
+        self._flush_pending()
+        identifier_field = self.identifier_field
+        new_haystacks = [self._haystack(result.get(identifier_field), result.get('value')) for result in results]
+        delta = len(new_haystacks) - (stop - start)
+
+        postings = self._postings
+        empty_grams = []
+        for gram, posting in postings.items():
+            if self._unsorted:
+                posting = array('I', sorted(set(posting)))
+                postings[gram] = posting
+            if not posting or posting[-1] < start:
+                continue
+            low = bisect_left(posting, start)
+            high = bisect_left(posting, stop, low)
+            tail = posting[high:]
+            if delta:
+                tail = array('I', map(delta.__add__, tail))
+            posting = posting[:low] + tail
+            if posting:
+                postings[gram] = posting
+            else:
+                empty_grams.append(gram)
+        for gram in empty_grams:
+            del postings[gram]
+        self._unsorted = False
+
+        self._haystacks[start:stop] = new_haystacks
+        for row, haystack in enumerate(new_haystacks, start):
+            for gram in _grams(haystack):
+                if FIELD_SEPARATOR in gram:
+                    continue
+                posting = postings.get(gram)
+                if posting is None:
+                    posting = postings[gram] = array('I')
+                # 新条目位于中间，按顺序插入以保持倒排表有序
+                posting.insert(bisect_left(posting, row), row)
+        self._last_query = None
+        self._last_rows = None
+
+    def query(self, text, start=0, stop=None):
+        """返回标识符或值中包含 text（不区分大小写）的行号列表，按升序排列
+
+        Args:
+            text: 查询文本
+            start: 只返回不小于该行号的结果，用于筛选刚追加的一批条目
+            stop: 只返回小于该行号的结果，为 None 时不限制
+        """
+        text = text.lower()
+        haystacks = self._haystacks
+        if start:
+            # 只涉及一小段新追加的条目，直接逐行比较
+            end = len(haystacks) if stop is None else min(stop, len(haystacks))
+            return [row for row in range(start, end) if text in haystacks[row]]
+
+        if not text:
+            rows = range(len(haystacks))
+        else:
+            rows = self._query_all(text)
+        if stop is not None and stop < len(haystacks):
+            rows = rows[:bisect_left(rows, stop)]
+        return list(rows)
+
+    def _query_all(self, text):
+        """在全部条目中查询小写文本"""
+        haystacks = self._haystacks
+        # 连续输入时新查询通常包含上一次的查询，只需在上一次的结果中继续筛选
+        if self._last_query and self._last_query in text:
+            candidates = self._last_rows
+        elif len(text) < GRAM_SIZE:
+            candidates = range(len(haystacks))
+        else:
+            postings = []
+            for gram in _grams(text):
+                posting = self._postings.get(gram)
+                if posting is None:
+                    candidates = ()
+                    break
+                postings.append(posting)
+            else:
+                candidates = min(postings, key=len)
+            if self._pending:
+                # 编辑过的行不一定在倒排表中，一并作为候选
+                candidates = sorted(self._pending.union(candidates))
+            elif self._unsorted:
+                candidates = sorted(set(candidates))
+
+        rows = [row for row in candidates if text in haystacks[row]]
+        self._last_query = text
+        self._last_rows = rows
+        return rows
@@ -1,7 +1,10 @@
 import os
 import re
 import traceback
-from concurrent.futures import ThreadPoolExecutor
+from services import timing
+from services.log_service import log_warning
+from .walker import walk_pack, extract_files
+from .executor import ExtractBackend
 
 def contains_letters_or_chinese(text):
     """
@@ -31,8 +34,11 @@ def extract_rawtext_from_file(file_path):
     """
     results = []
     try:
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-            content = f.readlines()
+        with timing.span('read'):
+            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+                content = f.readlines()
+        # 文本模式读取，以字符数近似字节数
+        timing.count('bytes', sum(map(len, content)))
             
         # 定义要查找的模式 - 匹配 "rawtext": [ { "text": "内容" } ]
         pattern = r'"rawtext"\s*:\s*\[\s*{\s*"text"\s*:\s*"([^"]*)"'
@@ -61,16 +67,21 @@ def extract_rawtext_from_file(file_path):
                 })
     
     except Exception as e:
-        print(f"读取文件 {file_path} 时出错: {str(e)}")
-        print(traceback.format_exc())
+        log_warning("读取mcfunction文件时出错", detail=traceback.format_exc(), file=file_path, phase='extract',
+                    error=e)
     
     return results
 
-def search(pack):
+def search(pack, index=None, pack_files=None, backend=None, on_results=None, cancel_token=None):
     """在行为包的functions文件夹中搜索mcfunction文件中的rawtext内的text内容
     
     Args:
         pack: 包信息对象
+        index: 扫描索引(ScanIndex)，未修改的文件直接从索引读取
+        pack_files: 已遍历得到的mcfunction文件列表，为 None 时自行遍历
+        backend: 执行后端(ExtractBackend)，为 None 时使用临时线程池
+        on_results: 每个文件的条目就绪时调用，用于流式显示结果
+        cancel_token: 取消标记(CancelToken)，每处理一个文件前检查
         
     Returns:
         tuple: (搜索结果列表, 失败的文件数量)
@@ -78,27 +89,12 @@ def search(pack):
     if not pack or pack.type != 'behavior':
         return [], 0
     
-    functions_dir = os.path.join(pack.path, 'functions')
-    if not os.path.isdir(functions_dir):
-        return [], 0
-    
-    mcfunction_files = []
-    for root, _, files in os.walk(functions_dir):
-        for file in files:
-            if file.endswith('.mcfunction'):
-                mcfunction_files.append(os.path.join(root, file))
-    
-    all_results = []
-    failed_count = 0
-    
-    with ThreadPoolExecutor() as executor:
-        future_to_file = {executor.submit(extract_rawtext_from_file, f): f for f in mcfunction_files}
-        for future in future_to_file:
-            try:
-                file_results = future.result()
-                all_results.extend(file_results)
-            except Exception as exc:
-                print(f'{future_to_file[future]} 生成异常: {exc}')
-                failed_count += 1
+    if pack_files is None:
+        pack_files = walk_pack(pack, ('functions',), cancel_token).get('functions', [])
     
-    return all_results, failed_count
+    if backend is None:
+        with ExtractBackend('thread', cancel_token=cancel_token) as backend:
+            return extract_files(pack_files, extract_rawtext_from_file, index, backend, error_label='提取mcfunction文本失败',
+                                 on_results=on_results, cancel_token=cancel_token)
+    return extract_files(pack_files, extract_rawtext_from_file, index, backend, error_label='提取mcfunction文本失败',
+                         on_results=on_results, cancel_token=cancel_token)
@@ -0,0 +1,182 @@
+import os
+import threading
+import traceback
+from PyQt6.QtCore import pyqtSignal
+from config import cfg
+from services import timing
+from services.log_service import log_error
+from services.background_task import BackgroundTask
+from services.task_scheduler import scheduler, PRIORITY_INTERACTIVE
+from .scan_index import ScanIndex
+from .pipeline import scan_pack
+from .executor import ExtractBackend
+from .filter_index import TextFilterIndex
+
+# 全局搜索时同时扫描的包数量；提取工作由共享的执行后端并行处理
+GLOBAL_SCAN_CONCURRENCY = 4
+
+
+class GlobalResultSet:
+    """全局搜索的合并结果
+
+    各包的结果按扫描完成的顺序依次拼接，每个包保留一份独立的过滤索引（分片），
+    按文本过滤时分别查询各分片，再换算为合并后的行号，无需重新扫描。
+    """
+
+    def __init__(self):
+        self.shards = []  # (包信息, 起始行号, 条目列表, 过滤索引)
+        self.total = 0
+
+    def add_pack(self, pack_info, results, filter_index):
+        """追加一个包的结果，返回其第一条在合并结果中的行号"""
+        start = self.total
+        self.shards.append((pack_info, start, results, filter_index))
+        self.total += len(results)
+        return start
+
+    def pack_count(self):
+        """已合并的包数量"""
+        return len(self.shards)
+
+    def query(self, text, start=0, stop=None):
+        """返回合并行号在 [start, stop) 范围内、标识符或值包含 text 的行号列表"""
+        rows = []
+        for pack_info, offset, results, filter_index in self.shards:
+            end = offset + len(results)
+            if stop is not None and offset >= stop:
+                break
+            if end <= start:
+                continue
+            local_start = max(0, start - offset)
+            local_stop = None if stop is None or stop >= end else stop - offset
+            rows.extend(offset + row for row in filter_index.query(text, local_start, local_stop))
+        return rows
+
+
+class GlobalSearchWorker(BackgroundTask):
+    """并行扫描多个包的后台任务
+
+    每个包的扫描是 tasks 池中的一个任务，同时进行的不超过 GLOBAL_SCAN_CONCURRENCY 个，
+    一个包扫描结束时由其完成回调提交下一个包，不占用额外的线程等待结果。
+    每个包使用自己的扫描索引，包之间共享同一个执行后端；
+    每扫描完一个包就发出该包的结果及其过滤索引。
+    """
+    pack_results_ready = pyqtSignal(object, list, object, int)  # (pack_info, results, filter_index, failed_json_count)
+    results_ready = pyqtSignal(list, str, int)  # (results, pack_type, failed_json_count)
+    search_error = pyqtSignal(str)
+    priority = PRIORITY_INTERACTIVE
+
+    def __init__(self, packs, parent=None):
+        super().__init__(parent)
+        self.packs = list(packs)
+        self._backend = None
+        self._lock = threading.Lock()
+        self._pending = []  # 尚未提交的包，按扫描顺序倒序排列
+        self._futures = set()
+        self._running = 0
+        self._all_results = []
+        self._failed_json_count = 0
+
+    def _scan_one(self, pack_info, backend):
+        """扫描单个包并建立其过滤索引，被取消时返回 None"""
+        with timing.operation('search', pack=pack_info.name, backend=backend.kind, scope='global'):
+            return self._scan_one_pack(pack_info, backend)
+
+    def _scan_one_pack(self, pack_info, backend):
+        index = None
+        app_folder = cfg.appFolder.value
+        if app_folder:
+            with timing.span('index'):
+                index = ScanIndex.load_for_pack(os.path.join(app_folder, 'Index'), pack_info)
+
+        scan_result = scan_pack(pack_info, index, self.cancel_token, backend=backend)
+        if scan_result is None:
+            return None
+        if index is not None:
+            with timing.span('write'):
+                index.save()
+
+        results, failed_count = scan_result
+        timing.count('entries', len(results))
+        identifier_field = 'key' if pack_info.type == 'resources' else 'filename'
+        with timing.span('filter'):
+            filter_index = TextFilterIndex(results, identifier_field)
+        return results, filter_index, failed_count
+
+    def start(self):
+        """提交前 GLOBAL_SCAN_CONCURRENCY 个包的扫描，重复调用无效"""
+        if self._started:
+            return
+        self._started = True
+        self._backend = ExtractBackend(cfg.extractBackend.value, cfg.extractWorkers.value, self.cancel_token,
+                                       self.priority)
+        self._pending = self.packs[::-1]
+        # 先计入全部首批扫描，避免首个包很快结束时被误判为全部完成
+        first_count = min(GLOBAL_SCAN_CONCURRENCY, len(self._pending))
+        self._running = first_count
+        if not first_count:
+            self._complete()
+            return
+        for _ in range(first_count):
+            if not self._submit_next():
+                self._release_slot()
+
+    def _submit_next(self):
+        """提交下一个包的扫描（调用方已计入 _running），没有剩余的包或已取消时返回 False"""
+        with self._lock:
+            if not self._pending or self.cancel_token.cancelled:
+                return False
+            pack_info = self._pending.pop()
+        future = scheduler.submit(self._scan_one, pack_info, self._backend, priority=self.priority)
+        with self._lock:
+            self._futures.add(future)
+        future.add_done_callback(lambda future: self._on_pack_done(pack_info, future))
+        return True
+
+    def _on_pack_done(self, pack_info, future):
+        """一个包的扫描结束：发出其结果并提交下一个包
+
+        在执行扫描的工作线程中调用；扫描在开始前被撤销时在调用 stop 的线程中调用。
+        """
+        with self._lock:
+            self._futures.discard(future)
+        if not future.cancelled():
+            try:
+                outcome = future.result()
+            except Exception as e:
+                detail = ''.join(traceback.format_exception(type(e), e, e.__traceback__))
+                log_error("全局搜索扫描包失败", detail=detail, pack=pack_info.path, phase='search', error=e)
+                outcome = False
+            if outcome and not self.cancel_token.cancelled:
+                results, filter_index, failed_count = outcome
+                # 在锁内发出，保证各包结果到达界面的顺序与合并结果中的顺序一致
+                with self._lock:
+                    self._all_results.extend(results)
+                    self._failed_json_count += failed_count
+                    self.pack_results_ready.emit(pack_info, results, filter_index, failed_count)
+
+        # 由本次完成的扫描让出的名额提交下一个包
+        if not self._submit_next():
+            self._release_slot()
+
+    def _release_slot(self):
+        """没有包可以提交时释放一个名额，最后一个名额释放时结束整个任务"""
+        with self._lock:
+            self._running -= 1
+            last = self._running == 0
+        if last:
+            self._complete()
+
+    def _complete(self):
+        self._backend.close()
+        if not self.cancel_token.cancelled:
+            self.results_ready.emit(self._all_results, 'global', self._failed_json_count)
+        self._finish()
+
+    def stop(self):
+        """请求取消全局搜索，撤销尚未开始扫描的包"""
+        self.cancel_token.cancel()
+        with self._lock:
+            futures = list(self._futures)
+        for future in futures:
+            future.cancel()
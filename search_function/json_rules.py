@@ -0,0 +1,290 @@
+import os
+import re
+from dataclasses import dataclass
+from typing import Callable, Optional
+import orjson
+from services import timing
+from .scan_index import file_fingerprint
+from .prefilter import present_keys
+
+# 路径中的通配符：ANY 匹配任意一个键或数组元素，DEEP 匹配任意多层（包括零层）
+ANY = '*'
+DEEP = '**'
+
+LETTER_PATTERN = re.compile('[a-zA-Z]')
+
+
+def contains_letters_or_chinese(text):
+    """检查文本是否包含英文字母或中文字符"""
+    return LETTER_PATTERN.search(text) is not None or contains_chinese(text)
+
+
+def contains_chinese(text):
+    """检查文本是否包含中文字符"""
+    return any('\u4e00' <= char <= '\u9fff' for char in text)
+
+
+def _is_lang_key(prefix):
+    """跳过形如 <prefix>xxx.name 的语言键引用，这类值由资源包的语言文件翻译"""
+    return lambda value: value.startswith(prefix) and value.endswith('.name')
+
+
+@dataclass(frozen=True)
+class JsonRule:
+    """一条 JSON 提取规则
+
+    Attributes:
+        type: 条目类型
+        kind: 规则适用的目录类别（PACK_LAYOUT 中的顶层目录名），如 entities、items
+        path: 值所在的路径，元素为键名、ANY 或 DEEP
+        needle: 字节级预过滤使用的带引号键名，文件中不包含该键时不会启用此规则
+        value_prefix: 值（去除首尾空白后）必须以该前缀开头；提取时去掉，保存时加回
+        skip: 额外的跳过条件，接收提取出的值，返回 True 时跳过
+        key_from_filename: 是否以文件名（不含 .json）作为条目的 key
+    """
+    type: str
+    kind: str
+    path: tuple
+    needle: bytes
+    value_prefix: str = ''
+    skip: Optional[Callable[[str], bool]] = None
+    key_from_filename: bool = False
+
+    def extract_value(self, raw):
+        """从 JSON 中的原始值得到条目的值，不符合规则时返回 None"""
+        if not isinstance(raw, str):
+            return None
+        value = raw
+        if self.value_prefix:
+            value = raw.strip()
+            if not value.startswith(self.value_prefix):
+                return None
+            value = value[len(self.value_prefix):]
+        if not value or not contains_letters_or_chinese(value):
+            return None
+        if self.skip is not None and self.skip(value):
+            return None
+        return value
+
+    def to_raw(self, value):
+        """把编辑后的值转换为写回 JSON 的原始值"""
+        return f"{self.value_prefix}{value}"
+
+
+# 规则注册表：新增可翻译的 JSON 位置只需在这里添加一条规则。
+# 同一类别下的规则按此顺序输出条目。
+JSON_RULES = (
+    JsonRule(
+        type='entity_name',
+        kind='entities',
+        path=('minecraft:entity', 'components', 'minecraft:nameable', 'name'),
+        needle=b'"minecraft:nameable"',
+        skip=_is_lang_key('entity.'),
+        key_from_filename=True,
+    ),
+    JsonRule(
+        type='say',
+        kind='entities',
+        path=(DEEP, 'queue_command', 'command', ANY),
+        needle=b'"queue_command"',
+        value_prefix='say ',
+    ),
+    JsonRule(
+        type='item_name',
+        kind='items',
+        path=('minecraft:item', 'components', 'minecraft:display_name', 'value'),
+        needle=b'"minecraft:display_name"',
+        skip=_is_lang_key('item.'),
+        key_from_filename=True,
+    ),
+)
+
+RULES_BY_TYPE = {rule.type: rule for rule in JSON_RULES}
+
+
+class _Node:
+    """规则路径树的节点"""
+    __slots__ = ('children', 'any', 'deep', 'self_loop', 'rules')
+
+    def __init__(self, self_loop=False):
+        self.children = {}
+        self.any = None
+        self.deep = None
+        self.self_loop = self_loop  # DEEP 节点：任意子元素都停留在本节点
+        self.rules = []  # 在此节点结束的规则序号
+
+
+def _compile(rules):
+    """把一组规则的路径合并为一棵树，返回根节点"""
+    root = _Node()
+    for rule_index, rule in enumerate(rules):
+        node = root
+        for step in rule.path:
+            if step == DEEP:
+                if node.deep is None:
+                    node.deep = _Node(self_loop=True)
+                node = node.deep
+            elif step == ANY:
+                if node.any is None:
+                    node.any = _Node()
+                node = node.any
+            else:
+                node = node.children.setdefault(step, _Node())
+        node.rules.append(rule_index)
+    return root
+
+
+def _closure(nodes):
+    """加入经 DEEP 边（匹配零层）可以到达的节点"""
+    result = []
+    for node in nodes:
+        while node is not None:
+            result.append(node)
+            node = node.deep
+    return result
+
+
+class CompiledRules:
+    """编译后的一组规则，对每个文档只遍历一次即可收集所有规则的匹配
+
+    遍历只进入可能匹配的分支；没有 ANY/DEEP 规则处于活动状态时，
+    只按路径中的键直接查找，不会访问文档的其余部分。
+    """
+
+    def __init__(self, rules):
+        self.rules = tuple(rules)
+        self.root = _compile(self.rules)
+
+    def extract(self, data, filepath, fingerprint):
+        """从已解析的文档中提取条目，按规则顺序排列
+
+        Args:
+            data: 已解析的 JSON 文档
+            filepath: 文件路径
+            fingerprint: 读取时的文件指纹
+
+        Returns:
+            list: 条目字典列表
+        """
+        matches = [[] for _ in self.rules]
+        self._walk(data, _closure([self.root]), [], matches)
+
+        filename = os.path.basename(filepath)
+        results = []
+        for rule, rule_matches in zip(self.rules, matches):
+            for value, json_path in rule_matches:
+                entry = {
+                    'type': rule.type,
+                    'value': value,
+                    'filename': filename,
+                    'filepath': filepath,
+                    'fingerprint': fingerprint,
+                    'json_path': json_path,
+                    'has_chinese': contains_chinese(value),
+                }
+                if rule.key_from_filename:
+                    entry['key'] = filename.replace('.json', '')
+                results.append(entry)
+        return results
+
+    def _walk(self, value, nodes, path, matches):
+        for node in nodes:
+            for rule_index in node.rules:
+                extracted = self.rules[rule_index].extract_value(value)
+                if extracted is not None:
+                    matches[rule_index].append((extracted, list(path)))
+
+        if isinstance(value, dict):
+            wildcard = any(node.any is not None or node.self_loop for node in nodes)
+            items = value.items() if wildcard else self._keyed_items(value, nodes)
+        elif isinstance(value, list):
+            if not any(node.any is not None or node.self_loop for node in nodes):
+                return
+            items = enumerate(value)
+        else:
+            return
+
+        for key, child in items:
+            next_nodes = []
+            for node in nodes:
+                if type(key) is str:
+                    next_node = node.children.get(key)
+                    if next_node is not None:
+                        next_nodes.append(next_node)
+                if node.any is not None:
+                    next_nodes.append(node.any)
+                if node.self_loop:
+                    next_nodes.append(node)
+            if next_nodes:
+                path.append(key)
+                self._walk(child, _closure(next_nodes), path, matches)
+                path.pop()
+
+    @staticmethod
+    def _keyed_items(value, nodes):
+        """只取路径树中出现的键，按文档中的顺序排列"""
+        keys = set()
+        for node in nodes:
+            keys.update(node.children)
+        if len(keys) == 1:
+            key = next(iter(keys))
+            return [(key, value[key])] if key in value else []
+        return [(key, child) for key, child in value.items() if key in keys]
+
+
+_compiled_cache = {}
+
+
+def compiled_rules(rules):
+    """返回一组规则的编译结果，相同的规则组合只编译一次"""
+    rules = tuple(rules)
+    compiled = _compiled_cache.get(rules)
+    if compiled is None:
+        compiled = _compiled_cache[rules] = CompiledRules(rules)
+    return compiled
+
+
+def rules_for_kind(kind):
+    """返回适用于指定目录类别的规则"""
+    return tuple(rule for rule in JSON_RULES if rule.kind == kind)
+
+
+def _check_structure(content):
+    """不解析时的结构检查：去掉首尾空白后必须以成对的 {} 或 [] 包围，否则视为解析失败"""
+    content = content.strip()
+    if not content or (content[:1], content[-1:]) not in ((b'{', b'}'), (b'[', b']')):
+        raise ValueError("JSON文件结构不完整")
+
+
+def extract_json_file(filepath, kind):
+    """按规则注册表从单个 JSON 文件中提取条目
+
+    先用各规则的 needle 做字节级预过滤，只有可能匹配的规则参与遍历；
+    没有规则可能匹配时跳过解析，只做首尾括号的结构检查：截断、空文件等明显损坏的文件
+    仍计入解析失败，而尾随逗号、注释等只有完整解析才能发现的错误不再计入。
+
+    Args:
+        filepath: JSON 文件路径
+        kind: 文件所在的目录类别，如 entities、items
+
+    Returns:
+        list: 条目字典列表；JSON解析失败或跳过解析的文件结构明显损坏时抛出异常
+    """
+    with timing.span('read'):
+        with open(filepath, 'rb') as f:
+            content = f.read()
+            # 记录读取时的文件指纹，保存时据此确认文件未被修改
+            fingerprint = file_fingerprint(os.fstat(f.fileno()))
+    timing.count('bytes', len(content))
+
+    rules = rules_for_kind(kind)
+    with timing.span('prefilter'):
+        needles = present_keys(content, tuple(rule.needle for rule in rules))
+    if not needles:
+        _check_structure(content)
+        return []
+    active_rules = tuple(rule for rule in rules if rule.needle in needles)
+
+    with timing.span('parse'):
+        data = orjson.loads(content)
+    return compiled_rules(active_rules).extract(data, filepath, fingerprint)
@@ -1,5 +1,7 @@
 import os
 import re
+from services import timing
+from .walker import walk_pack, extract_files
 
 def contains_letters_or_chinese(text):
     """
@@ -18,11 +20,56 @@ def contains_letters_or_chinese(text):
     
     return has_letters or has_chinese
 
-def search(pack_info):
+def extract_lang_file(lang_path, pack_path):
+    """从单个语言文件中提取条目
+    
+    Args:
+        lang_path: 语言文件完整路径
+        pack_path: 包根目录，用于生成相对路径
+        
+    Returns:
+        list: 包含搜索结果的列表，每个结果是一个字典，包含文件名、行号、类型和值
+    """
+    results = []
+    lang_file = os.path.basename(lang_path)
+    with open(lang_path, 'r', encoding='utf-8') as f:
+        # 逐行读取和提取交替进行，整个文件计入 extract 阶段
+        timing.count('bytes', os.fstat(f.fileno()).st_size)
+        for line_num, line in enumerate(f, 1):
+            line = line.strip()
+            if line and not line.startswith('#'):
+                try:
+                    key, value = line.split('=', 1)
+                    value = value.strip()
+                    
+                    # 跳过只包含特殊符号的值
+                    if not contains_letters_or_chinese(value):
+                        continue
+                        
+                    # 检查是否包含中文字符
+                    has_chinese = any('\u4e00' <= char <= '\u9fff' for char in value)
+                    results.append({
+                        'file': os.path.relpath(lang_path, pack_path),
+                        'line': line_num,
+                        'type': 'language_entry',
+                        'key': key.strip(),
+                        'value': value,
+                        'has_chinese': has_chinese,  # 添加中文标记
+                        'lang_file_name': lang_file  # 添加语言文件名
+                    })
+                except ValueError:
+                    continue
+    return results
+
+def search(pack_info, index=None, pack_files=None, on_results=None, cancel_token=None):
     """搜索资源包中的语言文件
     
     Args:
         pack_info: PackInfo对象，包含包的信息
+        index: 扫描索引(ScanIndex)，语言文件未修改时直接从索引读取
+        pack_files: 已遍历得到的texts目录下的lang文件列表，为 None 时自行遍历
+        on_results: 语言文件的条目就绪时调用，用于流式显示结果
+        cancel_token: 取消标记(CancelToken)，每处理一个文件前检查
         
     Returns:
         list: 包含搜索结果的列表，每个结果是一个字典，包含文件名、行号、类型和值
@@ -31,13 +78,12 @@ def search(pack_info):
     if pack_info.type != 'resources':
         return []
     
-    # 构建texts文件夹路径
-    texts_path = os.path.join(pack_info.path, 'texts')
-    if not os.path.exists(texts_path):
-        return []
+    if pack_files is None:
+        pack_files = walk_pack(pack_info, ('texts',), cancel_token).get('texts', [])
     
     # 获取所有lang文件
-    lang_files = [f for f in os.listdir(texts_path) if f.endswith('.lang')]
+    files_by_name = {os.path.basename(pack_file.path): pack_file for pack_file in pack_files}
+    lang_files = list(files_by_name)
     if not lang_files:
         return []
     
@@ -54,36 +100,13 @@ def search(pack_info):
     else:
         lang_file = lang_files[0]
     
-    results = []
-    lang_path = os.path.join(texts_path, lang_file)
-    
-    try:
-        with open(lang_path, 'r', encoding='utf-8') as f:
-            for line_num, line in enumerate(f, 1):
-                line = line.strip()
-                if line and not line.startswith('#'):
-                    try:
-                        key, value = line.split('=', 1)
-                        value = value.strip()
-                        
-                        # 跳过只包含特殊符号的值
-                        if not contains_letters_or_chinese(value):
-                            continue
-                            
-                        # 检查是否包含中文字符
-                        has_chinese = any('\u4e00' <= char <= '\u9fff' for char in value)
-                        results.append({
-                            'file': os.path.relpath(lang_path, pack_info.path),
-                            'line': line_num,
-                            'type': 'language_entry',
-                            'key': key.strip(),
-                            'value': value,
-                            'has_chinese': has_chinese,  # 添加中文标记
-                            'lang_file_name': lang_file  # 添加语言文件名
-                        })
-                    except ValueError:
-                        continue
-    except Exception as e:
-        print(f"读取语言文件出错: {e}")
+    results, failed_count = extract_files(
+        [files_by_name[lang_file]],
+        lambda path: extract_lang_file(path, pack_info.path),
+        index,
+        error_label='读取语言文件出错',
+        on_results=on_results,
+        cancel_token=cancel_token
+    )
     
-    return results
\ No newline at end of file
+    return results
@@ -0,0 +1,139 @@
+import time
+from .walker import walk_pack, extract_files
+from .executor import ExtractBackend
+from .cancellation import ScanCancelled
+from services.task_scheduler import PRIORITY_NORMAL
+from .lang import search as search_lang, extract_lang_file
+from .entities import search as search_entities, extract_entity_from_file
+from .items import search as search_items, extract_item_from_file
+from .scripts import search as search_scripts, extract_title_from_file
+from .functions import search as search_functions, extract_rawtext_from_file
+
+# 行为包各类别的提取顺序，决定结果在表格中的排列
+BEHAVIOR_EXTRACTORS = (
+    ('entities', search_entities),
+    ('items', search_items),
+    ('scripts', search_scripts),
+    ('functions', search_functions),
+)
+
+# 各类别的单文件提取函数，监视模式下只重新提取发生变化的文件
+FILE_EXTRACTORS = {
+    'entities': extract_entity_from_file,
+    'items': extract_item_from_file,
+    'scripts': extract_title_from_file,
+    'functions': extract_rawtext_from_file,
+}
+
+# 流式输出时每批的最大条目数
+BATCH_SIZE = 300
+# 距离上一批超过该时间（秒）时，即使未攒满也立即输出
+BATCH_INTERVAL = 0.1
+
+
+class ResultBatcher:
+    """把逐个文件产出的条目攒成批次交给回调
+
+    条目达到 BATCH_SIZE，或距离上一批已超过 BATCH_INTERVAL 时输出一批，
+    使界面既能尽快显示第一批结果，又不会因信号过多而卡顿。
+    """
+
+    def __init__(self, on_batch, batch_size=BATCH_SIZE, interval=BATCH_INTERVAL):
+        self.on_batch = on_batch
+        self.batch_size = batch_size
+        self.interval = interval
+        self._pending = []
+        self._last_flush = time.monotonic()
+
+    def add(self, entries):
+        """加入一个文件的条目，满足条件时输出"""
+        self._pending.extend(entries)
+        if len(self._pending) >= self.batch_size or time.monotonic() - self._last_flush >= self.interval:
+            self.flush()
+
+    def flush(self):
+        """输出所有暂存的条目，单批不超过 batch_size"""
+        pending = self._pending
+        self._pending = []
+        for start in range(0, len(pending), self.batch_size):
+            self.on_batch(pending[start:start + self.batch_size])
+        self._last_flush = time.monotonic()
+
+
+def scan_pack(pack_info, index=None, cancel_token=None, backend_kind='serial', workers=0, on_batch=None,
+              backend=None, priority=PRIORITY_NORMAL):
+    """扫描整个包：一次遍历目录，再把文件分发给对应的提取器
+
+    Args:
+        pack_info: 包信息对象
+        index: 扫描索引(ScanIndex)，未修改的文件直接从索引读取
+        cancel_token: 取消标记(CancelToken)，遍历每个目录、处理每个文件前检查
+        backend_kind: 执行后端类型：serial、thread 或 process
+        workers: 线程或进程数量，0 表示使用CPU核心数
+        on_batch: 每攒够一批条目时按顺序调用，参数为该批条目列表
+        backend: 共享的执行后端(ExtractBackend)，由调用方负责关闭；为 None 时按
+            backend_kind 和 workers 创建本次扫描专用的后端
+        priority: 新建后端时提取批次在共享线程池中的优先级
+
+    Returns:
+        tuple: (条目列表, 失败的文件数量)；被取消时返回 None
+    """
+    try:
+        if backend is not None:
+            return _scan_pack(pack_info, index, cancel_token, backend, on_batch)
+        # 同一个后端在各提取器之间复用，进程池只启动一次；取消时撤销尚未开始的批次
+        with ExtractBackend(backend_kind, workers, cancel_token, priority) as backend:
+            return _scan_pack(pack_info, index, cancel_token, backend, on_batch)
+    except ScanCancelled:
+        return None
+
+
+def _scan_pack(pack_info, index, cancel_token, backend, on_batch):
+    files_by_kind = walk_pack(pack_info, cancel_token=cancel_token)
+    batcher = ResultBatcher(on_batch) if on_batch is not None else None
+    on_results = batcher.add if batcher is not None else None
+
+    if pack_info.type == 'resources':
+        results = search_lang(pack_info, index, files_by_kind.get('texts', []), on_results, cancel_token)
+        if batcher is not None:
+            batcher.flush()
+        return results, 0
+
+    results = []
+    failed_count = 0
+    for kind, search_func in BEHAVIOR_EXTRACTORS:
+        kind_results, kind_failed_count = search_func(
+            pack_info, index, files_by_kind.get(kind, []), backend, on_results, cancel_token
+        )
+        results.extend(kind_results)
+        failed_count += kind_failed_count
+        # 每个提取器结束时输出剩余条目
+        if batcher is not None:
+            batcher.flush()
+
+    return results, failed_count
+
+
+def file_source(pack_file):
+    """返回文件在翻译存储中的标识：语言文件为相对路径（条目的 file），其余为完整路径（条目的 filepath）"""
+    return pack_file.rel_path if pack_file.kind == 'texts' else pack_file.path
+
+
+def extract_pack_file(pack_info, pack_file):
+    """重新提取单个文件的条目
+
+    Args:
+        pack_info: 包信息对象
+        pack_file: 需要提取的文件(PackFile)
+
+    Returns:
+        list: Entry 列表；提取失败时返回 None
+    """
+    if pack_file.kind == 'texts':
+        extract_func = lambda path: extract_lang_file(path, pack_info.path)
+    else:
+        extract_func = FILE_EXTRACTORS.get(pack_file.kind)
+        if extract_func is None:
+            return None
+    results, failed_count = extract_files([pack_file], extract_func, error_label='重新提取文件失败')
+    return None if failed_count else results
@@ -0,0 +1,17 @@
+def present_keys(content, keys):
+    """字节级预过滤：返回 JSON 文件的原始内容中可能出现的键
+
+    只做子串查找，比完整解析快一个数量级，用于在解析前跳过不可能产生条目的文件。
+    JSON 键可以使用 \\uXXXX 转义书写，内容中出现反斜杠时无法可靠判断，一律视为全部可能出现。
+
+    Args:
+        content: 文件的原始字节
+        keys: 带双引号的键名字节串，如 (b'"minecraft:nameable"',)
+
+    Returns:
+        tuple: keys 中可能出现的键，保持原有顺序
+    """
+    if b'\\' in content:
+        return tuple(keys)
+    return tuple(key for key in keys if key in content)
+
@@ -0,0 +1,145 @@
+import os
+import hashlib
+import orjson
+from services.log_service import log_warning
+
+# 提取规则或条目格式变化时递增，使旧索引失效
+INDEX_VERSION = 5
+
+# 保存时发现文件指纹与条目记录的不一致，保存函数返回以此开头的消息，界面据此提示重新查找
+STALE_FILE_MESSAGE = "文件在查找后已被修改，请重新查找后再保存"
+
+
+def file_digest(filepath):
+    """计算文件内容的哈希值
+
+    Args:
+        filepath: 文件路径
+
+    Returns:
+        str: 文件内容的十六进制哈希值
+    """
+    hasher = hashlib.blake2b(digest_size=16)
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def file_fingerprint(stat_result):
+    """根据 stat 结果生成文件指纹 [mtime_ns, 大小]
+
+    条目中记录提取时的指纹，保存前与文件当前的指纹比较，
+    用于确认文件在扫描之后没有被其他程序修改。
+    """
+    return [stat_result.st_mtime_ns, stat_result.st_size]
+
+
+def get_index_path(index_dir, pack_info):
+    """根据包路径和类型生成索引文件路径"""
+    pack_key = f"{pack_info.type}:{os.path.normcase(os.path.abspath(pack_info.path))}"
+    name = hashlib.sha1(pack_key.encode('utf-8')).hexdigest()[:16]
+    return os.path.join(index_dir, f"{name}.json")
+
+
+class ScanIndex:
+    """单个包的持久化扫描索引
+
+    以相对路径为键，记录文件的 mtime、大小、内容哈希以及提取出的条目。
+    再次扫描时，未改变的文件直接从索引读取条目，只有新增或修改的文件才会重新提取。
+    """
+
+    def __init__(self, index_path, pack_path):
+        self.index_path = index_path
+        self.pack_path = pack_path
+        self._files = {}  # 相对路径 -> 记录
+        self._seen = set()  # 本次扫描中出现过的相对路径
+        self._digests = {}  # lookup 时已计算的哈希，供 update 复用
+        self._dirty = False
+
+    @classmethod
+    def load_for_pack(cls, index_dir, pack_info):
+        """加载指定包的索引，索引不存在或损坏时返回空索引"""
+        index = cls(get_index_path(index_dir, pack_info), pack_info.path)
+        index.load()
+        return index
+
+    def load(self):
+        """从磁盘加载索引"""
+        try:
+            with open(self.index_path, 'rb') as f:
+                payload = orjson.loads(f.read())
+            if payload.get('version') == INDEX_VERSION and isinstance(payload.get('files'), dict):
+                self._files = payload['files']
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            log_warning("读取扫描索引失败，将重新建立索引", file=self.index_path, phase='index', error=e)
+            self._files = {}
+
+    def lookup(self, rel_path, filepath, stat_result):
+        """查询文件的缓存条目
+
+        mtime 与大小一致时直接命中；否则比较内容哈希，哈希一致时同样命中。
+
+        Args:
+            rel_path: 相对于包根目录的路径
+            filepath: 文件完整路径
+            stat_result: 文件的 stat 结果
+
+        Returns:
+            list: 缓存的条目字典列表（索引内部的对象，调用方不应修改）；未命中时返回 None
+        """
+        self._seen.add(rel_path)
+        record = self._files.get(rel_path)
+        if record is None:
+            return None
+
+        if record['mtime_ns'] != stat_result.st_mtime_ns or record['size'] != stat_result.st_size:
+            digest = file_digest(filepath)
+            if digest != record['hash']:
+                self._digests[rel_path] = digest
+                return None
+            # 内容未变（例如仅被 touch），刷新 stat 信息和条目中的文件指纹
+            record['mtime_ns'] = stat_result.st_mtime_ns
+            record['size'] = stat_result.st_size
+            fingerprint = file_fingerprint(stat_result)
+            for entry in record['entries']:
+                if 'fingerprint' in entry:
+                    entry['fingerprint'] = fingerprint
+            self._dirty = True
+
+        return record['entries']
+
+    def update(self, rel_path, filepath, stat_result, entries):
+        """写入或覆盖文件的索引记录"""
+        self._seen.add(rel_path)
+        digest = self._digests.pop(rel_path, None) or file_digest(filepath)
+        self._files[rel_path] = {
+            'mtime_ns': stat_result.st_mtime_ns,
+            'size': stat_result.st_size,
+            'hash': digest,
+            # 界面使用由这些字典转换得到的 Entry 对象，编辑结果不会影响索引中的记录
+            'entries': entries,
+        }
+        self._dirty = True
+
+    def save(self):
+        """移除本次扫描未出现的文件记录并写回磁盘"""
+        stale = [rel_path for rel_path in self._files if rel_path not in self._seen]
+        for rel_path in stale:
+            del self._files[rel_path]
+        if not (self._dirty or stale):
+            return
+
+        payload = {'version': INDEX_VERSION, 'pack_path': self.pack_path, 'files': self._files}
+        temp_path = f"{self.index_path}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+            with open(temp_path, 'wb') as f:
+                f.write(orjson.dumps(payload))
+            os.replace(temp_path, self.index_path)
+            self._dirty = False
+        except Exception as e:
+            log_warning("写入扫描索引失败", file=self.index_path, phase='index', error=e)
+
@@ -1,8 +1,45 @@
 import os
 import re
-from concurrent.futures import ThreadPoolExecutor
+from bisect import bisect_right
+from services import timing
+from services.log_service import log_warning
+from .walker import walk_pack, extract_files
+from .executor import ExtractBackend
 from pathlib import Path
 
+# 单个文本值允许的最大长度，保证 sendMessage 等模式在缺少结束引号时不会回溯扫描整个文件
+MAX_VALUE_LENGTH = 10000
+
+# 各类型文本的模式，值写入 value 分组；按 SCRIPT_TYPES 的顺序逐个扫描。
+# 不能合并为一个交替表达式：合并后各类型的匹配不能重叠，
+# titleraw 前缀较长的匹配会吞掉其间的 .title()、.sendMessage() 等调用
+SCRIPT_PATTERNS = (
+    ('script_title', re.compile(r'\.title\(\s*"(?P<value>[^"]*)"\s*\)')),
+    ('script_button', re.compile(r'\.button\(\s*"(?P<value>[^"]*)"\s*,\s*"[^"]*"\s*\)')),
+    ('script_body', re.compile(r'\.body\s*\(\s*["\'](?P<value>[^"\']*?)["\'\s]*\)')),
+    # 允许任意对象调用 (.sendMessage) 且支持 ` " ' 三种引号；
+    # 值以同种引号结束并支持转义字符，长度有上限，避免 [\s\S]*? 的大范围回溯
+    ('script_sendMessage', re.compile(
+        r'\.sendMessage\s*\(\s*(?P<quote>[`\'"])'
+        r'(?P<value>(?:(?!(?P=quote))[^\\]|\\[\s\S]){0,%d})(?P=quote)\s*\)' % MAX_VALUE_LENGTH)),
+    # 匹配 titleraw ... {"rawtext":[{"text":"..."}]}，前缀不跨行且长度有上限
+    ('script_rawtext', re.compile(
+        r'titleraw\s+.{0,%d}?\{\s*"rawtext"\s*:\s*\[\s*\{\s*"text"\s*:\s*"(?P<value>[^"]*)"\s*\}\s*\]\s*\}'
+        % MAX_VALUE_LENGTH)),
+)
+
+# 结果按类型分组输出的顺序
+SCRIPT_TYPES = tuple(type_name for type_name, _ in SCRIPT_PATTERNS)
+
+# 各类型的跳过条件
+SKIP_CONDITIONS = {
+    'script_title': lambda value: '_' in value or ':' in value,
+}
+
+NEWLINE_PATTERN = re.compile('\n')
+CHINESE_PATTERN = re.compile('[\u4e00-\u9fff]')
+LETTER_OR_CHINESE_PATTERN = re.compile('[a-zA-Z\u4e00-\u9fff]')
+
 def contains_letters_or_chinese(text):
     """
     检查文本是否包含英文字母或中文字符
@@ -13,12 +50,7 @@ def contains_letters_or_chinese(text):
     Returns:
         bool: 如果包含英文字母或中文则返回True，否则返回False
     """
-    # 检查英文字母
-    has_letters = bool(re.search('[a-zA-Z]', text))
-    # 检查中文字符
-    has_chinese = any('\u4e00' <= char <= '\u9fff' for char in text)
-    
-    return has_letters or has_chinese
+    return LETTER_OR_CHINESE_PATTERN.search(text) is not None
 
 def extract_title_from_file(file_path):
     """从JS文件中提取.title(), .button(), .body()和sendMessage括号内的内容
@@ -31,60 +63,40 @@ def extract_title_from_file(file_path):
     """
     results = []
     try:
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-            content = f.read()
-            
-        # 定义要查找的模式
-        patterns = {
-            'script_title': {
-                'pattern': r'\.title\(\s*"([^"]*)"\s*\)',
-                'skip_condition': lambda value: '_' in value or ':' in value
-            },
-            'script_button': {
-                'pattern': r'\.button\(\s*"([^"]*)"\s*,\s*"[^"]*"\s*\)',
-                'skip_condition': lambda value: False
-            },
-            'script_body': {
-                'pattern': r'\.body\s*\(\s*["\']([^"\']*?)["\'\s]*\)',
-                'skip_condition': lambda value: False
-            },
-            'script_sendMessage': {
-                # 允许任意对象调用 (.sendMessage) 且支持 ` " ' 三种引号，捕获括号内完整文本
-                'pattern': r'\.sendMessage\s*\(\s*[`\'\"]([\s\S]*?)[`\'\"]\s*\)',
-                'skip_condition': lambda value: False
-            },
-            'script_rawtext': {
-                # 匹配 titleraw ... {"rawtext":[{"text":"..."}]}
-                'pattern': r'titleraw\s+.*?\{\s*"rawtext"\s*:\s*\[\s*\{\s*"text"\s*:\s*"([^"]*)"\s*\}\s*\]\s*\}',
-                'skip_condition': lambda value: False
-            }
-        }
+        with timing.span('read'):
+            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+                content = f.read()
+        # 文本模式读取，以字符数近似字节数
+        timing.count('bytes', len(content))
         
-        # 处理每种模式
-        for type_name, pattern_info in patterns.items():
-            matches = re.finditer(pattern_info['pattern'], content)
-            skip_condition = pattern_info['skip_condition']
-            
-            for match in matches:
-                value = match.group(1)
-                
-                # 计算匹配位置的行号
-                line_number = content[:match.start()].count('\n') + 1
-                
-                # 检查是否包含中文字符
-                has_chinese = any('\u4e00' <= char <= '\u9fff' for char in value)
+        filename = os.path.basename(file_path)
+        filepath = str(file_path)
+        newline_offsets = None
+        
+        for type_name, pattern in SCRIPT_PATTERNS:
+            skip_condition = SKIP_CONDITIONS.get(type_name)
+            for match in pattern.finditer(content):
+                value = match.group('value')
                 
                 # 应用跳过条件
-                if skip_condition(value):
+                if skip_condition and skip_condition(value):
                     continue
                 
                 # 跳过只包含特殊符号的值
                 if not contains_letters_or_chinese(value):
                     continue
-                    
+                
+                # 通过换行符位置表二分查找行号，避免每次匹配都从文件开头计数
+                if newline_offsets is None:
+                    newline_offsets = [m.start() for m in NEWLINE_PATTERN.finditer(content)]
+                line_number = bisect_right(newline_offsets, match.start()) + 1
+                
+                # 检查是否包含中文字符
+                has_chinese = CHINESE_PATTERN.search(value) is not None
+                
                 results.append({
-                    'filename': os.path.basename(file_path),
-                    'filepath': str(file_path),
+                    'filename': filename,
+                    'filepath': filepath,
                     'type': type_name,
                     'value': value,
                     'has_chinese': has_chinese,
@@ -92,15 +104,20 @@ def extract_title_from_file(file_path):
                 })
     
     except Exception as e:
-        print(f"读取文件 {file_path} 时出错: {str(e)}")
+        log_warning("读取脚本文件时出错", file=file_path, phase='extract', error=e)
     
     return results
 
-def search(pack):
+def search(pack, index=None, pack_files=None, backend=None, on_results=None, cancel_token=None):
     """在行为包的scripts文件夹中搜索.title(), .button(), .body()和sendMessage内容
     
     Args:
         pack: 包信息对象
+        index: 扫描索引(ScanIndex)，未修改的文件直接从索引读取
+        pack_files: 已遍历得到的脚本文件列表，为 None 时自行遍历
+        backend: 执行后端(ExtractBackend)，为 None 时使用临时线程池
+        on_results: 每个文件的条目就绪时调用，用于流式显示结果
+        cancel_token: 取消标记(CancelToken)，每处理一个文件前检查
         
     Returns:
         tuple: (搜索结果列表, 失败的文件数量)
@@ -108,27 +125,12 @@ def search(pack):
     if not pack or pack.type != 'behavior':
         return [], 0
     
-    scripts_dir = os.path.join(pack.path, 'scripts')
-    if not os.path.isdir(scripts_dir):
-        return [], 0
-    
-    js_files = []
-    for root, _, files in os.walk(scripts_dir):
-        for file in files:
-            if file.endswith('.js'):
-                js_files.append(os.path.join(root, file))
-    
-    all_results = []
-    failed_count = 0
-    
-    with ThreadPoolExecutor() as executor:
-        future_to_file = {executor.submit(extract_title_from_file, f): f for f in js_files}
-        for future in future_to_file:
-            try:
-                file_results = future.result()
-                all_results.extend(file_results)
-            except Exception as exc:
-                print(f'{future_to_file[future]} 生成异常: {exc}')
-                failed_count += 1
+    if pack_files is None:
+        pack_files = walk_pack(pack, ('scripts',), cancel_token).get('scripts', [])
     
-    return all_results, failed_count
+    if backend is None:
+        with ExtractBackend('thread', cancel_token=cancel_token) as backend:
+            return extract_files(pack_files, extract_title_from_file, index, backend, error_label='提取脚本文本失败',
+                                 on_results=on_results, cancel_token=cancel_token)
+    return extract_files(pack_files, extract_title_from_file, index, backend, error_label='提取脚本文本失败',
+                         on_results=on_results, cancel_token=cancel_token)
@@ -1,129 +1,204 @@
-from PyQt6.QtCore import QObject, QThread, pyqtSignal
+import os
+from PyQt6.QtCore import QObject, pyqtSignal
 from found import PackInfo
+from config import cfg
+from services import timing
+from services.log_service import log_error
+from services.background_task import BackgroundTask
+from services.task_scheduler import PRIORITY_INTERACTIVE
 from save import translation_store  # 导入翻译数据存储
-from .lang import search as search_lang
-from .entities import search as search_entities
-from .items import search as search_items
-from .scripts import search as search_scripts
-from .functions import search as search_functions  # 导入functions模块
+from .scan_index import ScanIndex
+from .pipeline import scan_pack
+from .global_search import GlobalSearchWorker, GlobalResultSet
+from .file_watcher import PackWatcher
 
-class SearchWorker(QThread):
+class SearchWorker(BackgroundTask):
+    # 交互式查找优先于导入、格式化等任务，其提取批次同样优先执行
+    priority = PRIORITY_INTERACTIVE
+    results_batch = pyqtSignal(int, list, str)  # (start_index, batch, pack_type)
     results_ready = pyqtSignal(list, str, int)  # (results, pack_type, failed_json_count)
     search_error = pyqtSignal(str)
 
-    def __init__(self, pack_info: PackInfo, search_text: str, parent=None):
+    def __init__(self, pack_info: PackInfo, generation=None, parent=None):
         super().__init__(parent)
         self.pack_info = pack_info
-        self.search_text = search_text.lower() # Normalize search text to lower case here
-        self._is_running = True
+        # 翻译存储中本次扫描的代数，被新的扫描取代后追加的结果会被丢弃
+        self.generation = generation
+
+    def _load_index(self):
+        """加载当前包的扫描索引，未配置应用文件夹时不使用索引"""
+        app_folder = cfg.appFolder.value
+        if not app_folder:
+            return None
+        return ScanIndex.load_for_pack(os.path.join(app_folder, 'Index'), self.pack_info)
 
     def run(self):
         try:
-            results = []
-            if not self._is_running: return
-
-            if self.pack_info.type == 'resources':
-                pack_results = search_lang(self.pack_info)
-                for result in pack_results:
-                    if not self._is_running: return
-                    # Ensure 'key' and 'value' exist and are strings before calling .lower()
-                    key_match = self.search_text in result.get('key', '').lower() if isinstance(result.get('key'), str) else False
-                    value_match = self.search_text in result.get('value', '').lower() if isinstance(result.get('value'), str) else False
-                    if self.search_text and not (key_match or value_match):
-                        continue
-                    results.append(result)
-                
-                # 存储结果到翻译存储
-                translation_store.store_search_results(self.pack_info, results)
-                if self._is_running: self.results_ready.emit(results, 'resources', 0) # Assuming lang search doesn't have json parsing errors for now
-
-            elif self.pack_info.type == 'behavior':
-                all_pack_results = []
-                total_failed_json_count = 0
-                # Entities search
-                if not self._is_running: return
-                entity_results, entity_failed_count = search_entities(self.pack_info)
-                all_pack_results.extend(entity_results)
-                total_failed_json_count += entity_failed_count
-
-                # Items search
-                if not self._is_running: return
-                item_results, item_failed_count = search_items(self.pack_info)
-                all_pack_results.extend(item_results)
-                total_failed_json_count += item_failed_count
-                
-                # Scripts search - 脚本搜索
-                if not self._is_running: return
-                script_results, script_failed_count = search_scripts(self.pack_info)
-                all_pack_results.extend(script_results)
-                total_failed_json_count += script_failed_count
-                
-                # Functions search - 新添加的函数搜索
-                if not self._is_running: return
-                function_results, function_failed_count = search_functions(self.pack_info)
-                all_pack_results.extend(function_results)
-                total_failed_json_count += function_failed_count
-                
-                filtered_results = []
-                for result in all_pack_results:
-                    if not self._is_running: return
-                    # Ensure 'filename' and 'value' exist and are strings
-                    filename_match = self.search_text in result.get('filename', '').lower() if isinstance(result.get('filename'), str) else False
-                    value_match = self.search_text in result.get('value', '').lower() if isinstance(result.get('value'), str) else False
-                    if self.search_text and not (filename_match or value_match):
-                        continue
-                    filtered_results.append(result)
-                
-                # 存储结果到翻译存储
-                translation_store.store_search_results(self.pack_info, filtered_results)
-                if self._is_running: self.results_ready.emit(filtered_results, 'behavior', total_failed_json_count)
-            else:
-                if self._is_running: self.search_error.emit(f"未知的包类型: {self.pack_info.type}")
-
+            with timing.operation('search', pack=self.pack_info.name, backend=cfg.extractBackend.value):
+                self._run_search()
         except Exception as e:
             import traceback
-            print(f"Error in SearchWorker: {e}\n{traceback.format_exc()}")
-            if self._is_running: self.search_error.emit(str(e))
+            log_error("查找线程出错", detail=traceback.format_exc(), pack=self.pack_info.path, phase='search', error=e)
+            if not self.cancel_token.cancelled: self.search_error.emit(str(e))
+
+    def _run_search(self):
+        if self.cancel_token.cancelled: return
+        with timing.span('index'):
+            index = self._load_index()
+
+        if self.pack_info.type not in ('resources', 'behavior'):
+            if not self.cancel_token.cancelled: self.search_error.emit(f"未知的包类型: {self.pack_info.type}")
+            return
+
+        # 单次遍历包目录，依次交给各提取器，结果按批次追加到翻译存储并通知界面
+        scan_result = scan_pack(
+            self.pack_info, index, self.cancel_token,
+            backend_kind=cfg.extractBackend.value, workers=cfg.extractWorkers.value,
+            on_batch=self._emit_batch, priority=self.priority
+        )
+        if scan_result is None or self.cancel_token.cancelled: return
+        all_pack_results, total_failed_json_count = scan_result
+        timing.count('entries', len(all_pack_results))
+
+        # 全部阶段完成后才写回索引，避免中途停止时误删记录
+        if index is not None:
+            with timing.span('write'):
+                index.save()
+
+        self.results_ready.emit(all_pack_results, self.pack_info.type, total_failed_json_count)
 
-    def stop(self):
-        self._is_running = False
+    def _emit_batch(self, batch):
+        """把一批结果追加到翻译存储，并通知界面追加对应的行"""
+        if self.cancel_token.cancelled: return
+        # store 阶段包含其中更新过滤索引的 filter 阶段
+        with timing.span('store'):
+            start = translation_store.append_results(self.pack_info, batch, self.generation)
+        if start is None: return
+        self.results_batch.emit(start, batch, self.pack_info.type)
 
 class SearchController(QObject):
+    results_batch = pyqtSignal(int, list, str)  # (start_index, batch, pack_type)
+    global_batch = pyqtSignal(int, list, object)  # (start_index, results, pack_info)，全局搜索中一个包的结果
     results_ready = pyqtSignal(list, str, int)  # (results, pack_type, failed_json_count)
     search_error = pyqtSignal(str)
     search_finished = pyqtSignal()
+    results_patched = pyqtSignal(list)  # [(start_index, replaced_count, entries)]，监视模式下被外部修改的文件
 
     def __init__(self, parent=None):
         super().__init__(parent)
         self.search_worker = None
         self.current_pack_info = None
+        # 全局搜索的合并结果；为 None 时表示当前是单个包的搜索
+        self.global_results = None
+        # 已被取代、正在退出的后台任务，结束前保留引用以免任务对象被提前销毁
+        self._retired_workers = set()
+        # 当前包的结果在翻译存储中的扫描代数
+        self._generation = None
+        # 监视模式：查找完成后监视当前包，文件被外部修改时只重新提取这些文件
+        self.pack_watcher = PackWatcher(self)
+        self.pack_watcher.files_changed.connect(self._on_files_changed)
+        cfg.watchFiles.valueChanged.connect(self._on_watch_setting_changed)
 
-    def start_search(self, pack_info: PackInfo, search_text: str):
+    def start_search(self, pack_info: PackInfo):
+        """开始扫描指定的包；正在进行的扫描会被取消并由新的扫描取代"""
         self.current_pack_info = pack_info
-        
-        if self.search_worker and self.search_worker.isRunning():
-            self.search_worker.stop()
-            # Optionally wait for it to finish or handle overlap if necessary
-            # For now, we assume stop() is effective quickly or a new worker replaces the old one's relevance
-
-        self.search_worker = SearchWorker(pack_info, search_text)
-        self.search_worker.results_ready.connect(self.results_ready)
-        self.search_worker.search_error.connect(self.search_error)
+        self.global_results = None
+        self._retire_current_worker()
+
+        # 清空该包的旧数据，新结果将由工作线程逐批追加
+        self._generation = translation_store.begin_results(pack_info)
+        self.search_worker = SearchWorker(pack_info, self._generation)
+        self.search_worker.results_batch.connect(self._on_worker_batch)
+        self.search_worker.results_ready.connect(self._on_worker_results)
+        self.search_worker.search_error.connect(self._on_worker_error)
+        self.search_worker.finished.connect(self._on_worker_finished)
+        self.search_worker.start()
+
+    def start_global_search(self, packs):
+        """并行扫描所有包；正在进行的扫描会被取消并由新的扫描取代"""
+        self.current_pack_info = None
+        self.global_results = GlobalResultSet()
+        self._retire_current_worker()
+
+        self.search_worker = GlobalSearchWorker(packs)
+        self.search_worker.pack_results_ready.connect(self._on_worker_pack_results)
+        self.search_worker.results_ready.connect(self._on_worker_results)
+        self.search_worker.search_error.connect(self._on_worker_error)
         self.search_worker.finished.connect(self._on_worker_finished)
         self.search_worker.start()
 
+    def is_global(self):
+        """当前结果是否来自全局搜索"""
+        return self.global_results is not None
+
+    def _retire_current_worker(self):
+        """取消当前的工作线程，之后它发出的信号都会被忽略；同时停止监视"""
+        self.pack_watcher.stop()
+        worker = self.search_worker
+        self.search_worker = None
+        if worker is None:
+            return
+        worker.stop()
+        if worker.isRunning():
+            self._retired_workers.add(worker)
+
+    def _on_worker_batch(self, start, batch, pack_type):
+        if self.sender() is self.search_worker:
+            self.results_batch.emit(start, batch, pack_type)
+
+    def _on_worker_pack_results(self, pack_info, results, filter_index, failed_json_count):
+        if self.sender() is self.search_worker and self.global_results is not None:
+            start = self.global_results.add_pack(pack_info, results, filter_index)
+            self.global_batch.emit(start, results, pack_info)
+
+    def _on_worker_results(self, results, pack_type, failed_json_count):
+        if self.sender() is self.search_worker:
+            self.results_ready.emit(results, pack_type, failed_json_count)
+            if pack_type != 'global' and cfg.watchFiles.value:
+                self.pack_watcher.start(self.current_pack_info, self._generation)
+
+    def _on_watch_setting_changed(self, enabled):
+        """切换监视模式；当前包的扫描已完成时立即开始监视"""
+        if not enabled:
+            self.pack_watcher.stop()
+        elif (self.current_pack_info is not None and self.global_results is None and self.search_worker is None
+              and not self.pack_watcher.is_watching() and translation_store.has_data(self.current_pack_info)):
+            self.pack_watcher.start(self.current_pack_info, self._generation)
+
+    def _on_files_changed(self, pack_info, updates, generation):
+        """把重新提取的文件条目写入翻译存储，再通知界面修补对应的行"""
+        if pack_info is not self.current_pack_info:
+            return
+        patches = []
+        for source, entries in updates:
+            patch = translation_store.replace_file_entries(pack_info, source, entries, generation)
+            if patch is not None:
+                patches.append((patch[0], patch[1], entries))
+        if patches:
+            self.results_patched.emit(patches)
+
+    def _on_worker_error(self, error_message):
+        if self.sender() is self.search_worker:
+            self.search_error.emit(error_message)
+
     def _on_worker_finished(self):
-        # Check if the worker that finished is the current one, 
-        # in case a new search was started before the old one fully stopped and emitted finished.
-        # For simplicity, we assume the finished signal corresponds to the last worker started by this controller.
-        if self.search_worker and not self.search_worker.isRunning(): # Ensure it's truly finished
-             self.search_worker = None # Clear reference only if it's the one that finished
-        self.search_finished.emit()
+        worker = self.sender()
+        if worker in self._retired_workers:
+            # 被取代的扫描结束时不通知界面，新的扫描仍在进行
+            self._retired_workers.discard(worker)
+            worker.deleteLater()
+            return
+        if worker is self.search_worker:
+            self.search_worker = None
+            worker.deleteLater()
+            self.search_finished.emit()
 
     def stop_search(self):
-        if self.search_worker and self.search_worker.isRunning():
-            self.search_worker.stop()
-            # self.search_worker = None # Don't nullify here, let _on_worker_finished handle it.
+        """取消当前扫描并停止监视"""
+        self.pack_watcher.stop()
+        if self.search_worker is not None:
+            self._retire_current_worker()
+            self.search_finished.emit()
 
     def is_running(self):
         return self.search_worker is not None and self.search_worker.isRunning()
@@ -134,6 +209,20 @@ class SearchController(QObject):
             return translation_store.get_data(self.current_pack_info)
         return []
         
+    def filter_current_results(self, search_text, start=0, stop=None):
+        """在内存中按文本过滤当前包（或全局搜索）的结果，返回 [start, stop) 范围内匹配条目的索引列表"""
+        if self.global_results is not None:
+            return self.global_results.query(search_text, start, stop)
+        if self.current_pack_info:
+            return translation_store.filter_data(self.current_pack_info, search_text, start, stop)
+        return []
+        
+    def modified_indices(self):
+        """当前包中已修改的条目索引（升序），全局搜索的结果为只读，始终为空"""
+        if self.global_results is None and self.current_pack_info:
+            return translation_store.modified_indices(self.current_pack_info)
+        return []
+        
     def update_item(self, item_index, new_value):
         """更新特定条目的值"""
         if self.current_pack_info:
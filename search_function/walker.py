@@ -0,0 +1,152 @@
+import os
+from collections import namedtuple
+from services import timing
+from services.log_service import log_warning, log_error
+from .executor import ExtractBackend
+from .entry import Entry
+
+# 遍历得到的单个文件：类别、完整路径、相对包根目录的路径、stat结果
+PackFile = namedtuple('PackFile', ['kind', 'path', 'rel_path', 'stat'])
+
+# 各包类型中需要扫描的顶层目录：目录名 -> (文件扩展名, 是否递归子目录)
+PACK_LAYOUT = {
+    'behavior': {
+        'entities': ('.json', True),
+        'items': ('.json', True),
+        'scripts': ('.js', True),
+        'functions': ('.mcfunction', True),
+    },
+    'resources': {
+        'texts': ('.lang', False),
+    },
+}
+
+
+def _scan_dir(kind, dir_path, rel_dir, extension, recursive, out, cancel_token=None):
+    """扫描单个目录，顺序与 os.walk 自顶向下一致：先本目录文件，再依次进入子目录"""
+    if cancel_token is not None:
+        cancel_token.raise_if_cancelled()
+    subdirs = []
+    try:
+        with os.scandir(dir_path) as it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if recursive:
+                            subdirs.append(entry)
+                    elif entry.name.endswith(extension):
+                        # DirEntry.stat() 会缓存结果，Windows 上无需额外系统调用
+                        out.append(PackFile(kind, entry.path, rel_dir + os.sep + entry.name, entry.stat()))
+                except OSError as e:
+                    log_warning("读取文件信息失败", file=entry.path, phase='walk', error=e)
+    except OSError as e:
+        log_warning("读取目录失败", file=dir_path, phase='walk', error=e)
+        return
+
+    for entry in subdirs:
+        _scan_dir(kind, entry.path, rel_dir + os.sep + entry.name, extension, recursive, out, cancel_token)
+
+
+def walk_pack(pack_info, kinds=None, cancel_token=None):
+    """单次遍历包目录，将文件按类别分组
+
+    每个目录只会被 os.scandir 读取一次，文件的 stat 信息随遍历一并获得。
+
+    Args:
+        pack_info: 包信息对象
+        kinds: 需要的类别（顶层目录名）集合，为 None 时返回该包类型的全部类别
+        cancel_token: 取消标记(CancelToken)，每进入一个目录前检查
+
+    Returns:
+        dict: 类别 -> PackFile 列表
+
+    Raises:
+        ScanCancelled: 扫描被取消
+    """
+    layout = PACK_LAYOUT.get(pack_info.type, {})
+    files_by_kind = {kind: [] for kind in layout if kinds is None or kind in kinds}
+    if not files_by_kind:
+        return files_by_kind
+
+    with timing.span('walk'):
+        try:
+            with os.scandir(pack_info.path) as it:
+                top_dirs = [entry for entry in it if entry.name in files_by_kind and entry.is_dir()]
+        except OSError as e:
+            log_warning("读取包目录失败", pack=pack_info.path, phase='walk', error=e)
+            return files_by_kind
+
+        for entry in top_dirs:
+            extension, recursive = layout[entry.name]
+            _scan_dir(entry.name, entry.path, entry.name, extension, recursive, files_by_kind[entry.name],
+                      cancel_token)
+
+    timing.count('files', sum(len(pack_files) for pack_files in files_by_kind.values()))
+    return files_by_kind
+
+
+def extract_files(pack_files, extract_func, index=None, backend=None, error_label='处理文件失败', on_results=None,
+                  cancel_token=None):
+    """对一组文件执行提取函数，结果按文件顺序合并
+
+    提取函数和扫描索引使用字典表示条目，合并时统一转换为紧凑的 Entry 对象。
+
+    Args:
+        pack_files: PackFile 列表
+        extract_func: 单文件提取函数，接收文件路径并返回条目列表
+        index: 扫描索引(ScanIndex)，未修改的文件直接从索引读取
+        backend: 执行后端(ExtractBackend)，为 None 时在当前线程逐个提取
+        error_label: 提取失败时输出的提示
+        on_results: 每个文件的条目就绪时按文件顺序调用，用于流式显示结果
+        cancel_token: 取消标记(CancelToken)，每处理一个文件前检查
+
+    Returns:
+        tuple: (Entry 列表, 失败的文件数量)
+
+    Raises:
+        ScanCancelled: 扫描被取消
+    """
+    cached_list = [None] * len(pack_files)
+    pending_paths = []
+    with timing.span('index'):
+        for i, pack_file in enumerate(pack_files):
+            if cancel_token is not None:
+                cancel_token.raise_if_cancelled()
+            if index is not None:
+                cached_list[i] = index.lookup(pack_file.rel_path, pack_file.path, pack_file.stat)
+            if cached_list[i] is None:
+                pending_paths.append(pack_file.path)
+    timing.count('cached_files', len(pack_files) - len(pending_paths))
+
+    # 待提取文件在后台并行处理，这里按文件顺序依次取用，已缓存的文件无需等待
+    outcomes = None
+    if pending_paths:
+        backend = backend or ExtractBackend('serial', cancel_token=cancel_token)
+        outcomes = backend.imap(extract_func, pending_paths)
+
+    results = []
+    failed_count = 0
+    try:
+        for pack_file, file_results in zip(pack_files, cached_list):
+            if cancel_token is not None:
+                cancel_token.raise_if_cancelled()
+            if file_results is None:
+                ok, payload = next(outcomes)
+                if not ok:
+                    # 损坏的包中大量文件以同样的原因失败，相同的记录由日志服务合并
+                    log_error(error_label, detail=payload, file=pack_file.path, phase='extract')
+                    failed_count += 1
+                    continue
+                file_results = payload
+                if index is not None:
+                    index.update(pack_file.rel_path, pack_file.path, pack_file.stat, file_results)
+            if file_results:
+                entries = [Entry.from_dict(data) for data in file_results]
+                results.extend(entries)
+                if on_results is not None:
+                    on_results(entries)
+    finally:
+        # 提前退出时立即关闭生成器，撤销尚未开始的批次
+        if outcomes is not None:
+            outcomes.close()
+    return results, failed_count
@@ -0,0 +1,70 @@
+"""后台任务：在全局调度器(services.task_scheduler)的 tasks 池中执行的操作
+
+替代原先为每次查找、导入、合成、格式化单独创建的 QThread，用法保持一致：
+start()、stop()、isRunning() 和无参数的 finished 信号。
+"""
+import threading
+import traceback
+from PyQt6.QtCore import QObject, pyqtSignal
+from search_function.cancellation import CancelToken
+from .task_scheduler import scheduler, PRIORITY_NORMAL
+from .log_service import log_error
+
+
+class BackgroundTask(QObject):
+    """在 tasks 池中执行 run() 的后台任务
+
+    子类实现 run()，通过自己的信号把结果交回界面线程（跨线程的信号连接自动排队）。
+    run() 结束或任务在开始前被撤销后发出 finished，之后可以安全地 deleteLater。
+    priority 决定排队顺序；stop() 设置 cancel_token 并撤销尚未开始的任务，
+    已经开始的 run() 应在适当的位置检查 cancel_token.cancelled。
+    """
+    finished = pyqtSignal()
+    priority = PRIORITY_NORMAL
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.cancel_token = CancelToken()
+        self._started = False
+        self._done = threading.Event()
+        self._future = None
+
+    def run(self):
+        raise NotImplementedError
+
+    def start(self):
+        """提交到 tasks 池，重复调用无效"""
+        if self._started:
+            return
+        self._started = True
+        self._future = scheduler.submit(self._execute, priority=self.priority)
+        # 撤销尚未开始的任务时回调在调用 stop 的线程中执行，同样会发出 finished
+        self._future.add_done_callback(lambda _future: self._finish())
+
+    def _execute(self):
+        if self.cancel_token.cancelled:
+            return
+        try:
+            self.run()
+        except Exception as e:
+            log_error("后台任务出错", detail=traceback.format_exc(), task=type(self).__name__, error=e)
+
+    def _finish(self):
+        self._done.set()
+        self.finished.emit()
+
+    def stop(self):
+        """请求取消：尚未开始的任务直接撤销，正在运行的任务由 run() 自行检查后退出"""
+        self.cancel_token.cancel()
+        if self._future is not None:
+            self._future.cancel()
+
+    def isRunning(self):
+        """已经提交且尚未结束"""
+        return self._started and not self._done.is_set()
+
+    def wait(self, timeout=None):
+        """等待任务结束（秒），返回是否已结束；不应在 tasks 池的线程中调用"""
+        if not self._started:
+            return True
+        return self._done.wait(timeout)
@@ -1,5 +1,23 @@
+"""日志服务：调用方只把记录放入队列，由后台线程批量写入当天的日志文件
+
+- 级别：DEBUG、INFO、WARNING、ERROR，低于 MIN_LEVEL 的记录直接丢弃
+- 结构化字段：pack、file、phase 等以 key=value 的形式附加在消息后，detail（例如异常堆栈）另起几行
+- 批量写入：日志文件保持打开，后台线程每次取出队列中的全部记录一并写入
+- 按大小轮转：文件超过 MAX_LOG_BYTES 时改名为 YYYY-MM-DD.1.log 等，最多保留 BACKUP_COUNT 个
+- 合并重复：COALESCE_WINDOW 秒内级别、消息、包和阶段都相同的记录只写第一条，
+  其余只计数并记录部分文件名，窗口结束时写一行汇总
+- WARNING 及以上级别同时输出到控制台（同样经过合并）
+
+子进程（进程池中的提取任务）中不启动后台线程，记录直接输出到控制台，避免多个进程同时轮转同一个文件。
+"""
 import os
+import sys
+import time
+import queue
+import atexit
 import datetime
+import threading
+import multiprocessing
 
 # 确定项目根目录，以便将logs目录创建在根目录下
 # __file__ -> services/log_service.py
@@ -8,34 +26,311 @@ import datetime
 PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 LOG_DIR = os.path.join(PROJECT_ROOT, 'logs')
 
-def log_error(message: str):
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+LEVEL_NAMES = {DEBUG: 'DEBUG', INFO: 'INFO', WARNING: 'WARNING', ERROR: 'ERROR'}
+
+# 写入日志文件的最低级别
+MIN_LEVEL = INFO
+# 同时输出到控制台的最低级别
+CONSOLE_LEVEL = WARNING
+# 单个日志文件的最大字节数，超过后轮转
+MAX_LOG_BYTES = 5 * 1024 * 1024
+# 轮转后保留的旧文件数量
+BACKUP_COUNT = 3
+# 后台线程两次写入之间的最长间隔（秒）
+FLUSH_INTERVAL = 0.5
+# 相同记录的合并窗口（秒）
+COALESCE_WINDOW = 5.0
+# 汇总行中最多列出的文件数
+COALESCE_SAMPLE_FILES = 5
+
+# 参与合并判断的字段；file 等其余字段不同的记录也会被合并
+_COALESCE_FIELDS = ('pack', 'phase')
+
+
+class _Record:
+    __slots__ = ('time', 'level', 'message', 'fields', 'detail')
+
+    def __init__(self, level, message, fields, detail):
+        self.time = time.time()
+        self.level = level
+        self.message = message
+        self.fields = fields
+        self.detail = detail
+
+    def coalesce_key(self):
+        return (self.level, self.message) + tuple(self.fields.get(name) for name in _COALESCE_FIELDS)
+
+
+class _Coalesced:
+    """合并窗口内被省略的重复记录"""
+    __slots__ = ('first', 'expires', 'count', 'files')
+
+    def __init__(self, record):
+        self.first = record
+        self.expires = record.time + COALESCE_WINDOW
+        self.count = 0
+        self.files = []
+
+    def add(self, record):
+        self.count += 1
+        file = record.fields.get('file')
+        if file is not None and len(self.files) < COALESCE_SAMPLE_FILES:
+            self.files.append(file)
+
+
+def _format_fields(fields):
+    return ''.join(f" {key}={value}" for key, value in fields.items())
+
+
+def _format_record(record):
+    timestamp = datetime.datetime.fromtimestamp(record.time).strftime('[%H-%M-%S]')
+    line = f"{timestamp} [{LEVEL_NAMES.get(record.level, record.level)}] {record.message}{_format_fields(record.fields)}\n"
+    if record.detail:
+        line += record.detail.rstrip('\n') + '\n'
+    return line
+
+
+def _format_summary(coalesced):
+    first = coalesced.first
+    timestamp = datetime.datetime.now().strftime('[%H-%M-%S]')
+    fields = {key: first.fields[key] for key in _COALESCE_FIELDS if key in first.fields}
+    files = ''
+    if coalesced.files:
+        files = f" files={', '.join(coalesced.files)}"
+        if coalesced.count > len(coalesced.files):
+            files += ' ...'
+    return (f"{timestamp} [{LEVEL_NAMES.get(first.level, first.level)}] 上述消息又出现了 {coalesced.count} 次: "
+            f"{first.message}{_format_fields(fields)}{files}\n")
+
+
+class _LogWriter:
+    """后台写入线程：批量取出记录，合并重复项，写入并按大小轮转日志文件"""
+
+    def __init__(self, log_dir):
+        self.log_dir = log_dir
+        self._queue = queue.SimpleQueue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._file = None
+        self._file_date = None
+        self._file_size = 0
+        self._coalesced = {}
+
+    def put(self, record):
+        if self._thread is None:
+            self._start()
+        self._queue.put(record)
+
+    def _start(self):
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='LogWriter', daemon=True)
+                self._thread.start()
+                atexit.register(self.close)
+
+    def flush(self, timeout=5.0):
+        """等待队列中已有的记录写入文件，并写出所有合并汇总"""
+        if self._thread is None:
+            return
+        done = threading.Event()
+        self._queue.put(('flush', done))
+        done.wait(timeout)
+
+    def close(self):
+        """写出剩余记录并停止后台线程，程序退出时自动调用"""
+        thread = self._thread
+        if thread is None or not thread.is_alive():
+            return
+        self._queue.put(('stop', None))
+        thread.join(5.0)
+
+    def _run(self):
+        while True:
+            # 有待写出的合并汇总时定时醒来，否则一直等待新记录
+            timeout = FLUSH_INTERVAL if self._coalesced else None
+            try:
+                items = [self._queue.get(timeout=timeout)]
+            except queue.Empty:
+                items = []
+            # 一次取出队列中已有的全部记录，合并为一次写入
+            while True:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            records = []
+            commands = []
+            for item in items:
+                if isinstance(item, _Record):
+                    records.append(item)
+                else:
+                    commands.append(item)
+
+            force = bool(commands)
+            try:
+                self._write_batch(records, force)
+            except Exception as e:
+                # 如果日志记录本身失败，则在控制台打印错误，以防信息丢失
+                print(f"写入日志文件失败: {e}", file=sys.stderr)
+                for record in records:
+                    print(_format_record(record), end='', file=sys.stderr)
+
+            stop = False
+            for command, event in commands:
+                if command == 'flush':
+                    if self._file is not None:
+                        self._file.flush()
+                    event.set()
+                elif command == 'stop':
+                    stop = True
+            if stop:
+                if self._file is not None:
+                    self._file.close()
+                    self._file = None
+                return
+
+    def _write_batch(self, records, force=False):
+        lines = []
+        console_lines = []
+        now = time.time()
+        for record in records:
+            key = record.coalesce_key()
+            coalesced = self._coalesced.get(key)
+            if coalesced is not None and record.time < coalesced.expires:
+                coalesced.add(record)
+                continue
+            if coalesced is not None and coalesced.count:
+                self._emit(_format_summary(coalesced), coalesced.first.level, lines, console_lines)
+            self._coalesced[key] = _Coalesced(record)
+            self._emit(_format_record(record), record.level, lines, console_lines)
+
+        # 窗口已结束（或需要立即写出）的合并项写一行汇总
+        for key, coalesced in list(self._coalesced.items()):
+            if force or coalesced.expires <= now:
+                if coalesced.count:
+                    self._emit(_format_summary(coalesced), coalesced.first.level, lines, console_lines)
+                del self._coalesced[key]
+
+        if console_lines:
+            sys.stderr.write(''.join(console_lines))
+        if lines:
+            self._write_lines(lines)
+
+    @staticmethod
+    def _emit(line, level, lines, console_lines):
+        lines.append(line)
+        if level >= CONSOLE_LEVEL:
+            console_lines.append(line)
+
+    def _write_lines(self, lines):
+        data = ''.join(lines).encode('utf-8')
+        self._open_file()
+        if self._file_size and self._file_size + len(data) > MAX_LOG_BYTES:
+            self._rotate()
+            self._open_file()
+        self._file.write(data)
+        self._file.flush()
+        self._file_size += len(data)
+
+    def _log_path(self, date, index=0):
+        suffix = f'.{index}' if index else ''
+        return os.path.join(self.log_dir, f'{date}{suffix}.log')
+
+    def _open_file(self):
+        """打开当天的日志文件，日期变化时切换到新文件"""
+        date = datetime.datetime.now().strftime('%Y-%m-%d')
+        if self._file is not None and self._file_date == date:
+            return
+        if self._file is not None:
+            self._file.close()
+        os.makedirs(self.log_dir, exist_ok=True)
+        self._file = open(self._log_path(date), 'ab')
+        self._file_date = date
+        self._file_size = self._file.tell()
+
+    def _rotate(self):
+        """当前文件改名为 .1，已有的 .1 依次后移，超出 BACKUP_COUNT 的删除"""
+        self._file.close()
+        self._file = None
+        date = self._file_date
+        for index in range(BACKUP_COUNT, 0, -1):
+            source = self._log_path(date, index - 1)
+            if not os.path.exists(source):
+                continue
+            target = self._log_path(date, index)
+            if index == BACKUP_COUNT and os.path.exists(target):
+                os.remove(target)
+            os.replace(source, target)
+
+
+_writer = _LogWriter(LOG_DIR)
+
+
+def log(level, message, detail=None, **fields):
+    """记录一条日志
+
+    Args:
+        level: 级别，DEBUG、INFO、WARNING 或 ERROR
+        message: 消息；同一类问题应使用相同的消息，具体的文件等放在字段中，以便合并重复记录
+        detail: 附加的多行文本，例如异常堆栈
+        **fields: 结构化字段，例如 pack、file、phase
+    """
+    if level < MIN_LEVEL:
+        return
+    # 异常对象转为文本，避免在写入前一直引用其堆栈帧
+    for key, value in fields.items():
+        if isinstance(value, BaseException):
+            fields[key] = str(value)
+    record = _Record(level, message, fields, detail)
+    if multiprocessing.parent_process() is not None:
+        # 子进程中直接输出到控制台
+        if level >= CONSOLE_LEVEL:
+            print(_format_record(record), end='', file=sys.stderr)
+        return
+    _writer.put(record)
+
+
+def log_debug(message: str, detail=None, **fields):
+    log(DEBUG, message, detail, **fields)
+
+
+def log_info(message: str, detail=None, **fields):
+    """
+    记录一般信息（例如计时报告）。
+
+    Args:
+        message (str): 需要记录的信息。
+        detail: 附加的多行文本。
+        **fields: 结构化字段，例如 pack、file、phase。
+    """
+    log(INFO, message, detail, **fields)
+
+
+def log_warning(message: str, detail=None, **fields):
+    log(WARNING, message, detail, **fields)
+
+
+def log_error(message: str, detail=None, **fields):
     """
     将错误信息记录到当天的日志文件中。
 
     日志文件将保存在项目根目录下的 'logs' 文件夹中。
-    文件名格式为 YYYY-MM-DD.log。
-    每条日志记录都会带有 HH-MM-SS 格式的时间戳。
+    文件名格式为 YYYY-MM-DD.log，超过 MAX_LOG_BYTES 后轮转。
+    每条日志记录都会带有 HH-MM-SS 格式的时间戳和级别。
 
     Args:
         message (str): 需要记录的错误信息。
+        detail: 附加的多行文本，例如异常堆栈。
+        **fields: 结构化字段，例如 pack、file、phase。
     """
-    try:
-        # 确保日志目录存在
-        os.makedirs(LOG_DIR, exist_ok=True)
-
-        # 获取当前日期和时间
-        now = datetime.datetime.now()
-        log_filename = now.strftime('%Y-%m-%d') + '.log'
-        log_filepath = os.path.join(LOG_DIR, log_filename)
-
-        # 格式化日志消息
-        timestamp = now.strftime('[%H-%M-%S]')
-        formatted_message = f"{timestamp} {message}\n"
-
-        # 以追加模式写入文件
-        with open(log_filepath, 'a', encoding='utf-8') as f:
-            f.write(formatted_message)
-    except Exception as e:
-        # 如果日志记录本身失败，则在控制台打印错误，以防信息丢失
-        print(f"写入日志文件失败: {e}")
-        print(f"原始错误信息: {message}")
+    log(ERROR, message, detail, **fields)
+
+
+def flush_logs(timeout=5.0):
+    """等待已记录的日志写入文件，例如命令行程序结束前"""
+    _writer.flush(timeout)
@@ -0,0 +1,178 @@
+"""全局任务调度器：整个程序共用一组有界的工作线程和进程，替代每次操作单独创建的线程和线程池
+
+- tasks 池：查找、导入、合成、格式化等操作本身，线程数为 TASK_WORKERS
+- cpu 池：提取器的文件批次，线程数默认为CPU核心数，可按设置调整
+- 进程池：进程后端的文件批次，首次使用时创建并一直复用
+- io 池：保存时并行写入文件，线程数为 IO_WORKERS
+
+任务按优先级排队（数值越小越先执行），交互式查找排在后台格式化之前；尚未开始的任务可以取消。
+tasks 池中的任务可以等待 cpu 池或进程池中的批次，但不应等待 tasks 池中的其他任务，
+否则所有线程都在等待时会互相阻塞（全局搜索因此用回调衔接各个包的扫描）。
+本模块不依赖 Qt，命令行和子进程中同样可用；线程在首次提交任务时才创建。
+"""
+import os
+import heapq
+import itertools
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+
+# 优先级：数值越小越先执行
+PRIORITY_INTERACTIVE = 0
+PRIORITY_NORMAL = 1
+PRIORITY_BACKGROUND = 2
+
+# tasks 池的线程数，即同时进行的操作数量上限
+TASK_WORKERS = 4
+# io 池的线程数；写文件主要在等待磁盘，线程数不必与CPU核心数相同
+IO_WORKERS = 8
+
+
+class WorkerPool:
+    """按优先级执行任务的有界线程池
+
+    线程按需创建，空闲后保留以供复用；调小线程数时多余的线程在空闲后退出。
+    submit 返回 concurrent.futures.Future，尚未开始的任务可以通过 Future.cancel() 取消。
+    """
+
+    def __init__(self, name, max_workers):
+        self.name = name
+        self._max_workers = max(1, max_workers)
+        self._queue = []  # (优先级, 序号, Future, 函数, 参数, 关键字参数)
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._threads = 0
+        self._idle = 0  # 正在等待且尚未被唤醒的线程数
+        self._thread_names = itertools.count(1)
+
+    @property
+    def max_workers(self):
+        return self._max_workers
+
+    def set_max_workers(self, max_workers):
+        """调整线程数上限，调小时多余的线程在当前任务完成后退出"""
+        with self._condition:
+            self._max_workers = max(1, max_workers)
+            # 唤醒空闲线程，让多余的线程检查是否需要退出
+            self._idle = 0
+            self._condition.notify_all()
+
+    def submit(self, fn, *args, priority=PRIORITY_NORMAL, **kwargs):
+        """提交任务
+
+        Args:
+            fn: 要执行的函数
+            *args, **kwargs: 传给 fn 的参数
+            priority: 优先级，同一优先级按提交顺序执行
+
+        Returns:
+            Future: 任务的结果
+        """
+        future = Future()
+        with self._condition:
+            heapq.heappush(self._queue, (priority, next(self._sequence), future, fn, args, kwargs))
+            if self._idle > 0:
+                self._idle -= 1
+                self._condition.notify()
+            elif self._threads < self._max_workers:
+                self._threads += 1
+                thread = threading.Thread(target=self._worker, daemon=True,
+                                          name=f"{self.name}-{next(self._thread_names)}")
+                thread.start()
+        return future
+
+    def pending_count(self):
+        """排队中尚未开始的任务数"""
+        with self._condition:
+            return len(self._queue)
+
+    def _worker(self):
+        while True:
+            with self._condition:
+                while True:
+                    if self._threads > self._max_workers:
+                        self._threads -= 1
+                        return
+                    if self._queue:
+                        break
+                    self._idle += 1
+                    self._condition.wait()
+                _, _, future, fn, args, kwargs = heapq.heappop(self._queue)
+
+            # 已被取消的任务直接跳过
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+            # 释放引用，避免空闲线程一直持有上一个任务的参数和结果
+            del future, fn, args, kwargs
+
+
+class TaskScheduler:
+    """程序唯一的调度器，管理 tasks 池、cpu 池、io 池和进程池"""
+
+    def __init__(self, task_workers=TASK_WORKERS):
+        self.tasks = WorkerPool('Task', task_workers)
+        self._cpu = None
+        self._io = None
+        self._process_pool = None
+        self._process_workers = 0
+        self._lock = threading.Lock()
+
+    def submit(self, fn, *args, priority=PRIORITY_NORMAL, **kwargs):
+        """在 tasks 池中执行一个操作"""
+        return self.tasks.submit(fn, *args, priority=priority, **kwargs)
+
+    def cpu_pool(self, workers=0):
+        """返回共享的 cpu 池
+
+        Args:
+            workers: 线程数，0 表示使用CPU核心数；与当前设置不同时调整池的大小
+        """
+        workers = workers if workers and workers > 0 else (os.cpu_count() or 1)
+        with self._lock:
+            if self._cpu is None:
+                self._cpu = WorkerPool('Extract', workers)
+            elif self._cpu.max_workers != workers:
+                self._cpu.set_max_workers(workers)
+            return self._cpu
+
+    def io_pool(self):
+        """返回共享的 io 池"""
+        with self._lock:
+            if self._io is None:
+                self._io = WorkerPool('IO', IO_WORKERS)
+            return self._io
+
+    def process_pool(self, workers=0):
+        """返回共享的进程池
+
+        Args:
+            workers: 进程数，0 表示使用CPU核心数；与当前进程池不同或进程池已损坏时重新创建，
+                旧进程池中正在处理的批次照常完成
+        """
+        workers = workers if workers and workers > 0 else (os.cpu_count() or 1)
+        with self._lock:
+            pool = self._process_pool
+            if pool is not None and (self._process_workers != workers or getattr(pool, '_broken', False)):
+                pool.shutdown(wait=False, cancel_futures=True)
+                pool = None
+            if pool is None:
+                pool = ProcessPoolExecutor(max_workers=workers)
+                self._process_pool = pool
+                self._process_workers = workers
+            return pool
+
+    def shutdown(self):
+        """关闭进程池，程序退出时调用；线程均为守护线程，无需等待"""
+        with self._lock:
+            pool, self._process_pool = self._process_pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+# 创建全局实例
+scheduler = TaskScheduler()
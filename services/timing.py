@@ -0,0 +1,223 @@
+"""分阶段计时：记录查找、保存、导入、合成、格式化等操作中各阶段的耗时与文件数、字节数
+
+用法:
+    with timing.operation('search', pack=pack_info.name):
+        with timing.span('walk'):
+            ...
+        timing.count('files', len(files))
+
+operation 在当前线程中激活一条计时记录，期间在同一线程中调用的 span / count 都记入这条记录；
+没有激活的记录时（包括计时未开启时）span 返回共享的空对象，count 直接返回，开销只有一次属性查找。
+操作结束时汇总为报告，写入日志并依次交给监听者（界面通过 services.timing_signals 以 Qt 信号接收）。
+
+同一阶段在多个线程中并行执行时耗时累加，因此各阶段之和可能大于操作的总耗时；
+阶段也可以嵌套（例如 store 包含 filter），各阶段的耗时相互独立统计。
+本模块不依赖 Qt，命令行和子进程中同样可用。
+"""
+import time
+import threading
+from .log_service import log_info, log_error
+
+_enabled = False
+_listeners = []
+_local = threading.local()
+
+
+def set_enabled(enabled):
+    """开启或关闭计时；关闭后新的操作不再记录，已开始的操作照常结束"""
+    global _enabled
+    _enabled = bool(enabled)
+
+
+def is_enabled():
+    return _enabled
+
+
+def add_listener(callback):
+    """注册报告监听者，callback 接收报告字典，在结束操作的线程中调用"""
+    if callback not in _listeners:
+        _listeners.append(callback)
+
+
+def remove_listener(callback):
+    if callback in _listeners:
+        _listeners.remove(callback)
+
+
+class _NullSpan:
+    """计时未激活时使用的空上下文"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ('recorder', 'phase', 'start')
+
+    def __init__(self, recorder, phase):
+        self.recorder = recorder
+        self.phase = phase
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.recorder.add(self.phase, time.perf_counter() - self.start)
+        return False
+
+
+class Recorder:
+    """一次操作的计时记录：各阶段的累计耗时、调用次数，以及各项计数
+
+    可以被多个线程同时写入（例如线程池中的提取任务）。
+    """
+
+    def __init__(self):
+        self.phases = {}  # 阶段 -> [累计秒数, 次数]
+        self.counts = {}  # 计数名称 -> 数值
+        self._lock = threading.Lock()
+
+    def add(self, phase, seconds, calls=1):
+        with self._lock:
+            stat = self.phases.get(phase)
+            if stat is None:
+                self.phases[phase] = [seconds, calls]
+            else:
+                stat[0] += seconds
+                stat[1] += calls
+
+    def count(self, name, amount=1):
+        with self._lock:
+            self.counts[name] = self.counts.get(name, 0) + amount
+
+    def span(self, phase):
+        return _Span(self, phase)
+
+    def snapshot(self):
+        """返回可跨进程传递的 (阶段, 计数) 副本"""
+        with self._lock:
+            return {phase: tuple(stat) for phase, stat in self.phases.items()}, dict(self.counts)
+
+    def merge(self, snapshot):
+        """合并其他线程或子进程中的记录"""
+        phases, counts = snapshot
+        for phase, (seconds, calls) in phases.items():
+            self.add(phase, seconds, calls)
+        for name, amount in counts.items():
+            self.count(name, amount)
+
+
+def current():
+    """当前线程中激活的记录，没有时返回 None"""
+    return getattr(_local, 'recorder', None)
+
+
+def activate(recorder):
+    """在当前线程中激活记录（None 表示取消激活），返回之前激活的记录以便恢复"""
+    previous = getattr(_local, 'recorder', None)
+    _local.recorder = recorder
+    return previous
+
+
+def span(phase):
+    """计时一个阶段：with timing.span('read'): ..."""
+    recorder = getattr(_local, 'recorder', None)
+    if recorder is None:
+        return _NULL_SPAN
+    return _Span(recorder, phase)
+
+
+def count(name, amount=1):
+    """累加一项计数，例如 files、bytes"""
+    recorder = getattr(_local, 'recorder', None)
+    if recorder is not None:
+        recorder.count(name, amount)
+
+
+def merge(snapshot):
+    """把其他线程或子进程的记录（Recorder.snapshot()）合并到当前记录"""
+    recorder = getattr(_local, 'recorder', None)
+    if recorder is not None and snapshot is not None:
+        recorder.merge(snapshot)
+
+
+class _Operation:
+    __slots__ = ('name', 'fields', 'recorder', 'outer', 'start')
+
+    def __init__(self, name, fields):
+        self.name = name
+        self.fields = fields
+
+    def __enter__(self):
+        self.outer = getattr(_local, 'recorder', None)
+        if self.outer is None:
+            self.recorder = Recorder()
+            _local.recorder = self.recorder
+        else:
+            # 嵌套的操作作为外层操作的一个阶段记录
+            self.recorder = self.outer
+        self.start = time.perf_counter()
+        return self.recorder
+
+    def __exit__(self, exc_type, exc_value, tb):
+        elapsed = time.perf_counter() - self.start
+        if self.outer is not None:
+            self.outer.add(self.name, elapsed)
+            return False
+        _local.recorder = None
+        _publish(self.name, self.fields, elapsed, self.recorder, exc_type is None)
+        return False
+
+
+def operation(name, **fields):
+    """计时一次完整的操作
+
+    Args:
+        name: 操作名称，例如 search、save、import、compose、format
+        **fields: 写入报告的附加信息，例如包名
+
+    Returns:
+        上下文管理器；计时未开启时返回空上下文
+    """
+    if not _enabled:
+        return _NULL_SPAN
+    return _Operation(name, fields)
+
+
+def format_report(report):
+    """把报告格式化为一行文本，用于日志和命令行输出"""
+    parts = [f"[计时] {report['operation']}"]
+    parts.extend(f"{key}={value}" for key, value in report['fields'].items())
+    parts.append(f"total={report['total'] * 1000:.1f}ms")
+    if not report['success']:
+        parts.append('failed')
+    parts.extend(f"{phase}={stat['seconds'] * 1000:.1f}ms/{stat['calls']}"
+                 for phase, stat in report['phases'].items())
+    parts.extend(f"{name}={amount}" for name, amount in report['counts'].items())
+    return ' '.join(parts)
+
+
+def _publish(name, fields, elapsed, recorder, success):
+    phases, counts = recorder.snapshot()
+    report = {
+        'operation': name,
+        'fields': fields,
+        'total': elapsed,
+        'success': success,
+        'phases': {phase: {'seconds': seconds, 'calls': calls} for phase, (seconds, calls) in phases.items()},
+        'counts': counts,
+    }
+    log_info(format_report(report))
+    for callback in list(_listeners):
+        try:
+            callback(report)
+        except Exception as e:
+            log_error("计时报告处理失败", phase='timing', error=e)
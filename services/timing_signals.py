@@ -0,0 +1,21 @@
+from PyQt6.QtCore import QObject, pyqtSignal
+from config import cfg
+from . import timing
+
+
+class TimingSignals(QObject):
+    """把计时报告转为 Qt 信号，并让计时开关跟随设置
+
+    报告在结束操作的工作线程中产生，连接到界面对象的槽函数会通过队列在界面线程中执行。
+    """
+    report_ready = pyqtSignal(dict)  # timing 模块生成的报告字典
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        timing.set_enabled(cfg.enableTiming.value)
+        cfg.enableTiming.valueChanged.connect(timing.set_enabled)
+        timing.add_listener(self.report_ready.emit)
+
+
+# 创建全局实例
+timing_signals = TimingSignals()
@@ -1,5 +1,5 @@
 from PyQt6.QtWidgets import QFrame, QVBoxLayout, QFileDialog
-from qfluentwidgets import setFont, OptionsSettingCard, FluentIcon, SettingCardGroup, RangeSettingCard, qconfig, PrimaryPushSettingCard
+from qfluentwidgets import setFont, OptionsSettingCard, FluentIcon, SettingCardGroup, RangeSettingCard, qconfig, PrimaryPushSettingCard, SwitchSettingCard
 from config import cfg, check_app_folder
 import os
 from functions import show_message_bar
@@ -35,6 +35,43 @@ class SettingInterface(QFrame):
             parent=self.settingGroup
         )
         
+        # 创建提取方式设置卡片
+        self.extractBackendCard = OptionsSettingCard(
+            cfg.extractBackend,
+            FluentIcon.SPEED_HIGH,
+            "提取方式",
+            "查找时解析文件的方式，多进程可以利用全部CPU核心",
+            texts=["单线程", "多线程", "多进程"],
+            parent=self.settingGroup
+        )
+        
+        # 创建提取并发数量设置卡片
+        self.extractWorkersCard = RangeSettingCard(
+            cfg.extractWorkers,
+            FluentIcon.APPLICATION,
+            "提取并发数量",
+            "多线程/多进程提取时的并发数量，0 表示使用CPU核心数",
+            parent=self.settingGroup
+        )
+        
+        # 创建监视模式设置卡片
+        self.watchFilesCard = SwitchSettingCard(
+            FluentIcon.SYNC,
+            "监视文件变化",
+            "查找完成后自动刷新在外部编辑器中修改过的文件，未保存的修改不受影响",
+            configItem=cfg.watchFiles,
+            parent=self.settingGroup
+        )
+        
+        # 创建分阶段计时设置卡片
+        self.enableTimingCard = SwitchSettingCard(
+            FluentIcon.STOP_WATCH,
+            "记录耗时",
+            "将查找、保存、导入、合成和格式化各阶段的耗时写入日志，用于排查性能问题",
+            configItem=cfg.enableTiming,
+            parent=self.settingGroup
+        )
+        
         # 创建应用文件存储目录设置卡片（改为主题色按钮）
         self.storagePathCard = PrimaryPushSettingCard(
             "选择目录",
@@ -56,6 +93,10 @@ class SettingInterface(QFrame):
         # 添加卡片到设置组
         self.settingGroup.addSettingCard(self.themeCard)
         self.settingGroup.addSettingCard(self.copyNumberCard)
+        self.settingGroup.addSettingCard(self.extractBackendCard)
+        self.settingGroup.addSettingCard(self.extractWorkersCard)
+        self.settingGroup.addSettingCard(self.watchFilesCard)
+        self.settingGroup.addSettingCard(self.enableTimingCard)
         self.settingGroup.addSettingCard(self.storagePathCard)
         self.settingGroup.addSettingCard(self.aboutCard)
         
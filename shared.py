@@ -1,3 +1,2 @@
-file_save = None
 error_json_pack_path = None  # 存储包含解析错误JSON文件的包路径
 user_folder = None  # 存储用户选择的文件夹路径
\ No newline at end of file
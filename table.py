@@ -1,36 +1,47 @@
 import os
 import subprocess
-from PyQt6.QtCore import Qt, QObject, pyqtSignal
-from PyQt6.QtWidgets import QTableWidgetItem, QStyledItemDelegate, QAbstractItemView
+from array import array
+from bisect import bisect_left
+from itertools import filterfalse
+from PyQt6.QtCore import Qt, QObject, QAbstractTableModel, QModelIndex, pyqtSignal
+from PyQt6.QtWidgets import QStyledItemDelegate, QHeaderView
 from PyQt6.QtGui import QGuiApplication
-from qfluentwidgets import TableWidget
+from qfluentwidgets import TableView
 from save import translation_store
 
+# 模型中的自定义角色：数据源中的索引、文件完整路径
+INDEX_ROLE = Qt.ItemDataRole.UserRole
+FILEPATH_ROLE = Qt.ItemDataRole.UserRole + 1
+
+# 各包类型的表头
+HEADER_LABELS = {
+    'resources': ('键值', '类型', '值'),
+    'behavior': ('文件名', '类型', '值'),
+    'global': ('包 / 键值或文件名', '类型', '值'),
+}
+
 class ReadOnlyDelegate(QStyledItemDelegate):
     """只读单元格代理"""
     def createEditor(self, parent, option, index):
         return None
 
-class CustomTableWidget(TableWidget):
-    """自定义表格控件，控制双击行为和可编辑性"""
+class CustomTableView(TableView):
+    """自定义表格视图，控制双击行为；可编辑性由模型的 flags 决定"""
     def mouseDoubleClickEvent(self, event):
         index = self.indexAt(event.pos())
         if not index.isValid():
             return super().mouseDoubleClickEvent(event)
-        row = index.row()
         col = index.column()
         if col == 0:
             # 文件名列, 双击在资源管理器中打开文件
-            item = self.item(row, col)
-            if item:
-                filepath = item.data(Qt.ItemDataRole.UserRole + 1)
-                if filepath and os.path.exists(filepath):
-                    # 使用 subprocess 在资源管理器中打开并选中文件
-                    normalized_path = os.path.normpath(filepath)
-                    subprocess.Popen(f'explorer /select,"{normalized_path}"')
-                else:
-                    # 如果没有filepath或文件不存在, 作为后备可以复制单元格内容
-                    QGuiApplication.clipboard().setText(item.text())
+            filepath = index.data(FILEPATH_ROLE)
+            if filepath and os.path.exists(filepath):
+                # 使用 subprocess 在资源管理器中打开并选中文件
+                normalized_path = os.path.normpath(filepath)
+                subprocess.Popen(f'explorer /select,"{normalized_path}"')
+            else:
+                # 如果没有filepath或文件不存在, 作为后备可以复制单元格内容
+                QGuiApplication.clipboard().setText(index.data() or '')
             return
         elif col == 1:
             # 类型列，双击无反应
@@ -38,12 +49,320 @@ class CustomTableWidget(TableWidget):
         else:
             # 其他列（值列）正常编辑
             return super().mouseDoubleClickEvent(event)
-    
-    def edit(self, index, trigger, event):
-        # 只允许第2列可编辑
-        if index.column() == 2:
-            return super().edit(index, trigger, event)
-        return False
+
+class TranslationTableModel(QAbstractTableModel):
+    """翻译表格的数据模型，直接读取翻译存储中的 Entry 列表
+
+    模型只记录每一行对应的条目在数据源中的索引，标识符、类型和值（换行符转义为 \\n）
+    在 data() 中按需生成：填充和追加只需要记录索引，视图也只会为可见的行请求数据。
+    单个包的数据源就是翻译存储中该包的列表，全局搜索时为各包结果依次拼接的列表（只读）。
+
+    可见的行由两层过滤得到：符合搜索文本的条目索引（_matched），再去掉隐藏中文时包含中文的条目。
+    每个条目是否包含中文记录在与数据源对应的字节数组中，切换隐藏中文时一次遍历匹配的索引即可重建可见行，
+    可见行数即 rows 的长度，无需逐行检查。
+    """
+    value_edited = pyqtSignal(int)  # 数据源索引，值已写入翻译存储
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.pack_info = None
+        self.pack_type = None
+        # 数据源；扫描过程中翻译存储可能已追加了尚未通知界面的批次，只使用前 count 条
+        self.entries = []
+        self.count = 0
+        # 各行（可见的条目）对应的数据源索引，按升序排列
+        self.rows = array('I')
+        # 符合搜索文本的条目索引，按升序排列；None 表示全部已接收的条目
+        self._matched = None
+        # 每个条目是否包含中文，与数据源一一对应
+        self._chinese = bytearray()
+        # 是否隐藏包含中文的条目，新追加的条目同样遵循该设置
+        self.hide_chinese = False
+        # 行为包中每个条目是其文件名的第几次出现（从 1 开始），用于生成唯一的显示文件名
+        self._ordinals = array('I')
+        self._filename_counts = {}
+        # 显示标识符到数据源索引的映射，首次粘贴时建立，之后随追加的批次更新
+        self._identifiers = None
+        # 全局搜索时各包结果在数据源中的起始索引及对应的包
+        self._pack_starts = []
+        self._packs = []
+
+    def reset(self, pack_type=None, pack_info=None):
+        """清空模型，之后通过 append 逐批接收 pack_type 类型的结果"""
+        self.beginResetModel()
+        self.pack_info = pack_info
+        self.pack_type = pack_type
+        self.entries = []
+        self.count = 0
+        self.rows = array('I')
+        self._matched = None
+        self._chinese = bytearray()
+        self._ordinals = array('I')
+        self._filename_counts = {}
+        self._identifiers = None
+        self._pack_starts = []
+        self._packs = []
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else 3
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return HEADER_LABELS.get(self.pack_type, ('', '', ''))[section]
+        return None
+
+    def flags(self, index):
+        flags = Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable
+        # 只有值列可编辑；全局搜索的结果只读
+        if index.column() == 2 and self.pack_type in ('resources', 'behavior'):
+            flags |= Qt.ItemFlag.ItemIsEditable
+        return flags
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or index.row() >= len(self.rows):
+            return None
+        data_index = self.rows[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole or role == Qt.ItemDataRole.EditRole:
+            column = index.column()
+            if column == 0:
+                return self.identifier(data_index)
+            if column == 1:
+                return self.entries[data_index]['type']
+            return self.display_value(data_index)
+        if role == INDEX_ROLE:
+            return data_index
+        if role == FILEPATH_ROLE and index.column() == 0:
+            # 存储完整文件路径，用于双击打开功能
+            if self._pack_type_of(data_index) != 'resources':
+                return self.entries[data_index].get('filepath')
+        return None
+
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        if role != Qt.ItemDataRole.EditRole or not index.isValid() or index.column() != 2:
+            return False
+        # 将表格中的文本转换为实际值（把 \\n 转为 \n）
+        return self.set_value(self.rows[index.row()], value.replace('\\n', '\n'))
+
+    def set_value(self, data_index, value):
+        """修改条目的值并写入翻译存储，值没有变化或不可编辑时返回 False"""
+        if self.pack_type not in ('resources', 'behavior') or not 0 <= data_index < self.count:
+            return False
+        old_value = self.entries[data_index]['value']
+        if value == old_value:
+            return False
+        if not translation_store.update_item(self.pack_info, data_index, value):
+            return False
+        row = self.row_of(data_index)
+        if row is not None:
+            cell = self.index(row, 2)
+            self.dataChanged.emit(cell, cell)
+        self.value_edited.emit(data_index)
+        return True
+
+    def set_values(self, values):
+        """批量修改多个条目的值：一次写入翻译存储，再一次性通知视图刷新
+
+        不逐条发出 value_edited，调用方在返回后自行处理修改通知。
+
+        Args:
+            values: 数据源索引到新值的字典
+
+        Returns:
+            list: 值实际发生变化的数据源索引
+        """
+        if self.pack_type not in ('resources', 'behavior'):
+            return []
+        entries = self.entries
+        updates = [(data_index, value) for data_index, value in values.items()
+                   if 0 <= data_index < self.count and entries[data_index]['value'] != value]
+        if not updates:
+            return []
+        updated = translation_store.update_items(self.pack_info, updates)
+        if updated and self.rows:
+            # 视图只重绘可见区域，整列通知一次即可
+            self.dataChanged.emit(self.index(0, 2), self.index(len(self.rows) - 1, 2))
+        return updated
+
+    def _pack_type_of(self, data_index):
+        if self.pack_type == 'global':
+            return self.pack_of(data_index).type
+        return self.pack_type
+
+    def pack_of(self, data_index):
+        """全局搜索时条目所属的包"""
+        return self._packs[bisect_left(self._pack_starts, data_index + 1) - 1]
+
+    def identifier(self, data_index):
+        """条目的显示标识符：资源包为键，行为包为文件名（重名文件追加序号），全局搜索时前加包名"""
+        entry = self.entries[data_index]
+        if self.pack_type == 'global':
+            pack_info = self.pack_of(data_index)
+            identifier = entry.get('key' if pack_info.type == 'resources' else 'filename', '')
+            return f"[{pack_info.name}] {identifier}"
+        if self.pack_type == 'resources':
+            return entry['key']
+        # 行为包使用基于完整结果生成的唯一文件名，保证过滤前后同一条目的显示名称不变
+        filename = entry.get('filename', '')
+        ordinal = self._ordinals[data_index]
+        return filename if ordinal == 1 else f"{filename}_{ordinal - 1}"
+
+    def display_value(self, data_index):
+        """条目在表格中显示的值（换行符转义为 \\n）"""
+        return self.entries[data_index]['value'].replace('\n', '\\n')
+
+    def find_identifier(self, identifier):
+        """按显示标识符查找条目的数据源索引，找不到时返回 None；标识符重复时返回最后一个"""
+        if self._identifiers is None:
+            self._identifiers = {self.identifier(data_index): data_index for data_index in range(self.count)}
+        return self._identifiers.get(identifier)
+
+    def row_of(self, data_index):
+        """条目所在的行，未显示时返回 None"""
+        row = bisect_left(self.rows, data_index)
+        if row < len(self.rows) and self.rows[row] == data_index:
+            return row
+        return None
+
+    def _extend_ordinals(self, entries):
+        """为新追加的行为包条目记录其文件名的出现次数"""
+        filename_counts = self._filename_counts
+        ordinals = self._ordinals
+        for entry in entries:
+            filename = entry.get('filename', '')
+            count = filename_counts.get(filename, 0) + 1
+            filename_counts[filename] = count
+            ordinals.append(count)
+
+    @staticmethod
+    def _chinese_flags(entries):
+        return bytes(1 if entry.get('has_chinese', False) else 0 for entry in entries)
+
+    def _visible(self, indices):
+        """从升序的条目索引中去掉需要隐藏的条目，返回可见的索引"""
+        if not self.hide_chinese:
+            return array('I', indices)
+        return array('I', filterfalse(self._chinese.__getitem__, indices))
+
+    def matched_count(self):
+        """符合搜索文本的条目数量（包括因隐藏中文而未显示的条目）"""
+        return self.count if self._matched is None else len(self._matched)
+
+    def append(self, start, batch, indices=None, pack_info=None):
+        """接收一批扫描结果，并在末尾显示其中符合条件的条目
+
+        Args:
+            start: 这批结果中第一条在数据源中的索引
+            batch: Entry 列表
+            indices: 这批结果中符合搜索文本的条目索引（数据源索引），为 None 时整批都符合
+            pack_info: 全局搜索时这批结果所属的包
+
+        Returns:
+            bool: 批次不连续（例如已开始新的扫描）而被忽略时返回 False
+        """
+        if start != self.count:
+            return False
+        if self.pack_type == 'global':
+            self._pack_starts.append(start)
+            self._packs.append(pack_info)
+            self.entries.extend(batch)
+        else:
+            # 单个包直接使用翻译存储中的列表，批次已由查找线程追加到其中
+            self.entries = translation_store.get_data(self.pack_info)
+        self.count = start + len(batch)
+        self._chinese += self._chinese_flags(batch)
+        if self.pack_type == 'behavior':
+            self._extend_ordinals(batch)
+        if self._identifiers is not None:
+            self._identifiers.update((self.identifier(data_index), data_index) for data_index in range(start, self.count))
+
+        matched = range(start, self.count) if indices is None else indices
+        if self._matched is not None:
+            self._matched.extend(matched)
+        elif indices is not None:
+            self._matched = array('I', range(start))
+            self._matched.extend(indices)
+        new_rows = self._visible(matched)
+        if new_rows:
+            first_row = len(self.rows)
+            self.beginInsertRows(QModelIndex(), first_row, first_row + len(new_rows) - 1)
+            self.rows.extend(new_rows)
+            self.endInsertRows()
+        return True
+
+    def show(self, indices=None):
+        """只显示已接收条目中符合搜索文本的条目（数据源索引，升序），indices 为 None 时显示全部"""
+        self.beginResetModel()
+        self._matched = None if indices is None else array('I', indices)
+        self.rows = self._visible(range(self.count) if indices is None else self._matched)
+        self.endResetModel()
+
+    def set_hide_chinese(self, hide_chinese):
+        """切换是否隐藏包含中文的条目，在符合搜索文本的条目上一次性重建可见行"""
+        if hide_chinese == self.hide_chinese:
+            return
+        self.hide_chinese = hide_chinese
+        self.beginResetModel()
+        self.rows = self._visible(range(self.count) if self._matched is None else self._matched)
+        self.endResetModel()
+
+    @staticmethod
+    def _shift(indices, position, delta):
+        """把 indices 中 position 之后的索引整体平移 delta"""
+        if delta and position < len(indices):
+            indices[position:] = array('I', [index + delta for index in indices[position:]])
+
+    def patch(self, start, replaced_count, new_count, indices=None):
+        """翻译存储中 [start, start + replaced_count) 的条目已被替换为 new_count 条新条目，修补对应的行
+
+        Args:
+            indices: 符合搜索文本的新条目索引，为 None 时全部符合；
+                条目数量不变时同样按 indices 重新匹配，不沿用旧条目的匹配结果
+        """
+        stop = start + replaced_count
+        delta = new_count - replaced_count
+        self.entries = translation_store.get_data(self.pack_info)
+        self.count += delta
+        self._chinese[start:stop] = self._chinese_flags(self.entries[start:start + new_count])
+        if delta and self.pack_type == 'behavior':
+            # 之后条目的同名序号可能随之变化，重新计算
+            self._ordinals = array('I')
+            self._filename_counts = {}
+            self._extend_ordinals(self.entries[:self.count])
+        # 标识符和索引都可能变化，下次查找时重新建立
+        self._identifiers = None
+
+        matched = self._matched
+        if matched is None:
+            new_matched = range(start, start + new_count)
+        else:
+            match_start = bisect_left(matched, start)
+            match_stop = bisect_left(matched, stop)
+            new_matched = range(start, start + new_count) if indices is None else array('I', indices)
+            self._shift(matched, match_stop, delta)
+            matched[match_start:match_stop] = array('I', new_matched)
+
+        # 删除旧条目的行，平移之后各行的索引，再插入新条目中可见的行
+        rows = self.rows
+        row_start = bisect_left(rows, start)
+        row_stop = bisect_left(rows, stop)
+        if row_stop > row_start:
+            self.beginRemoveRows(QModelIndex(), row_start, row_stop - 1)
+            del rows[row_start:row_stop]
+            self.endRemoveRows()
+        self._shift(rows, row_start, delta)
+        new_rows = self._visible(new_matched)
+        if new_rows:
+            self.beginInsertRows(QModelIndex(), row_start, row_start + len(new_rows) - 1)
+            rows[row_start:row_start] = new_rows
+            self.endInsertRows()
+        row_stop = row_start + len(new_rows)
+        if delta and len(rows) > row_stop:
+            # 重名文件的序号可能随之变化
+            self.dataChanged.emit(self.index(row_stop, 0), self.index(len(rows) - 1, 0))
 
 class TableDataManager(QObject):
     """表格数据管理器，负责表格数据的管理和操作"""
@@ -51,192 +370,102 @@ class TableDataManager(QObject):
     # 定义信号
     data_changed = pyqtSignal()
     
-    def __init__(self, table_widget):
+    def __init__(self, table_view):
         super().__init__()
-        self.table_widget = table_widget
+        self.table_view = table_view
+        self.model = TranslationTableModel(table_view)
+        self.table_view.setModel(self.model)
         self.current_pack_info = None
         
-        # 用于存储原始值，以便检测更改
-        self.original_values = {}
-        # 用于跟踪表格单元格的原始键和语言文件名（针对资源包）
-        self.cell_metadata = {} 
-        # 用于存储包含中文的行号
-        self.chinese_rows = set()
-        
-        # 连接单元格更改信号
-        self.table_widget.itemChanged.connect(self.on_item_changed)
+        # 连接值修改信号（在表格中编辑或粘贴），修改记录由翻译存储的脏集合维护
+        self.model.value_edited.connect(self.on_value_edited)
+        self._clear_rows()
+    
+    @property
+    def pack_type(self):
+        """当前结果的包类型，'global' 表示全局搜索"""
+        return self.model.pack_type
+    
+    def result_count(self):
+        """已接收的扫描结果数量（包括因过滤而未显示的条目）"""
+        return self.model.count
     
     def set_current_pack(self, pack_info):
         """设置当前处理的包信息"""
         self.current_pack_info = pack_info
     
-    def on_item_changed(self, item):
-        """当表格单元格内容改变时调用"""
-        # 仅当值列（第2列）更改时更新状态
-        if item.column() == 2:
-            row = item.row()
-            current_text = item.text()  # 表格中的文本，包含 '\\n'
-            
-            # 将表格中的文本转换为实际值（把 \\n 转为 \n）
-            actual_value = current_text.replace('\\n', '\n')
-            
-            # 获取原始值进行比较
-            original_value = self.original_values.get((row, 2))
-            
-            # 获取数据源中的索引
-            index_item = self.table_widget.item(row, 0)
-            if not index_item:
-                return
-                
-            data_index = index_item.data(Qt.ItemDataRole.UserRole)
-            if data_index is None:
-                return
-                
-            # 如果值发生改变，更新数据源并标记为未保存
-            if original_value is not None and actual_value != original_value:
-                # 更新数据源
-                success = translation_store.update_item(self.current_pack_info, data_index, actual_value)
-                if success:
-                    # 发出数据变更信号
-                    self.data_changed.emit()
+    def on_value_edited(self, data_index):
+        """条目的值已写入翻译存储"""
+        self.data_changed.emit()
     
-    def populate_table(self, results, pack_type):
-        """用搜索结果填充表格"""
-        self.table_widget.blockSignals(True)
-        try:
-            self.clear_table()
-            
-            if not results:
-                return
-                
-            filename_counts = {} # 用于生成唯一的文件名
-
-            if pack_type == 'resources':
-                self.table_widget.setHorizontalHeaderLabels(['键值', '类型', '值'])
-                for i in range(3):
-                    self.table_widget.setColumnHidden(i, False)
-                self.table_widget.setColumnHidden(1, True)  # 隐藏类型列
-                for index, result in enumerate(results):
-                    self.add_row_to_table(result, index, is_resource_pack=True, filename_counts=filename_counts)
-            elif pack_type == 'behavior':
-                self.table_widget.setHorizontalHeaderLabels(['文件名', '类型', '值'])
-                for i in range(3):
-                    self.table_widget.setColumnHidden(i, False)
-                for index, result in enumerate(results):
-                    self.add_row_to_table(result, index, is_resource_pack=False, filename_counts=filename_counts)
-        finally:
-            self.table_widget.blockSignals(False)
+    def begin_results(self, pack_type):
+        """开始流式接收扫描结果：清空表格并设置表头，之后通过 append_results 逐批追加
+        
+        pack_type 为 'global' 时表示全局搜索，结果来自多个包且只读。
+        """
+        self.model.reset(pack_type, self.current_pack_info)
+        self._setup_header(pack_type)
+        # 追加期间不按内容自动调整列宽，否则每追加一批都会重新测量整列
+        header = self.table_view.horizontalHeader()
+        if header:
+            header.setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
     
-    def add_row_to_table(self, result, index, is_resource_pack=True, filename_counts=None):
-        """将单行结果添加到表格中"""
-        row = self.table_widget.rowCount()
-        self.table_widget.insertRow(row)
-
-        # 存储项目在数据源中的索引
-        identifier_key = 'key' if is_resource_pack else 'filename'
+    def append_results(self, start, batch, indices=None, pack_info=None):
+        """追加一批扫描结果，并在表格末尾显示其中的指定条目
         
-        display_identifier = result[identifier_key]
-        if not is_resource_pack and filename_counts is not None:
-            original_filename = result[identifier_key]
-            count = filename_counts.get(original_filename, 0) + 1
-            filename_counts[original_filename] = count
-            if count > 1:
-                display_identifier = f"{original_filename}_{count - 1}"
-
-        identifier_widget = QTableWidgetItem(display_identifier)
-        identifier_widget.setData(Qt.ItemDataRole.UserRole, index)  # 存储索引
+        Args:
+            start: 这批结果中第一条在数据源中的索引
+            batch: 结果列表
+            indices: 需要显示的条目索引（数据源索引），为 None 时显示整批
+            pack_info: 全局搜索时这批结果所属的包
+        """
+        self.model.append(start, batch, indices, pack_info)
+    
+    def patch_rows(self, start, replaced_count, entries, indices=None):
+        """文件被外部修改后，只修补其条目对应的行，其余行（包括未保存的修改）保持不变
         
-        # 存储完整文件路径，用于双击打开功能
-        if not is_resource_pack and 'filepath' in result:
-            identifier_widget.setData(Qt.ItemDataRole.UserRole + 1, result['filepath'])
-
-        type_widget = QTableWidgetItem(result['type'])
-        # 转义换行符以便在表格中显示
-        value_widget = QTableWidgetItem(result['value'].replace('\n', '\\n'))
-
-        self.table_widget.setItem(row, 0, identifier_widget)
-        self.table_widget.setItem(row, 1, type_widget)
-        self.table_widget.setItem(row, 2, value_widget)
-
-        # 存储原始值用于比较
-        self.original_values[(row, 2)] = result['value']
-
-        # 构建元数据
-        metadata = {
-            'has_chinese': result.get('has_chinese', False),
-            'data_index': index  # 存储数据源索引
-        }
-
-        if is_resource_pack:
-            metadata.update({
-                'key': result['key'],
-                'lang_file_name': result.get('lang_file_name', 'unknown.lang')
-            })
-        else:
-            metadata.update({
-                'filename': result['filename'],
-                'type': result['type']
-            })
-            
-            # 特别处理 script_title 类型，确保保存 filepath 和 line
-            if result['type'] == 'script_title':
-                if 'filepath' in result:
-                    metadata['filepath'] = result['filepath']
-                if 'line' in result:
-                    metadata['line'] = result['line']
-            # 保存其他类型的特殊字段
-            if 'json_path' in result:
-                metadata['json_path'] = result['json_path']
-            if 'line' in result:
-                metadata['line'] = result['line']
-
-        self.cell_metadata[row] = metadata
-
-        # 如果包含中文，添加到中文行集合
-        if result.get('has_chinese', False):
-            self.chinese_rows.add(row)
+        翻译存储中的条目（及其修改记录）已被替换，这里只更新行与数据源索引的对应关系。
+        
+        Args:
+            start: 被替换的条目在数据源中的起始索引
+            replaced_count: 被替换的条目数
+            entries: 重新提取的条目，在数据源中占据 [start, start + len(entries))
+            indices: 条目数量变化时需要显示的新条目索引（符合当前搜索文本），为 None 时全部显示
+        """
+        if self.pack_type not in ('resources', 'behavior'):
+            return
+        self.model.patch(start, replaced_count, len(entries), indices)
+    
+    def show_rows(self, indices=None):
+        """显示已接收结果中的指定条目，indices 为 None 时显示全部"""
+        self.model.show(indices)
+    
+    def _setup_header(self, pack_type):
+        """根据包类型设置列的显示，表头文本由模型提供"""
+        for i in range(3):
+            self.table_view.setColumnHidden(i, pack_type not in HEADER_LABELS)
+        if pack_type == 'resources':
+            self.table_view.setColumnHidden(1, True)  # 隐藏类型列
+    
+    def _clear_rows(self):
+        """清空表格行并隐藏所有列"""
+        self.model.reset()
+        self._setup_header(None)
     
     def clear_table(self):
         """清空表格并重置状态"""
-        self.table_widget.setRowCount(0)
-        self.table_widget.setHorizontalHeaderLabels(['', '', ''])
-        for i in range(3):
-            self.table_widget.setColumnHidden(i, True)
-        self.original_values.clear()
-        self.cell_metadata.clear()
-        self.chinese_rows.clear()
+        self._clear_rows()
     
     def update_row_visibility(self, hide_chinese):
-        """更新行的可见性"""
-        # 遍历所有行
-        for row in range(self.table_widget.rowCount()):
-            # 检查行是否包含中文
-            is_chinese_row = row in self.chinese_rows
-            should_hide = is_chinese_row and hide_chinese
-            
-            # 设置行的可见性
-            self.table_widget.setRowHidden(row, should_hide)
+        """更新行的可见性：隐藏中文时模型中不再包含这些行"""
+        self.model.set_hide_chinese(hide_chinese)
     
     def copy_rows(self, copy_number):
-        """复制表格前几行的内容"""
-        # 准备复制的内容
-        copy_content = []
-        copied_count = 0
-        row = 0
-        # 继续遍历直到达到所需的复制数量或表格结束
-        while copied_count < copy_number and row < self.table_widget.rowCount():
-            # 检查行是否被隐藏
-            if not self.table_widget.isRowHidden(row):
-                identifier_item = self.table_widget.item(row, 0)  # 键值或文件名
-                value_item = self.table_widget.item(row, 2)      # 值
-
-                if identifier_item and value_item:
-                    identifier = identifier_item.text()
-                    # 不转换 \n，保持原样
-                    value = value_item.text()
-                    copy_content.append(f"{identifier}={value}")
-                    copied_count += 1
-            row += 1
+        """复制表格前几行（可见的行）的内容"""
+        model = self.model
+        # 不转换 \n，保持表格中显示的样子
+        copy_content = [f"{model.identifier(data_index)}={model.display_value(data_index)}"
+                        for data_index in model.rows[:copy_number]]
         
         if copy_content:
             # 将内容复制到剪贴板
@@ -257,43 +486,29 @@ class TableDataManager(QObject):
         if not self.current_pack_info:
             return False, "未选择任何包，无法粘贴"
 
-        # 创建键到行号的映射字典，加速查找
-        key_to_row = {}
-        for row in range(self.table_widget.rowCount()):
-            identifier_item = self.table_widget.item(row, 0)  # 键值或文件名
-            if identifier_item:
-                key_to_row[identifier_item.text()] = row
-
-        lines = clipboard_text.strip().split('\n')
-        updated_count = 0
+        # 按显示标识符查找条目（映射在模型中保留，不必每次粘贴都重建）；
+        # 与逐行写入表格时相同，因过滤或隐藏中文而未显示的行也会更新
+        model = self.model
+        values = {}
         not_found_keys = []
 
-        for line in lines:
+        for line in clipboard_text.strip().split('\n'):
             if '=' not in line:
                 continue
             
-            parts = line.split('=', 1)
-            key_from_clipboard = parts[0].strip()
-            value_from_clipboard = parts[1].strip()
-
-            # 使用字典直接查找，而不是遍历整个表格
-            if key_from_clipboard in key_to_row:
-                row = key_to_row[key_from_clipboard]
-                # 检查值列是否存在
-                value_item = self.table_widget.item(row, 2)
-                # 获取原始值（表格中显示的文本，需转回\n为\n）
-                if value_item:
-                    current_value = value_item.text().replace('\\n', '\n')
-                    if current_value == value_from_clipboard:
-                        continue  # 跳过相同内容
-                    value_item.setText(value_from_clipboard.replace('\n', '\\n'))
-                else:
-                    self.table_widget.setItem(row, 2, QTableWidgetItem(value_from_clipboard.replace('\n', '\\n')))
-                updated_count += 1
+            key_from_clipboard, value_from_clipboard = line.split('=', 1)
+            key_from_clipboard = key_from_clipboard.strip()
+            data_index = model.find_identifier(key_from_clipboard)
+            if data_index is not None:
+                # 剪贴板中的换行符为表格中显示的 \\n；同一个键出现多次时以最后一次为准
+                values[data_index] = value_from_clipboard.strip().replace('\\n', '\n')
             else:
                 not_found_keys.append(key_from_clipboard)
 
+        # 一次加锁写入翻译存储，视图只刷新一次；与当前值相同的条目跳过
+        updated_count = len(model.set_values(values))
         if updated_count > 0:
+            self.data_changed.emit()
             return True, f"成功更新了 {updated_count} 个条目"
         else:
             return False, "剪贴板中的内容未在表格中找到匹配的键"
@@ -313,31 +528,9 @@ class TableDataManager(QObject):
         if not self.is_data_modified():
             return False, "没有检测到任何更改"
 
-        # **修复点**: 找出真正被修改的条目
-        items_to_save = []
-        all_data = translation_store.get_data(self.current_pack_info)
-        
-        for row in range(self.table_widget.rowCount()):
-            # 获取原始值
-            original_value = self.original_values.get((row, 2))
-            
-            # 获取当前值
-            current_item = self.table_widget.item(row, 2)
-            if not current_item:
-                continue
-            current_value = current_item.text().replace('\\n', '\n')
-            
-            # 比较值是否发生变化
-            if original_value is not None and original_value != current_value:
-                # 获取该行对应的完整数据项
-                index_item = self.table_widget.item(row, 0)
-                if index_item:
-                    data_index = index_item.data(Qt.ItemDataRole.UserRole)
-                    if data_index is not None and 0 <= data_index < len(all_data):
-                        items_to_save.append(all_data[data_index])
-
+        # 翻译存储的脏集合中只有真正被修改的条目（包括因过滤而未显示的行，改回原样的条目已被移除）
+        items_to_save = translation_store.get_modified_items(self.current_pack_info)
         if not items_to_save:
-            # 虽然标记为已修改，但可能改回了原样，实际上没有需要保存的
             return False, "没有检测到任何需要保存的更改"
             
         # 导入保存逻辑
@@ -349,8 +542,5 @@ class TableDataManager(QObject):
         return success, message
     
     def get_visible_rows_count(self):
-        """获取可见行数"""
-        visible_rows = sum(1 for row in range(self.table_widget.rowCount()) 
-                          if not self.table_widget.isRowHidden(row))
-        total_rows = self.table_widget.rowCount()
-        return visible_rows, total_rows
+        """获取可见行数和符合搜索文本的行数"""
+        return self.model.rowCount(), self.model.matched_count()
@@ -0,0 +1,120 @@
+import json
+import pytest
+import cli
+from save_function import transaction as transaction_module
+
+ITEM = {
+    "minecraft:item": {
+        "components": {
+            "minecraft:display_name": {"value": "Cool Sword"}
+        }
+    }
+}
+
+ENTITY = {
+    "minecraft:entity": {
+        "description": {"identifier": "x:guard"},
+        "components": {"minecraft:nameable": {"name": "Bob the Guard"}},
+        "events": {"e1": {"queue_command": {"command": ["say Hello there", "tp @s ~ ~ ~"]}}}
+    }
+}
+
+# 压缩成一行的脚本：两个 title 位于同一行
+BUNDLE = 'var a=1;form.title("First");form.title("Second");player.sendMessage("Hi")\n'
+
+
+@pytest.fixture
+def pack(tmp_path, monkeypatch):
+    monkeypatch.setattr(transaction_module, 'JOURNAL_DIR', str(tmp_path / 'journal'))
+    root = tmp_path / 'bp'
+    for folder in ('items', 'entities', 'scripts'):
+        (root / folder).mkdir(parents=True)
+    (root / 'manifest.json').write_text(json.dumps({"header": {"name": "Test BP"}, "modules": [{"type": "data"}]}))
+    (root / 'items' / 'sword.json').write_text(json.dumps(ITEM, indent=4), encoding='utf-8')
+    (root / 'entities' / 'guard.json').write_text(json.dumps(ENTITY, indent=4), encoding='utf-8')
+    (root / 'scripts' / 'main.js').write_text(BUNDLE, encoding='utf-8')
+    return root
+
+
+def scan(pack, tmp_path, name='out.jsonl'):
+    output = tmp_path / name
+    assert cli.main(['scan', str(pack), '-o', str(output)]) == 0
+    with open(output, encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+def write_records(tmp_path, records, name='in.jsonl'):
+    path = tmp_path / name
+    with open(path, 'w', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+    return str(path)
+
+
+def test_scan_numbers_entries_at_same_position(pack, tmp_path):
+    records = scan(pack, tmp_path)
+
+    titles = [r for r in records if r['type'] == 'script_title']
+    assert [(r['value'], r['occurrence']) for r in titles] == [('First', 0), ('Second', 1)]
+    identities = [cli._entry_identity(r) for r in records]
+    assert len(set(identities)) == len(identities)
+
+
+def test_apply_round_trip(pack, tmp_path):
+    records = scan(pack, tmp_path)
+    translations = {'Cool Sword': '酷炫的剑', 'Bob the Guard': '守卫鲍勃', 'Hello there': '你好'}
+    for record in records:
+        record['value'] = translations.get(record['value'], record['value'])
+
+    assert cli.main(['apply', write_records(tmp_path, records)]) == 0
+
+    values = {(r['type'], r['value']) for r in scan(pack, tmp_path, 'after.jsonl')}
+    assert ('item_name', '酷炫的剑') in values
+    assert ('entity_name', '守卫鲍勃') in values
+    assert ('say', '你好') in values
+    # 未修改的文件保持原样
+    assert (pack / 'scripts' / 'main.js').read_text(encoding='utf-8') == BUNDLE
+    with open(pack / 'entities' / 'guard.json', encoding='utf-8') as f:
+        assert f.read() == json.dumps({
+            **ENTITY,
+            "minecraft:entity": {
+                **ENTITY["minecraft:entity"],
+                "components": {"minecraft:nameable": {"name": "守卫鲍勃"}},
+                "events": {"e1": {"queue_command": {"command": ["say 你好", "tp @s ~ ~ ~"]}}},
+            },
+        }, ensure_ascii=False, indent=4)
+
+
+def test_apply_matches_entries_at_same_position_by_occurrence(pack, tmp_path, capsys):
+    records = scan(pack, tmp_path)
+    first = next(r for r in records if r['value'] == 'First')
+    second = next(r for r in records if r['value'] == 'Second')
+    capsys.readouterr()
+
+    # 未修改的条目不能与同一位置的其他条目混淆
+    assert cli.main(['apply', '--dry-run', write_records(tmp_path, [first])]) == 0
+    assert '没有需要保存的更改' in capsys.readouterr().err
+
+    second['value'] = '第二'
+    assert cli.main(['apply', '--dry-run', write_records(tmp_path, [first, second])]) == 0
+    assert '将保存 1 个条目' in capsys.readouterr().err
+
+
+def test_apply_rejects_duplicate_records(pack, tmp_path, capsys):
+    records = scan(pack, tmp_path)
+    item = next(r for r in records if r['type'] == 'item_name')
+    path = write_records(tmp_path, [dict(item, value='一'), dict(item, value='二')])
+    before = (pack / 'items' / 'sword.json').read_bytes()
+
+    assert cli.main(['apply', path]) == 1
+
+    assert '对应同一个条目' in capsys.readouterr().err
+    assert (pack / 'items' / 'sword.json').read_bytes() == before
+
+
+def test_apply_reports_missing_entries(pack, tmp_path):
+    records = scan(pack, tmp_path)
+    item = next(r for r in records if r['type'] == 'item_name')
+    item['occurrence'] = 1
+
+    assert cli.main(['apply', write_records(tmp_path, [item])]) == 1
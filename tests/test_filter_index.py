@@ -0,0 +1,88 @@
+import random
+import pytest
+from found import PackInfo
+from save import translation_store
+from search_function.entry import Entry
+from search_function.filter_index import TextFilterIndex
+
+ALPHABET = 'abcAB中文 .'
+QUERIES = ['', 'a', 'B', '中', 'ab', 'abc', 'ABC', 'cab', '中文', 'a.b', 'key', 'y.1', 'zzz', ' ', 'abca']
+
+
+def baseline_filter(entries, text, identifier_field):
+    """修改前逐行比较的过滤：标识符或值中包含搜索文本（不区分大小写）"""
+    text = text.lower()
+    rows = []
+    for row, entry in enumerate(entries):
+        identifier = entry.get(identifier_field)
+        value = entry.get('value')
+        identifier_match = text in identifier.lower() if isinstance(identifier, str) else False
+        value_match = text in value.lower() if isinstance(value, str) else False
+        if not text or identifier_match or value_match:
+            rows.append(row)
+    return rows
+
+
+def random_text(rng):
+    return ''.join(rng.choice(ALPHABET) for _ in range(rng.randint(0, 8)))
+
+
+def random_entries(rng, count):
+    return [Entry(type='language_entry', key=f'key.{rng.randint(0, 20)}', value=random_text(rng)) for _ in range(count)]
+
+
+def test_query_matches_baseline():
+    rng = random.Random(5)
+    entries = random_entries(rng, 300)
+    index = TextFilterIndex(entries, 'key')
+
+    for text in QUERIES:
+        assert index.query(text) == baseline_filter(entries, text, 'key'), text
+
+
+def test_query_matches_baseline_after_edits_and_splices():
+    rng = random.Random(7)
+    entries = random_entries(rng, 200)
+    index = TextFilterIndex(entries, 'key')
+
+    for _ in range(30):
+        if rng.random() < 0.7:
+            row = rng.randrange(len(entries))
+            entries[row]['value'] = random_text(rng)
+            index.update_value(row, entries[row]['key'], entries[row]['value'])
+        else:
+            start = rng.randrange(len(entries))
+            stop = min(len(entries), start + rng.randint(0, 5))
+            new_entries = random_entries(rng, rng.randint(0, 5))
+            entries[start:stop] = new_entries
+            index.splice(start, stop, new_entries)
+        for text in QUERIES:
+            assert index.query(text) == baseline_filter(entries, text, 'key'), text
+
+
+def test_query_range_and_incremental_typing():
+    rng = random.Random(9)
+    entries = random_entries(rng, 100)
+    index = TextFilterIndex(entries, 'key')
+
+    # 连续输入时在上一次的结果中继续筛选
+    for text in ('a', 'ab', 'abc', 'ab'):
+        assert index.query(text) == baseline_filter(entries, text, 'key')
+    expected = baseline_filter(entries, 'a', 'key')
+    assert index.query('a', 40) == [row for row in expected if row >= 40]
+    assert index.query('a', 0, 60) == [row for row in expected if row < 60]
+
+
+@pytest.mark.parametrize('pack_type, identifier_field', [('resources', 'key'), ('behavior', 'filename')])
+def test_filter_data_matches_baseline(pack_type, identifier_field):
+    rng = random.Random(11)
+    pack_info = PackInfo('filter', f'/x/filter_{pack_type}', pack_type)
+    entries = [Entry(type='item_name', key=f'k{i}', filename=f'{random_text(rng)}.json', value=random_text(rng))
+               for i in range(200)]
+    translation_store.store_search_results(pack_info, entries)
+    for row in range(0, 200, 7):
+        translation_store.update_item(pack_info, row, random_text(rng))
+    data = translation_store.get_data(pack_info)
+
+    for text in QUERIES:
+        assert translation_store.filter_data(pack_info, text) == baseline_filter(data, text, identifier_field), text
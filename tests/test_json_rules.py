@@ -0,0 +1,49 @@
+import json
+import pytest
+from found import PackInfo
+from search_function.json_rules import extract_json_file
+from search_function.pipeline import scan_pack
+
+ENTITY = {
+    "minecraft:entity": {
+        "description": {"identifier": "x:guard"},
+        "components": {"minecraft:nameable": {"name": "Bob the Guard"}},
+    }
+}
+
+
+@pytest.fixture
+def pack(tmp_path):
+    root = tmp_path / 'bp'
+    (root / 'entities').mkdir(parents=True)
+    (root / 'items').mkdir()
+    (root / 'manifest.json').write_text(json.dumps({"header": {"name": "Test BP"}, "modules": [{"type": "data"}]}))
+    (root / 'entities' / 'guard.json').write_text(json.dumps(ENTITY), encoding='utf-8')
+    return root
+
+
+def test_file_without_needles_is_not_parsed(pack):
+    path = pack / 'entities' / 'plain.json'
+    # 不包含任何规则的键，即使有尾随逗号也不解析
+    path.write_text('{"minecraft:entity": {"description": {"identifier": "x:plain"},}}', encoding='utf-8')
+
+    assert extract_json_file(str(path), 'entities') == []
+
+
+@pytest.mark.parametrize('content', ['', '   ', '{"minecraft:entity": {', 'not json', '[1, 2'])
+def test_structurally_broken_file_fails_without_needles(pack, content):
+    path = pack / 'items' / 'broken.json'
+    path.write_text(content, encoding='utf-8')
+
+    with pytest.raises(ValueError):
+        extract_json_file(str(path), 'items')
+
+
+def test_broken_files_count_as_failed_in_scan(pack):
+    (pack / 'entities' / 'truncated.json').write_text('{"minecraft:entity": {"description": {', encoding='utf-8')
+    (pack / 'items' / 'empty.json').write_text('', encoding='utf-8')
+
+    results, failed_count = scan_pack(PackInfo('bp', str(pack), 'behavior'))
+
+    assert failed_count == 2
+    assert [(r['type'], r['value']) for r in results] == [('entity_name', 'Bob the Guard')]
@@ -0,0 +1,77 @@
+import json
+import pytest
+from found import PackInfo
+from save import translation_store, main_save_logic
+from save_function import transaction as transaction_module
+from search_function.pipeline import scan_pack
+
+ENTITY = {
+    "minecraft:entity": {
+        "description": {"identifier": "x:guard"},
+        "components": {"minecraft:nameable": {"name": "Bob the Guard"}},
+        "events": {"e1": {"queue_command": {"command": ["tp @s ~ ~ ~", "say Hello there"]}}}
+    }
+}
+
+
+@pytest.fixture
+def pack_info(tmp_path, monkeypatch):
+    monkeypatch.setattr(transaction_module, 'JOURNAL_DIR', str(tmp_path / 'journal'))
+    root = tmp_path / 'bp'
+    (root / 'entities').mkdir(parents=True)
+    (root / 'manifest.json').write_text(json.dumps({"header": {"name": "Test BP"}, "modules": [{"type": "data"}]}))
+    (root / 'entities' / 'guard.json').write_text(json.dumps(ENTITY, indent=4), encoding='utf-8')
+    pack_info = PackInfo('bp', str(root), 'behavior')
+    results, failed_count = scan_pack(pack_info)
+    assert failed_count == 0
+    translation_store.store_search_results(pack_info, results)
+    return pack_info
+
+
+def entity_file(pack_info):
+    with open(f'{pack_info.path}/entities/guard.json', encoding='utf-8') as f:
+        return json.load(f)["minecraft:entity"]
+
+
+def index_of(pack_info, entry_type):
+    return next(i for i, entry in enumerate(translation_store.get_data(pack_info)) if entry['type'] == entry_type)
+
+
+def test_say_and_entity_name_from_same_file(pack_info):
+    translation_store.update_item(pack_info, index_of(pack_info, 'entity_name'), '守卫鲍勃')
+    translation_store.update_item(pack_info, index_of(pack_info, 'say'), '你好')
+
+    success, message = main_save_logic(pack_info, None)
+
+    assert success, message
+    entity = entity_file(pack_info)
+    assert entity["components"]["minecraft:nameable"]["name"] == '守卫鲍勃'
+    assert entity["events"]["e1"]["queue_command"]["command"] == ["tp @s ~ ~ ~", "say 你好"]
+    assert not translation_store.is_modified(pack_info)
+
+
+def test_second_save_without_rescan_is_not_stale(pack_info):
+    translation_store.update_item(pack_info, index_of(pack_info, 'entity_name'), '守卫鲍勃')
+    assert main_save_logic(pack_info, None)[0]
+
+    # 同一文件中的另一个条目仍记录着保存前的指纹，保存后应已更新
+    translation_store.update_item(pack_info, index_of(pack_info, 'say'), '你好')
+    success, message = main_save_logic(pack_info, None)
+
+    assert success, message
+    entity = entity_file(pack_info)
+    assert entity["components"]["minecraft:nameable"]["name"] == '守卫鲍勃'
+    assert entity["events"]["e1"]["queue_command"]["command"] == ["tp @s ~ ~ ~", "say 你好"]
+
+
+def test_file_changed_externally_is_stale(pack_info):
+    path = f'{pack_info.path}/entities/guard.json'
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('\n')
+    translation_store.update_item(pack_info, index_of(pack_info, 'entity_name'), '守卫鲍勃')
+
+    success, message = main_save_logic(pack_info, None)
+
+    assert not success
+    assert '文件在查找后已被修改' in message
+    assert translation_store.is_modified(pack_info)
@@ -0,0 +1,74 @@
+import re
+from search_function.scripts import extract_title_from_file
+
+# 修改前逐类型扫描的模式，作为对照
+BASELINE_PATTERNS = {
+    'script_title': r'\.title\(\s*"([^"]*)"\s*\)',
+    'script_button': r'\.button\(\s*"([^"]*)"\s*,\s*"[^"]*"\s*\)',
+    'script_body': r'\.body\s*\(\s*["\']([^"\']*?)["\'\s]*\)',
+    'script_sendMessage': r'\.sendMessage\s*\(\s*[`\'\"]([\s\S]*?)[`\'\"]\s*\)',
+    'script_rawtext': r'titleraw\s+.*?\{\s*"rawtext"\s*:\s*\[\s*\{\s*"text"\s*:\s*"([^"]*)"\s*\}\s*\]\s*\}',
+}
+
+
+def baseline_extract(content):
+    results = []
+    for type_name, pattern in BASELINE_PATTERNS.items():
+        for match in re.finditer(pattern, content):
+            value = match.group(1)
+            if type_name == 'script_title' and ('_' in value or ':' in value):
+                continue
+            if not re.search('[a-zA-Z一-鿿]', value):
+                continue
+            results.append((type_name, value, content[:match.start()].count('\n') + 1))
+    return results
+
+
+SOURCE = '\n'.join([
+    'form.title("Main Menu").body("Pick one").button("Start", "textures/start");',
+    'player.sendMessage("Hello there"); form.title("skip_me");',
+    # titleraw 与后面的 rawtext 之间夹着其他调用
+    'runCommand(`titleraw @a actionbar x`); form.title("Shop"); p.sendMessage(\'Bought\'); '
+    'const t = {"rawtext":[{"text":"Later text"}]};',
+    'world.sendMessage(`Template ${name}`); form.body(\'单引号正文\');',
+    '/* bundle */var a=1;form.title("Bundled");p.sendMessage("Inline");'
+    'x.runCommand("titleraw @s title {\\"rawtext\\":[{\\"text\\":\\"Escaped\\"}]}");',
+    'titleraw @a title {"rawtext":[{"text":"标题文本"}]}',
+    'form.button("", "icon"); form.title("123");',
+])
+
+
+def test_extraction_matches_baseline_per_type(tmp_path):
+    path = tmp_path / 'main.js'
+    path.write_text(SOURCE, encoding='utf-8')
+
+    results = extract_title_from_file(str(path))
+
+    assert [(r['type'], r['value'], r['line']) for r in results] == baseline_extract(SOURCE)
+
+
+def test_titleraw_does_not_swallow_other_calls(tmp_path):
+    path = tmp_path / 'bundle.js'
+    path.write_text(SOURCE.splitlines()[2], encoding='utf-8')
+
+    values = {(r['type'], r['value']) for r in extract_title_from_file(str(path))}
+
+    assert ('script_title', 'Shop') in values
+    assert ('script_sendMessage', 'Bought') in values
+    assert ('script_rawtext', 'Later text') in values
+
+
+def test_result_fields(tmp_path):
+    path = tmp_path / 'a.js'
+    path.write_text('x\nform.title("中文标题")', encoding='utf-8')
+
+    [result] = extract_title_from_file(str(path))
+
+    assert result == {
+        'filename': 'a.js',
+        'filepath': str(path),
+        'type': 'script_title',
+        'value': '中文标题',
+        'has_chinese': True,
+        'line': 2,
+    }
@@ -0,0 +1,215 @@
+import os
+import json
+import pytest
+from save_function import transaction as transaction_module
+from save_function.transaction import SaveTransaction, recover_transactions, run_in_transaction
+
+
+class Crash(BaseException):
+    """模拟进程在提交过程中退出"""
+
+
+@pytest.fixture
+def journal_dir(tmp_path):
+    return str(tmp_path / 'journal')
+
+
+@pytest.fixture
+def files(tmp_path):
+    pack = tmp_path / 'pack'
+    pack.mkdir()
+    paths = []
+    for i in range(3):
+        path = pack / f'file{i}.txt'
+        path.write_bytes(f'old {i}'.encode())
+        paths.append(str(path))
+    return paths
+
+
+def read(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def leftovers(directory):
+    return [name for name in os.listdir(directory) if name.endswith(('.tmp', '.bak'))]
+
+
+def test_commit_writes_all_files(files, journal_dir, tmp_path):
+    new_file = str(tmp_path / 'pack' / 'new.json')
+    transaction = SaveTransaction(journal_dir)
+    for i, path in enumerate(files):
+        transaction.write_bytes(path, f'new {i}'.encode())
+    transaction.write_json(new_file, {'名称': 1})
+
+    assert transaction.commit() == 4
+
+    assert [read(path) for path in files] == [b'new 0', b'new 1', b'new 2']
+    with open(new_file, encoding='utf-8') as f:
+        assert json.load(f) == {'名称': 1}
+    assert leftovers(os.path.dirname(new_file)) == []
+    assert os.listdir(journal_dir) == []
+
+
+def test_discard_leaves_files_untouched(files, journal_dir):
+    transaction = SaveTransaction(journal_dir)
+    transaction.write_bytes(files[0], b'new')
+    transaction.discard()
+
+    assert read(files[0]) == b'old 0'
+    with pytest.raises(RuntimeError):
+        transaction.commit()
+
+
+def test_exception_in_context_discards(files, journal_dir):
+    with pytest.raises(ValueError):
+        with SaveTransaction(journal_dir) as transaction:
+            transaction.write_bytes(files[0], b'new')
+            raise ValueError
+
+    assert read(files[0]) == b'old 0'
+
+
+def test_failed_replace_rolls_back(files, journal_dir, monkeypatch):
+    real_replace = os.replace
+
+    def failing_replace(src, dst):
+        if dst == files[1]:
+            raise OSError("disk full")
+        real_replace(src, dst)
+
+    monkeypatch.setattr(transaction_module.os, 'replace', failing_replace)
+    transaction = SaveTransaction(journal_dir)
+    for path in files:
+        transaction.write_bytes(path, b'new')
+
+    with pytest.raises(OSError):
+        transaction.commit()
+    monkeypatch.undo()
+
+    assert [read(path) for path in files] == [b'old 0', b'old 1', b'old 2']
+    assert leftovers(os.path.dirname(files[0])) == []
+
+
+def test_recover_after_crash_during_replace(files, journal_dir, tmp_path, monkeypatch):
+    new_file = str(tmp_path / 'pack' / 'new.txt')
+    real_replace = os.replace
+
+    def crashing_replace(src, dst):
+        if dst == files[1]:
+            raise Crash
+        real_replace(src, dst)
+
+    def no_rollback(writes, replaced):
+        raise Crash
+
+    monkeypatch.setattr(transaction_module.os, 'replace', crashing_replace)
+    monkeypatch.setattr(transaction_module, '_rollback', no_rollback)
+    transaction = SaveTransaction(journal_dir)
+    transaction.write_bytes(new_file, b'new')
+    for path in files:
+        transaction.write_bytes(path, b'new')
+    with pytest.raises(Crash):
+        transaction.commit()
+    monkeypatch.undo()
+
+    # 崩溃时部分文件已被替换
+    assert read(files[0]) == b'new'
+
+    assert recover_transactions(journal_dir) == 1
+
+    assert not os.path.exists(new_file)
+    assert [read(path) for path in files] == [b'old 0', b'old 1', b'old 2']
+    assert leftovers(os.path.dirname(files[0])) == []
+    assert os.listdir(journal_dir) == []
+
+
+def test_rollback_continues_after_failed_restore(files, journal_dir, monkeypatch):
+    real_replace = os.replace
+
+    def failing_replace(src, dst):
+        if dst == files[2] or (dst == files[0] and src.endswith('.bak')):
+            raise OSError("locked")
+        real_replace(src, dst)
+
+    monkeypatch.setattr(transaction_module.os, 'replace', failing_replace)
+    transaction = SaveTransaction(journal_dir)
+    for path in files:
+        transaction.write_bytes(path, b'new')
+    with pytest.raises(OSError):
+        transaction.commit()
+    monkeypatch.undo()
+
+    # 第一个文件未能恢复，其余文件照常恢复，日志保留
+    assert [read(path) for path in files] == [b'new', b'old 1', b'old 2']
+    assert os.listdir(journal_dir) == [f'{transaction.id}.json']
+
+    assert recover_transactions(journal_dir) == 1
+
+    assert read(files[0]) == b'old 0'
+    assert leftovers(os.path.dirname(files[0])) == []
+    assert os.listdir(journal_dir) == []
+
+
+def test_recover_after_crash_during_prepare(files, journal_dir, monkeypatch):
+    def crashing_prepare_all(self, writes, contents):
+        for write in writes[:2]:
+            transaction_module._prepare(write, contents[write.path])
+        raise Crash
+
+    monkeypatch.setattr(SaveTransaction, '_prepare_all', crashing_prepare_all)
+    transaction = SaveTransaction(journal_dir)
+    for path in files:
+        transaction.write_bytes(path, b'new')
+    with pytest.raises(Crash):
+        transaction.commit()
+    monkeypatch.undo()
+
+    assert leftovers(os.path.dirname(files[0]))
+
+    assert recover_transactions(journal_dir) == 1
+
+    assert [read(path) for path in files] == [b'old 0', b'old 1', b'old 2']
+    assert leftovers(os.path.dirname(files[0])) == []
+    assert os.listdir(journal_dir) == []
+
+
+def test_recover_keeps_committed_transaction(files, journal_dir, monkeypatch):
+    real_remove = transaction_module._remove
+
+    def crash_on_cleanup(path):
+        if path and path.endswith('.bak'):
+            raise Crash
+        real_remove(path)
+
+    monkeypatch.setattr(transaction_module, '_remove', crash_on_cleanup)
+    transaction = SaveTransaction(journal_dir)
+    transaction.write_bytes(files[0], b'new')
+    with pytest.raises(Crash):
+        transaction.commit()
+    monkeypatch.undo()
+
+    assert recover_transactions(journal_dir) == 0
+
+    assert read(files[0]) == b'new'
+    assert leftovers(os.path.dirname(files[0])) == []
+
+
+def test_run_in_transaction_discards_on_error(files):
+    def saver(pack_info, entries, transaction):
+        transaction.write_bytes(files[0], b'new')
+        return False, 1, "出错"
+
+    assert run_in_transaction(saver, None, []) == (False, 0, "出错")
+    assert read(files[0]) == b'old 0'
+
+
+def test_default_journal_dir_is_resolved_at_call_time(files, journal_dir, monkeypatch):
+    monkeypatch.setattr(transaction_module, 'JOURNAL_DIR', journal_dir)
+    transaction = SaveTransaction()
+    transaction.write_bytes(files[0], b'new')
+    transaction.commit()
+
+    assert transaction.journal_dir == journal_dir
+    assert recover_transactions() == 0
+    assert os.listdir(journal_dir) == []
@@ -0,0 +1,129 @@
+import itertools
+import pytest
+from found import PackInfo
+from save import translation_store
+from search_function.entry import Entry
+
+_pack_ids = itertools.count()
+
+
+@pytest.fixture
+def pack_info():
+    pack_info = PackInfo('store', f'/x/store_{next(_pack_ids)}', 'resources')
+    entries = [Entry(type='language_entry', key=f'k{i}', file=f'texts/{i // 3}.lang', value=f'v{i}')
+               for i in range(9)]
+    translation_store.store_search_results(pack_info, entries)
+    return pack_info
+
+
+def values(pack_info):
+    return [entry['value'] for entry in translation_store.get_data(pack_info)]
+
+
+def test_revert_to_original_clears_dirty(pack_info):
+    assert translation_store.update_items(pack_info, [(1, 'a'), (4, 'b')]) == [1, 4]
+    assert translation_store.modified_indices(pack_info) == [1, 4]
+
+    translation_store.update_items(pack_info, [(1, 'a2')])
+    translation_store.update_items(pack_info, [(1, 'v1')])
+
+    assert translation_store.modified_indices(pack_info) == [4]
+    assert values(pack_info)[1] == 'v1'
+
+
+def test_update_with_current_value_is_not_dirty(pack_info):
+    assert translation_store.update_items(pack_info, [(2, 'v2'), (3, 'x'), (99, 'out of range')]) == [3]
+
+    assert translation_store.modified_indices(pack_info) == [3]
+    assert not translation_store.update_item(pack_info, 3, 'x')
+    assert translation_store.modified_count(pack_info) == 1
+
+
+def test_reset_only_saved_items(pack_info):
+    translation_store.update_items(pack_info, [(0, 'a'), (5, 'b'), (8, 'c')])
+    modified = translation_store.get_modified_items(pack_info)
+    assert [entry['value'] for entry in modified] == ['a', 'b', 'c']
+
+    translation_store.reset_modified_status(pack_info, modified[:2])
+
+    assert translation_store.modified_indices(pack_info) == [8]
+    # 重置后以当前值为原始值，改回扫描时的值也算修改
+    translation_store.update_item(pack_info, 0, 'v0')
+    assert translation_store.modified_indices(pack_info) == [0, 8]
+    translation_store.reset_modified_status(pack_info)
+    assert not translation_store.is_modified(pack_info)
+
+
+def new_file_entries(name, values):
+    return [Entry(type='language_entry', key=f'{name}.{i}', file=f'texts/{name}.lang', value=value)
+            for i, value in enumerate(values)]
+
+
+def check_consistent(pack_info):
+    """脏记录的索引指向对应编号的条目，编号映射到存储中的同一对象"""
+    data = translation_store.get_data(pack_info)
+    for entry in data:
+        assert translation_store.get_entry(entry.id) is entry
+    modified = translation_store.get_modified_items(pack_info)
+    assert [data.index(entry) for entry in modified] == translation_store.modified_indices(pack_info)
+    return data
+
+
+def test_replace_same_count_keeps_ids_and_other_dirty_records(pack_info):
+    translation_store.update_items(pack_info, [(1, 'a'), (4, 'b'), (7, 'c')])
+    old_ids = [entry.id for entry in translation_store.get_data(pack_info)]
+
+    assert translation_store.replace_file_entries(pack_info, 'texts/1.lang', new_file_entries('1', 'xyz')) == (3, 3)
+
+    data = check_consistent(pack_info)
+    assert [entry.id for entry in data] == old_ids
+    assert values(pack_info) == ['v0', 'a', 'v2', 'x', 'y', 'z', 'v6', 'c', 'v8']
+    # 被替换文件中的修改随之丢弃
+    assert translation_store.modified_indices(pack_info) == [1, 7]
+    assert translation_store.filter_data(pack_info, 'y') == [4]
+
+
+@pytest.mark.parametrize('new_values', ['wxyz', 'q', ''])
+def test_replace_different_count_shifts_dirty_records(pack_info, new_values):
+    translation_store.update_items(pack_info, [(1, 'a'), (4, 'b'), (7, 'c')])
+    before = translation_store.get_data(pack_info)
+    removed_ids = [entry.id for entry in before[3:6]]
+
+    assert translation_store.replace_file_entries(pack_info, 'texts/1.lang', new_file_entries('1', new_values)) == (3, 3)
+
+    data = check_consistent(pack_info)
+    delta = len(new_values) - 3
+    assert values(pack_info) == ['v0', 'a', 'v2', *new_values, 'v6', 'c', 'v8']
+    assert translation_store.modified_indices(pack_info) == [1, 7 + delta]
+    assert [entry.id for entry in data[6 + delta:]] == [entry.id for entry in before[6:]]
+    assert all(translation_store.get_entry(entry_id) is None for entry_id in removed_ids)
+    # 之前取得的列表不受拼接影响
+    assert [entry['value'] for entry in before] == ['v0', 'a', 'v2', 'v3', 'b', 'v5', 'v6', 'c', 'v8']
+    # 修改和改回原值按平移后的索引记录
+    translation_store.update_item(pack_info, 7 + delta, 'v7')
+    assert translation_store.modified_indices(pack_info) == [1]
+    assert translation_store.filter_data(pack_info, 'v8') == [8 + delta]
+
+
+def test_replace_with_stale_generation_is_ignored(pack_info):
+    generation = translation_store.begin_results(pack_info)
+    translation_store.append_results(pack_info, new_file_entries('0', 'abc'), generation)
+
+    assert translation_store.replace_file_entries(pack_info, 'texts/0.lang', [], generation - 1) is None
+    assert values(pack_info) == ['a', 'b', 'c']
+    assert translation_store.replace_file_entries(pack_info, 'texts/0.lang', [], generation) == (0, 3)
+    assert values(pack_info) == []
+
+
+def test_packs_are_sharded(pack_info):
+    other = PackInfo('store', pack_info.path, 'behavior')
+    translation_store.store_search_results(other, [Entry(type='item_name', filename='a.json', value='v0')])
+
+    translation_store.update_item(pack_info, 0, 'changed')
+
+    assert translation_store.pack_id(other) != translation_store.pack_id(pack_info)
+    assert translation_store.is_modified(pack_info)
+    assert not translation_store.is_modified(other)
+    assert values(other) == ['v0']
+    translation_store.reset_modified_status(other)
+    assert translation_store.is_modified(pack_info)
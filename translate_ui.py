@@ -1,13 +1,21 @@
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QTimer
 from PyQt6.QtWidgets import QFrame, QVBoxLayout, QHBoxLayout, QFileDialog, QHeaderView, QAbstractItemView
-from qfluentwidgets import SubtitleLabel, setFont, SearchLineEdit, PrimaryPushButton, PushButton, ComboBox, IndeterminateProgressRing
+from qfluentwidgets import SubtitleLabel, CaptionLabel, setFont, SearchLineEdit, PrimaryPushButton, PushButton, TogglePushButton, ComboBox, IndeterminateProgressRing
 from functions.infobar import show_message_bar
+from functions.messagebox import show_confirm_dialog
 import shared
 from found import scan_packs, find_manifest_json
 from search_function.search_main import SearchController
-from table import CustomTableWidget, TableDataManager
+from search_function.filter_index import TextFilterIndex
+from search_function.scan_index import STALE_FILE_MESSAGE
+from table import CustomTableView, TableDataManager
 from config import cfg
 
+# 搜索框输入防抖间隔（毫秒）
+FILTER_DEBOUNCE_MS = 150
+# 包选择下拉框中表示全局搜索的选项
+ALL_PACKS_LABEL = '[全部包]'
+
 class LangInterface(QFrame):
     """ 汉化界面 """
     
@@ -54,9 +62,15 @@ class LangInterface(QFrame):
         self.searchSpinner.setFixedSize(24, 24)
         self.searchSpinner.hide()
         
+        # 创建结果计数标签，扫描过程中实时更新
+        self.countLabel = CaptionLabel('', self)
+        
         # 创建中文显示切换按钮
         self.toggleChineseButton = PrimaryPushButton('隐藏中文值', self)
         
+        # 创建仅显示已修改条目的切换按钮
+        self.changedOnlyButton = TogglePushButton('仅显示已修改', self)
+        
         # 创建保存按钮
         self.saveButton = PrimaryPushButton('保存', self)
         
@@ -73,24 +87,20 @@ class LangInterface(QFrame):
         self.hBoxLayout.addWidget(self.folderButton)
         self.hBoxLayout.addWidget(self.searchButton)
         self.hBoxLayout.addWidget(self.searchSpinner)
+        self.hBoxLayout.addWidget(self.countLabel)
         self.hBoxLayout.addWidget(self.toggleChineseButton)
+        self.hBoxLayout.addWidget(self.changedOnlyButton)
         self.hBoxLayout.addWidget(self.saveButton)
         self.hBoxLayout.addWidget(self.copyButton)
         self.hBoxLayout.addWidget(self.pasteButton)
         
         # 创建表格
-        self.tableView = CustomTableWidget(self)
+        self.tableView = CustomTableView(self)
         self.tableView.setBorderVisible(True)
         self.tableView.setBorderRadius(8)
         self.tableView.setWordWrap(False)
         self.tableView.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectItems)
         self.tableView.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
-        
-        # 设置表格列数
-        self.tableView.setColumnCount(3)
-        self.tableView.setHorizontalHeaderLabels(['', '', ''])
-        for i in range(3):
-            self.tableView.setColumnHidden(i, True)
         vertical_header = self.tableView.verticalHeader()
         if vertical_header:
             vertical_header.hide()
@@ -103,35 +113,51 @@ class LangInterface(QFrame):
         self.vBoxLayout.setSpacing(16)
         self.vBoxLayout.setContentsMargins(36, 10, 36, 10)
         
+        # 全局搜索时需要扫描的包数量
+        self._global_pack_total = 0
+        
         # 初始化包列表
         self.updatePackList()
         
     def _setup_connections(self):
         # 创建表格数据管理器
         self.table_manager = TableDataManager(self.tableView)
-        self.table_manager.data_changed.connect(self._on_data_changed)
 
         # 初始化搜索控制器
         self.search_controller = SearchController(self)
+        self.search_controller.results_batch.connect(self._handle_search_batch)
+        self.search_controller.global_batch.connect(self._handle_global_batch)
         self.search_controller.results_ready.connect(self._handle_search_results)
         self.search_controller.search_error.connect(self._handle_search_error)
         self.search_controller.search_finished.connect(self._on_search_finished)
+        self.search_controller.results_patched.connect(self._handle_results_patched)
+        
+        # 搜索框输入防抖：停止输入一段时间后才在内存中过滤结果
+        self.filterTimer = QTimer(self)
+        self.filterTimer.setSingleShot(True)
+        self.filterTimer.setInterval(FILTER_DEBOUNCE_MS)
+        self.filterTimer.timeout.connect(self.apply_filter)
+        self.searchLineEdit.textChanged.connect(self.filterTimer.start)
         
         # 连接按钮信号
-        self.searchLineEdit.returnPressed.connect(self.searchContent)
+        self.searchLineEdit.returnPressed.connect(self.apply_filter)
         self.folderButton.clicked.connect(self.selectFolder)
         self.searchButton.clicked.connect(self.searchContent)
         self.refreshPacksButton.clicked.connect(self.updatePackList)
         self.toggleChineseButton.clicked.connect(self.toggle_chinese_visibility)
+        self.changedOnlyButton.toggled.connect(self.apply_filter)
         self.saveButton.clicked.connect(self.saveChanges)
         self.copyButton.clicked.connect(self.copyRows)
         self.pasteButton.clicked.connect(self.paste_from_clipboard)
         self.packComboBox.currentIndexChanged.connect(self.on_pack_selected)
 
-    def _on_data_changed(self):
-        shared.file_save = 'no'
+    def _is_global_selected(self):
+        return self.packComboBox.currentText() == ALL_PACKS_LABEL
 
     def paste_from_clipboard(self):
+        if self._is_global_selected():
+            show_message_bar(title='提示', content="全局搜索的结果为只读，请选择单个包后再粘贴。", bar_type='info', duration=3000, parent=self)
+            return
         selected_pack_info = self._get_selected_pack_info()
         if not selected_pack_info:
             show_message_bar(title='错误', content="未选择任何包，无法粘贴。", bar_type='error', duration=3000, parent=self)
@@ -166,6 +192,9 @@ class LangInterface(QFrame):
         return selected_pack
 
     def saveChanges(self):
+        if self._is_global_selected():
+            show_message_bar(title='提示', content="全局搜索的结果为只读，请选择单个包后再修改和保存。", bar_type='info', duration=3000, parent=self)
+            return
         selected_pack_info = self._get_selected_pack_info()
         if not selected_pack_info:
             show_message_bar(title='错误', content="未选择任何包，无法保存。", bar_type='error', duration=3000, parent=self)
@@ -175,40 +204,111 @@ class LangInterface(QFrame):
         success, message = self.table_manager.save_changes()
 
         if success:
-            if "但有错误" in message:
-                show_message_bar(title='警告', content=message, bar_type='warning', duration=7000, parent=self)
-            else:
-                show_message_bar(title='成功', content=message, bar_type='success', duration=5000, parent=self)
-            shared.file_save = 'yes'
+            show_message_bar(title='成功', content=message, bar_type='success', duration=5000, parent=self)
             self.searchContent()
+        elif STALE_FILE_MESSAGE in message:
+            # 文件在查找后被其他程序修改，查找结果已过期，必须重新查找后才能保存
+            if show_confirm_dialog('文件已被修改', f"{message}\n\n重新查找会丢弃当前未保存的修改，是否立即重新查找？", self,
+                                   confirm_text='重新查找', cancel_text='取消'):
+                self.searchContent()
         else:
             show_message_bar(title='保存失败', content=message, bar_type='error', duration=5000, parent=self)
-            shared.file_save = 'no'
 
     def searchContent(self):
+        """重新扫描当前选择的包（未修改的文件会直接从扫描索引读取）"""
         self.searchSpinner.show()
+        if self._is_global_selected():
+            self.searchAllPacks()
+            return
         selected_pack = self._get_selected_pack_info()
         if not selected_pack:
+            self.search_controller.stop_search()
             self.table_manager.clear_table()
+            self.countLabel.setText('')
             self.searchSpinner.hide()
             return
 
         self.table_manager.set_current_pack(selected_pack)
-        search_text = self.searchLineEdit.text().lower()
 
-        if self.search_controller.is_running():
-            show_message_bar(title='提示', content='上一个搜索仍在进行中，请稍后再试或等待其完成。', bar_type='info', duration=3000, parent=self)
+        # 正在进行的扫描会被取消并由新的扫描取代；清空表格，结果将随扫描进度逐批显示
+        self.table_manager.begin_results(selected_pack.type)
+        self.countLabel.setText('已找到 0 条')
+        self.search_controller.start_search(selected_pack)
+
+    def searchAllPacks(self):
+        """全局搜索：并行扫描所有包，结果按包合并显示"""
+        behavior_packs, resource_packs = scan_packs()
+        packs = behavior_packs + resource_packs
+        if not packs:
+            self.search_controller.stop_search()
+            self.table_manager.clear_table()
+            self.countLabel.setText('')
+            self.searchSpinner.hide()
+            return
+
+        self.table_manager.set_current_pack(None)
+        self.table_manager.begin_results('global')
+        self.countLabel.setText(f'已扫描 0/{len(packs)} 个包')
+        self._global_pack_total = len(packs)
+        self.search_controller.start_global_search(packs)
+
+    def apply_filter(self):
+        """按搜索框文本在内存中过滤已扫描的结果，不重新读取磁盘"""
+        self.filterTimer.stop()
+        if not self.table_manager.result_count():
+            # 还没有扫描结果时，回车等同于查找
+            if self.sender() is self.searchLineEdit:
+                self.searchContent()
             return
 
-        self.search_controller.start_search(selected_pack, search_text)
+        # 扫描过程中数据源可能已追加了表格尚未接收的批次，只显示已接收的部分
+        stop = self.table_manager.result_count()
+        search_text = self.searchLineEdit.text()
+        if self.changedOnlyButton.isChecked():
+            # 只在已修改的条目中过滤，不需要遍历全部结果
+            indices = [index for index in self.search_controller.modified_indices() if index < stop]
+            if search_text:
+                matched = set(self.search_controller.filter_current_results(search_text, stop=stop))
+                indices = [index for index in indices if index in matched]
+        else:
+            indices = self.search_controller.filter_current_results(search_text, stop=stop)
+        self.table_manager.show_rows(indices)
+        # 扫描过程中保持列宽不随内容调整，扫描结束后再统一调整
+        if not self.search_controller.is_running():
+            self.setupTableColumns()
+        self.update_row_visibility()
+
+    def _handle_search_batch(self, start, batch, pack_type):
+        """扫描过程中追加一批结果，只显示其中符合当前搜索文本的条目"""
+        search_text = self.searchLineEdit.text()
+        indices = None
+        if self.changedOnlyButton.isChecked():
+            # 刚扫描到的条目都还没有被修改
+            indices = []
+        elif search_text:
+            indices = self.search_controller.filter_current_results(search_text, start, start + len(batch))
+        self.table_manager.append_results(start, batch, indices)
+        self.countLabel.setText(f'已找到 {self.table_manager.result_count()} 条')
+
+    def _handle_global_batch(self, start, results, pack_info):
+        """全局搜索中一个包扫描完成，追加其中符合当前搜索文本的条目"""
+        search_text = self.searchLineEdit.text()
+        indices = None
+        if self.changedOnlyButton.isChecked():
+            # 全局搜索的结果为只读，没有已修改的条目
+            indices = []
+        elif search_text:
+            indices = self.search_controller.filter_current_results(search_text, start, start + len(results))
+        self.table_manager.append_results(start, results, indices, pack_info)
+        pack_count = self.search_controller.global_results.pack_count()
+        self.countLabel.setText(
+            f'已扫描 {pack_count}/{self._global_pack_total} 个包，找到 {self.table_manager.result_count()} 条'
+        )
 
     def _handle_search_results(self, results, pack_type, failed_json_count):
-        current_results = self.search_controller.get_current_results()
-        self.table_manager.populate_table(current_results, pack_type)
+        # 各批结果已在扫描过程中显示，这里只调整列宽并提示扫描完成
         self.setupTableColumns()
-        self.update_row_visibility()
-
-        shared.file_save = None
+        self.countLabel.setText(f'共 {self.table_manager.result_count()} 条')
 
         visible_rows, total_rows = self.table_manager.get_visible_rows_count()
         message_content = f"共找到 {total_rows} 条结果，当前显示 {visible_rows} 条。"
@@ -217,6 +317,8 @@ class LangInterface(QFrame):
             selected_pack = self._get_selected_pack_info()
             if selected_pack and selected_pack.type == 'behavior':
                 shared.error_json_pack_path = selected_pack.path
+        if pack_type == 'global':
+            message_content = f"在 {self.search_controller.global_results.pack_count()} 个包中" + message_content
 
         show_message_bar(
             title='查找完成',
@@ -226,6 +328,22 @@ class LangInterface(QFrame):
             parent=self
         )
 
+    def _handle_results_patched(self, patches):
+        """监视模式下文件被外部修改，只修补这些文件对应的行"""
+        search_text = self.searchLineEdit.text()
+        for start, replaced_count, entries in patches:
+            indices = None
+            if self.changedOnlyButton.isChecked():
+                # 外部修改后的条目以文件内容为准，没有未保存的修改
+                indices = []
+            elif search_text:
+                # 各文件依次修补，新条目（包括数量不变时）按与过滤索引相同的规则单独匹配
+                identifier_field = 'key' if self.table_manager.pack_type == 'resources' else 'filename'
+                indices = [start + row for row in TextFilterIndex(entries, identifier_field).query(search_text)]
+            self.table_manager.patch_rows(start, replaced_count, entries, indices)
+        self.countLabel.setText(f'共 {self.table_manager.result_count()} 条')
+        show_message_bar(title='已刷新', content=f"{len(patches)} 个文件在外部被修改，已更新对应的条目", bar_type='info', duration=2000, parent=self)
+
     def _handle_search_error(self, error_message):
         show_message_bar(title='查找错误', content=error_message, bar_type='error', duration=5000, parent=self)
         self.searchSpinner.hide()
@@ -244,6 +362,9 @@ class LangInterface(QFrame):
             
         for pack in resource_packs:
             self.packComboBox.addItem(f"[资源包] {pack.name}")
+        
+        if behavior_packs or resource_packs:
+            self.packComboBox.addItem(ALL_PACKS_LABEL)
             
         if not (behavior_packs or resource_packs):
             self.packComboBox.setCurrentIndex(-1)
@@ -304,7 +425,7 @@ class LangInterface(QFrame):
             show_message_bar(title='警告', content="没有可复制的内容", bar_type='warning', duration=3000, parent=self)
 
     def setupTableColumns(self):
-        if self.tableView.rowCount() == 0:
+        if self.table_manager.model.rowCount() == 0:
             return
         header = self.tableView.horizontalHeader()
         if header:
@@ -315,6 +436,9 @@ class LangInterface(QFrame):
     def on_pack_selected(self, index):
         """当用户从下拉框选择包时调用"""
         if index >= 0:
+            if self._is_global_selected():
+                show_message_bar(title='已选择全部包', content='点击查找将同时扫描所有包', bar_type='success', duration=3000, parent=self)
+                return
             selected_pack = self._get_selected_pack_info()
             if selected_pack:
                 pack_type = "行为包" if selected_pack.type == "behavior" else "资源包"
@@ -10,7 +10,8 @@ from bag import BagInterface
 from json_format import JsonFormatInterface
 from resource.resource import LOGO_PATH, BASE_DIR
 from functions import show_confirm_dialog
-import shared
+from services.timing_signals import timing_signals  # 创建时按设置开启分阶段计时
+from save import translation_store
 class StyleSheet(StyleSheetBase, Enum):
     FLUENT_WINDOW = "fluent_window"
     def path(self, theme=Theme.AUTO):
@@ -40,7 +41,7 @@ class MainWindow(MSFluentWindow):
         self.addSubInterface(self.jsonFormatInterface, FIF.CODE, 'JSON规范化', FIF.CODE)
         self.addSubInterface(self.settingInterface, FIF.SETTING, '设置', FIF.SETTING, NavigationItemPosition.BOTTOM)
     def closeEvent(self, e):
-        if shared.file_save == 'no':
+        if translation_store.has_unsaved_changes():
             if not show_confirm_dialog('确认关闭', '当前有未保存的更改，确定要关闭吗？', self, confirm_text='确认关闭', cancel_text='取消'):
                 e.ignore()
                 return